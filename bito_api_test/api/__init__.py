@@ -1,3 +1,111 @@
-from .bitopro_client import BitoProClient
+from .bitopro_client import BitoProClient, OHLCJob, OHLCJobResult
+from .capture import CAPTURE_FULL, CAPTURE_HASH, CAPTURE_TRUNCATED, CapturePolicy
+from .cassette import (
+    CASSETTE_MODES,
+    CASSETTE_RECORD,
+    CASSETTE_REPLAY,
+    Cassette,
+    CassetteEntry,
+    CassetteMiss,
+    CassetteStats,
+)
+from .concurrency_sweep import SweepLevel, SweepResult, find_knee, measure_concurrency, run_concurrency_sweep
+from .fixed_point import DEFAULT_PRECISION, format_fixed_point, parse_fixed_point
+from .latency_histogram import LatencyHistogram
+from .load_generator import LOAD_PERCENTILES, LoadResult, run_open_load
+from .mock_server import MockBitoProServer, MockServerConfig, MockServerStats, parse_mock_server_config
+from .ohlc_cache import CacheStats, OHLCDiskCache
+from .ohlc_columns import OHLC_VALUE_FIELDS, OHLCColumns
+from .ohlc_resample import (
+    ConsistencyReport,
+    ConsistencyResult,
+    check_resolution_consistency,
+    compare_ohlc,
+    resample_ohlc,
+)
+from .ohlc_stream import OHLCStreamDecoder
+from .ohlc_sync import OHLCSyncEngine, SeriesState, SyncResult
+from .ohlc_validation import OHLCValidationReport, validate_ohlc
+from .perf_baseline import BaselineStore, PerformanceRegression, RegressionVerdict, check_regression
+from .rate_limiter import RateLimiter, RateLimitMetrics, TokenBucket
+from .request_timing import TIMING_PHASES, RequestTimings, TimingStats, create_trace_config
+from .retry import HedgePolicy, RetryBudget, RetryPolicy
+from .session_pool import ConnectorConfig, close_shared_session, create_session, get_shared_session
+from .sharding import ShardedRunResult, ShardResult, assign_shards, run_sharded_tests, write_allure_environment
+from .soak import DriftFinding, SoakReport, SoakSample, detect_drift, run_soak
 
-__all__ = ["BitoProClient"]
+__all__ = [
+    "BitoProClient",
+    "OHLCJob",
+    "OHLCJobResult",
+    "CapturePolicy",
+    "CAPTURE_FULL",
+    "CAPTURE_TRUNCATED",
+    "CAPTURE_HASH",
+    "Cassette",
+    "CassetteEntry",
+    "CassetteMiss",
+    "CassetteStats",
+    "CASSETTE_MODES",
+    "CASSETTE_RECORD",
+    "CASSETTE_REPLAY",
+    "SweepLevel",
+    "SweepResult",
+    "find_knee",
+    "measure_concurrency",
+    "run_concurrency_sweep",
+    "MockBitoProServer",
+    "MockServerConfig",
+    "MockServerStats",
+    "parse_mock_server_config",
+    "OHLCDiskCache",
+    "CacheStats",
+    "OHLCColumns",
+    "OHLC_VALUE_FIELDS",
+    "DEFAULT_PRECISION",
+    "parse_fixed_point",
+    "format_fixed_point",
+    "LatencyHistogram",
+    "LoadResult",
+    "LOAD_PERCENTILES",
+    "run_open_load",
+    "OHLCValidationReport",
+    "validate_ohlc",
+    "resample_ohlc",
+    "compare_ohlc",
+    "check_resolution_consistency",
+    "ConsistencyReport",
+    "ConsistencyResult",
+    "OHLCStreamDecoder",
+    "OHLCSyncEngine",
+    "SeriesState",
+    "SyncResult",
+    "BaselineStore",
+    "PerformanceRegression",
+    "RegressionVerdict",
+    "check_regression",
+    "RateLimiter",
+    "RateLimitMetrics",
+    "TokenBucket",
+    "RequestTimings",
+    "TimingStats",
+    "TIMING_PHASES",
+    "create_trace_config",
+    "RetryPolicy",
+    "RetryBudget",
+    "HedgePolicy",
+    "ConnectorConfig",
+    "create_session",
+    "get_shared_session",
+    "close_shared_session",
+    "ShardResult",
+    "ShardedRunResult",
+    "assign_shards",
+    "run_sharded_tests",
+    "write_allure_environment",
+    "SoakReport",
+    "SoakSample",
+    "DriftFinding",
+    "detect_drift",
+    "run_soak",
+]
@@ -1,8 +1,49 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
 from loguru import logger
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 
 import aiohttp
 import orjson
+import yarl
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from .capture import CAPTURE_HASH, CapturePolicy
+from .cassette import Cassette, CassetteEntry
+from .ohlc_cache import OHLCDiskCache
+from .ohlc_columns import OHLCColumns
+from .ohlc_stream import OHLCStreamDecoder
+from .rate_limiter import RateLimiter
+from .request_timing import RequestTimings, TimingStats
+from .retry import HedgePolicy, RetryPolicy
+from .session_pool import ConnectorConfig, create_session
+
+
+@dataclass(frozen=True)
+class OHLCJob:
+    """批次獲取中的單一 OHLC 請求"""
+
+    pair: str
+    resolution: str
+    from_timestamp: int
+    to_timestamp: int
+
+
+@dataclass
+class OHLCJobResult:
+    """批次獲取中單一請求的結果，失敗時 error 不為 None"""
+
+    job: OHLCJob
+    data: Optional[Dict[str, Any]] = None
+    req_resp: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class BitoProClient:
@@ -10,6 +51,9 @@ class BitoProClient:
 
     BASE_URL = "https://api.bitopro.com/v3"
 
+    # 覆寫 API 根網址的環境變數，例如指向本機的 MockBitoProServer
+    BASE_URL_ENV = "BITOPRO_API_BASE_URL"
+
     # 有效的時間框架列表（僅用於參考，不再用於驗證）
     VALID_RESOLUTIONS = ["1m", "5m", "15m", "30m", "1h", "3h", "4h", "6h", "12h", "1d", "1w", "1M"]
 
@@ -17,25 +61,101 @@ class BitoProClient:
     INT64_MIN = -9223372036854775808
     INT64_MAX = 9223372036854775807
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    # 各時間框架對應的秒數（1M 以 30 天估算，僅用於切分請求區間）
+    RESOLUTION_SECONDS = {
+        "1m": 60,
+        "5m": 300,
+        "15m": 900,
+        "30m": 1800,
+        "1h": 3600,
+        "3h": 10800,
+        "4h": 14400,
+        "6h": 21600,
+        "12h": 43200,
+        "1d": 86400,
+        "1w": 604800,
+        "1M": 2592000,
+    }
+
+    # 伺服器單次請求可回傳的最大 K 線數量（保守估計，超過會被截斷）
+    MAX_CANDLES_PER_REQUEST = 1000
+
+    # get_ohlc_range 預設的最大併發請求數
+    DEFAULT_RANGE_CONCURRENCY = 8
+
+    # iter_ohlc_batch 預設的最大併發請求數
+    DEFAULT_BATCH_CONCURRENCY = 10
+
+    # 速率限制器中 OHLC 端點的名稱
+    OHLC_RATE_LIMIT_ENDPOINT = "trading-history"
+
+    # 串流模式每次從連線讀取的位元組數
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        connector_config: Optional[ConnectorConfig] = None,
+        cache: Optional[OHLCDiskCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        default_deadline: Optional[float] = None,
+        coalesce_requests: bool = False,
+        capture_policy: Optional[CapturePolicy] = None,
+        base_url: Optional[str] = None,
+        cassette: Optional[Cassette] = None,
+    ):
         """
         初始化 BitoPro API 客戶端
 
         Args:
-            session: 可選的 aiohttp.ClientSession 實例，如果未提供，將創建一個新的
+            session: 可選的 aiohttp.ClientSession 實例，如果未提供，將創建一個新的；
+                外部傳入的 session 由呼叫端負責關閉
+            connector_config: 自行建立 session 時使用的連線池設定
+            cache: 可選的 OHLC 磁碟快取，供 get_ohlc_range 使用
+            rate_limiter: 可選的速率限制器，可由多個客戶端共用
+            retry_policy: 可選的重試策略，未提供時失敗即拋出
+            hedge_policy: 可選的對沖請求策略
+            default_deadline: get_ohlc_data 每次呼叫的預設最長秒數，None 表示不限制
+            coalesce_requests: 是否預設合併參數完全相同的同時進行中請求
+            capture_policy: 響應內容保存策略，預設完整保存到 req_resp["response"]["body"]
+            base_url: API 根網址，未提供時依序使用環境變數 BITOPRO_API_BASE_URL 與 BASE_URL
+            cassette: 可選的錄製卡帶，錄製模式下保存每次響應，重播模式下只從卡帶讀取、不發送網路請求
         """
+        self.base_url = (base_url or os.environ.get(self.BASE_URL_ENV) or self.BASE_URL).rstrip("/")
         self._session = session
+        self._owns_session = False
+        self._connector_config = connector_config
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._hedge_policy = hedge_policy
+        self._default_deadline = default_deadline
+        self._coalesce_requests = coalesce_requests
+        self._inflight: Dict[Tuple[str, str, int, int], asyncio.Future] = {}
+        self.coalesced_requests = 0
+        self._capture_policy = capture_policy or CapturePolicy()
+        self._cassette = cassette
+        self.timing_stats = TimingStats()
         self._logger = logger
 
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        """目前使用的 aiohttp.ClientSession，尚未初始化時為 None"""
+        return self._session
+
     async def __aenter__(self):
         if self._session is None:
-            self._session = aiohttp.ClientSession(json_serialize=orjson.dumps)
+            self._session = create_session(self._connector_config)
+            self._owns_session = True
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session is not None:
+        if self._owns_session and self._session is not None:
             await self._session.close()
             self._session = None
+            self._owns_session = False
 
     def _convert_headers_to_str_keys(self, headers: Dict) -> Dict[str, Any]:
         """
@@ -50,8 +170,17 @@ class BitoProClient:
         return {str(k): v for k, v in headers.items()}
 
     async def get_ohlc_data(
-        self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int
-    ) -> Tuple[Dict[str, List[Dict[str, Union[int, str]]]], Dict[str, Any]]:
+        self,
+        pair: str,
+        resolution: str,
+        from_timestamp: int,
+        to_timestamp: int,
+        *,
+        as_columns: bool = False,
+        precision: Optional[Dict[str, int]] = None,
+        deadline: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+    ) -> Tuple[Union[Dict[str, List[Dict[str, Union[int, str]]]], OHLCColumns], Dict[str, Any]]:
         """
         獲取指定交易對的 OHLC 數據
 
@@ -63,6 +192,11 @@ class BitoProClient:
             resolution (string, Required): 時間框架，可選值為 1m, 5m, 15m, 30m, 1h, 3h, 4h, 6h, 12h, 1d, 1w, 1M
             from (int64, Required): 開始時間的 Unix 時間戳
             to (int64, Required): 結束時間的 Unix 時間戳
+            as_columns: 為 True 時以 OHLCColumns（NumPy 按欄格式）取代字典回傳數據
+            precision: as_columns 時各欄位保留的小數位數，提供時以定點 int64 精確儲存
+            deadline: 整次呼叫（含重試與對沖）的最長秒數，預設使用客戶端的 default_deadline
+            coalesce: 是否與參數完全相同的進行中請求共用同一次網路請求，預設使用客戶端的
+                coalesce_requests；共用時所有呼叫者取得同一個數據字典，請勿修改
 
         Returns:
             包含 OHLC 數據的字典，格式如下:
@@ -85,20 +219,164 @@ class BitoProClient:
         if self._session is None:
             raise RuntimeError("Session is not initialized. Use 'async with' context manager.")
 
+        deadline = deadline if deadline is not None else self._default_deadline
+        coalesce = coalesce if coalesce is not None else self._coalesce_requests
+        if coalesce:
+            request = self._request_ohlc_coalesced(pair, resolution, from_timestamp, to_timestamp)
+        else:
+            request = self._request_ohlc_with_retry(pair, resolution, from_timestamp, to_timestamp)
+        if deadline is None:
+            data, req_resp = await request
+        else:
+            started_at = time.perf_counter()
+            try:
+                data, req_resp = await asyncio.wait_for(request, deadline)
+            except asyncio.TimeoutError:
+                if time.perf_counter() - started_at < deadline:
+                    # 請求本身的逾時錯誤，並非超過整體期限
+                    raise
+                self._logger.error(f"OHLC request for {pair} {resolution} exceeded deadline of {deadline}s")
+                raise asyncio.TimeoutError(f"OHLC request exceeded deadline of {deadline}s") from None
+
+        if as_columns:
+            return OHLCColumns.from_response(data, precision), req_resp
+        return data, req_resp
+
+    async def _request_ohlc_coalesced(
+        self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int
+    ) -> Tuple[Dict[str, List[Dict[str, Union[int, str]]]], Dict[str, Any]]:
+        """
+        合併參數完全相同的同時進行中請求（single-flight）
+
+        第一個呼叫者發送請求，其餘呼叫者等待同一個結果。等待以 asyncio.shield 保護，
+        單一呼叫者因期限取消時不會中斷其他呼叫者共用的請求。
+
+        Returns:
+            OHLC 數據字典，以及包含請求和響應詳細信息的字典
+        """
+        key = (pair, resolution, from_timestamp, to_timestamp)
+        future = self._inflight.get(key)
+        coalesced = future is not None
+        if future is None:
+            future = asyncio.ensure_future(
+                self._request_ohlc_with_retry(pair, resolution, from_timestamp, to_timestamp)
+            )
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish_inflight(key, done))
+        else:
+            self.coalesced_requests += 1
+
+        data, req_resp = await asyncio.shield(future)
+        return data, {**req_resp, "coalesced": coalesced}
+
+    def _finish_inflight(self, key: Tuple[str, str, int, int], future: asyncio.Future) -> None:
+        """移除已完成的進行中請求，並標記例外已被讀取以免所有呼叫者都取消時產生警告"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()
+
+    async def _request_ohlc_with_retry(
+        self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int
+    ) -> Tuple[Dict[str, List[Dict[str, Union[int, str]]]], Dict[str, Any]]:
+        """
+        依重試策略發送 OHLC 請求（GET 為冪等請求，可安全重試）
+
+        Returns:
+            OHLC 數據字典，以及包含請求和響應詳細信息的字典
+        """
+        attempt = 1
+        while True:
+            try:
+                data, req_resp = await self._request_ohlc_hedged(pair, resolution, from_timestamp, to_timestamp)
+                req_resp["attempts"] = attempt
+                return data, req_resp
+            except Exception as e:
+                if self._retry_policy is None or not self._retry_policy.should_retry(e, attempt):
+                    raise
+                delay = self._retry_policy.backoff(attempt, e)
+                self._logger.warning(f"Retrying OHLC request (attempt {attempt + 1}) in {delay:.2f}s after: {e}")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _request_ohlc_hedged(
+        self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int
+    ) -> Tuple[Dict[str, List[Dict[str, Union[int, str]]]], Dict[str, Any]]:
+        """
+        發送 OHLC 請求，超過對沖延遲仍未完成時再發送一個相同請求並採用先完成者
+
+        Returns:
+            OHLC 數據字典，以及包含請求和響應詳細信息的字典
+        """
+        hedge_delay = self._hedge_policy.delay() if self._hedge_policy is not None else None
+        if hedge_delay is None:
+            return await self._request_ohlc(pair, resolution, from_timestamp, to_timestamp)
+
+        # 所有等待都在 try 內，外層取消或逾時發生在對沖延遲期間時也不會留下孤兒請求
+        pending = set()
+        error: Optional[BaseException] = None
+        try:
+            primary = asyncio.ensure_future(self._request_ohlc(pair, resolution, from_timestamp, to_timestamp))
+            pending.add(primary)
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            self._hedge_policy.hedged += 1
+            self._logger.info(f"Hedging OHLC request for {pair} {resolution} after {hedge_delay:.3f}s")
+            pending.add(asyncio.ensure_future(self._request_ohlc(pair, resolution, from_timestamp, to_timestamp)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        data, req_resp = task.result()
+                        req_resp["hedged"] = True
+                        return data, req_resp
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _request_ohlc(
+        self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int
+    ) -> Tuple[Dict[str, List[Dict[str, Union[int, str]]]], Dict[str, Any]]:
+        """
+        發送單次 OHLC 請求
+
+        Returns:
+            OHLC 數據字典，以及包含請求和響應詳細信息的字典
+        """
         # 不再進行客戶端驗證，直接發送請求到伺服器
         endpoint = f"/trading-history/{pair}"
         params = {"resolution": resolution, "from": from_timestamp, "to": to_timestamp}
 
-        url = f"{self.BASE_URL}{endpoint}"
-        self._logger.info(f"Requesting OHLC data: {url} with params: {params}")
+        url = f"{self.base_url}{endpoint}"
+        self._logger.info("Requesting OHLC data: {} with params: {}", url, params)
 
         # 記錄請求詳細信息
         request_info = {"method": "GET", "url": url, "params": params, "headers": {}}
 
         response_info = {}
+        replaying = self._cassette is not None and self._cassette.replaying
+
+        if self._rate_limiter is not None and not replaying:
+            request_info["rate_limit_wait"] = await self._rate_limiter.acquire(self.OHLC_RATE_LIMIT_ENDPOINT)
 
+        started_at = time.perf_counter()
+        timings = RequestTimings()
+        timings.mark("request_start")
         try:
-            async with self._session.get(url, params=params) as response:
+            if replaying:
+                entry = self._replay_entry(endpoint, params, url, response_info)
+                data = orjson.loads(entry.body)
+                response_info["body"] = self._capture_policy.capture(
+                    data, entry.body if self._capture_policy.mode == CAPTURE_HASH else b""
+                )
+                return data, {"request": request_info, "response": response_info, "replayed": True}
+
+            async with self._session.get(url, params=params, trace_request_ctx=timings) as response:
+                timings.mark("headers")
                 # 記錄響應詳細信息
                 response_info = {
                     "status": response.status,
@@ -106,11 +384,29 @@ class BitoProClient:
                     "url": str(response.url),
                 }
 
+                if self._rate_limiter is not None:
+                    self._rate_limiter.update_from_response(
+                        self.OHLC_RATE_LIMIT_ENDPOINT, response.status, response.headers
+                    )
+
+                # 先讀取響應內容，錯誤響應也能錄製到卡帶
+                raw_body = await response.read()
+                timings.mark("body_read")
+                if self._cassette is not None:
+                    self._cassette.record(endpoint, params, response.status, response.headers, raw_body)
                 response.raise_for_status()
+                # response.json 使用 read 已快取的響應內容，只計入解析時間
                 data = await response.json(loads=orjson.loads)
-                response_info["body"] = data
-                self._logger.debug(f"Received OHLC data: {data}")
-                return data, {"request": request_info, "response": response_info}
+                timings.mark("decoded")
+                self.timing_stats.record(timings.finish())
+                response_info["body"] = self._capture_policy.capture(
+                    data, raw_body if self._capture_policy.mode == CAPTURE_HASH else b""
+                )
+                # 延遲格式化：未啟用 debug 時不會把整個響應轉成字串
+                self._logger.opt(lazy=True).debug("Received OHLC data: {}", lambda: response_info["body"])
+                if self._hedge_policy is not None:
+                    self._hedge_policy.record(time.perf_counter() - started_at)
+                return data, {"request": request_info, "response": response_info, "timings": timings.to_dict()}
         except aiohttp.ClientResponseError as e:
             # 記錄錯誤響應
             try:
@@ -136,3 +432,375 @@ class BitoProClient:
             response_info["error"] = {"message": str(e), "type": type(e).__name__}
             self._logger.error(f"Unexpected error requesting OHLC data: {e}")
             raise
+
+    def _replay_entry(
+        self, endpoint: str, params: Dict[str, Any], url: str, response_info: Dict[str, Any]
+    ) -> CassetteEntry:
+        """
+        從卡帶讀取錄製的響應，錄製的是錯誤響應時與實際請求一樣引發 ClientResponseError
+
+        Args:
+            endpoint: 相對於 API 根網址的路徑
+            params: 查詢參數
+            url: 完整網址，用於錯誤信息
+            response_info: 要填入響應詳細信息的字典
+
+        Returns:
+            CassetteEntry 實例
+        """
+        entry = self._cassette.get(endpoint, params)
+        response_info.update({"status": entry.status, "headers": entry.headers, "url": url, "cassette": "hit"})
+        if entry.status >= 400:
+            request_url = yarl.URL(url).with_query({key: str(value) for key, value in params.items()})
+            try:
+                reason = HTTPStatus(entry.status).phrase
+            except ValueError:
+                reason = ""
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(request_url, "GET", CIMultiDictProxy(CIMultiDict()), request_url),
+                (),
+                status=entry.status,
+                message=reason,
+                headers=CIMultiDictProxy(CIMultiDict(entry.headers)),
+            )
+        return entry
+
+    @classmethod
+    def range_span(cls, resolution: str) -> int:
+        """
+        取得單一請求（也是快取區塊）涵蓋的秒數
+
+        Args:
+            resolution: 時間框架
+
+        Returns:
+            MAX_CANDLES_PER_REQUEST 根 K 線的秒數
+        """
+        return cls.RESOLUTION_SECONDS[resolution] * cls.MAX_CANDLES_PER_REQUEST
+
+    @classmethod
+    def split_time_range(cls, resolution: str, from_timestamp: int, to_timestamp: int) -> List[Tuple[int, int]]:
+        """
+        將時間區間切分為伺服器可一次回傳的子區間
+
+        子區間以 MAX_CANDLES_PER_REQUEST 根 K 線的長度對齊時間軸網格，
+        因此相同時間框架的請求總是切出相同的邊界。
+
+        Args:
+            resolution: 時間框架
+            from_timestamp: 開始時間的 Unix 時間戳（秒）
+            to_timestamp: 結束時間的 Unix 時間戳（秒）
+
+        Returns:
+            (開始時間戳, 結束時間戳) 的列表，依時間排序
+        """
+        if resolution not in cls.RESOLUTION_SECONDS:
+            raise ValueError(f"Unsupported resolution for range fetch: {resolution}")
+        if from_timestamp > to_timestamp:
+            raise ValueError(
+                f"from_timestamp ({from_timestamp}) must not be greater than to_timestamp ({to_timestamp})"
+            )
+
+        span = cls.range_span(resolution)
+        chunks = []
+        chunk_start = from_timestamp
+        while chunk_start < to_timestamp:
+            chunk_end = min((chunk_start // span + 1) * span, to_timestamp)
+            chunks.append((chunk_start, chunk_end))
+            chunk_start = chunk_end
+        return chunks or [(from_timestamp, to_timestamp)]
+
+    async def get_ohlc_range(
+        self,
+        pair: str,
+        resolution: str,
+        from_timestamp: int,
+        to_timestamp: int,
+        max_concurrency: int = DEFAULT_RANGE_CONCURRENCY,
+        *,
+        as_columns: bool = False,
+        precision: Optional[Dict[str, int]] = None,
+    ) -> Tuple[Union[Dict[str, List[Dict[str, Union[int, str]]]], OHLCColumns], Dict[str, Any]]:
+        """
+        獲取任意長度時間區間的 OHLC 數據
+
+        依時間框架將區間切分為多個子請求，在信號量限制下併發獲取，
+        最後依 timestamp 去重並排序合併。若客戶端設定了磁碟快取，
+        會以整個對齊區塊為單位讀取快取，只對未命中或未收盤的區塊發送請求。
+
+        Args:
+            pair: 交易對，例如 btc_twd
+            resolution: 時間框架
+            from_timestamp: 開始時間的 Unix 時間戳（秒）
+            to_timestamp: 結束時間的 Unix 時間戳（秒）
+            max_concurrency: 最大併發請求數
+            as_columns: 為 True 時以 OHLCColumns（NumPy 按欄格式）取代字典回傳數據
+            precision: as_columns 時各欄位保留的小數位數，提供時以定點 int64 精確儲存
+
+        Returns:
+            與 get_ohlc_data 相同格式的數據字典，
+            以及包含整體請求與各子請求詳細信息的字典
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        chunks = self.split_time_range(resolution, from_timestamp, to_timestamp)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_chunk(chunk_from: int, chunk_to: int):
+            async with semaphore:
+                return await self.get_ohlc_data(pair, resolution, chunk_from, chunk_to)
+
+        if self._cache is None:
+            self._logger.info(f"Fetching OHLC range for {pair} {resolution} in {len(chunks)} chunks")
+            results = await asyncio.gather(*(fetch_chunk(chunk_from, chunk_to) for chunk_from, chunk_to in chunks))
+        else:
+            # 伺服器的 to 為包含端點，區塊依 [開始, 結束) 切分，
+            # 因此 to_timestamp 所在的區塊也要獲取，否則對齊時 to 那根 K 線會遺漏
+            span = self.range_span(resolution)
+            bucket_starts = range(from_timestamp // span * span, to_timestamp // span * span + 1, span)
+            self._logger.info(f"Fetching OHLC range for {pair} {resolution} in {len(bucket_starts)} cached buckets")
+            results = await asyncio.gather(
+                *(self._fetch_cached_bucket(pair, resolution, start, semaphore) for start in bucket_starts)
+            )
+
+        candles_by_timestamp = {}
+        for data, _ in results:
+            for candle in data.get("data", []):
+                candles_by_timestamp[candle["timestamp"]] = candle
+
+        timestamps = sorted(candles_by_timestamp)
+        if self._cache is not None:
+            # 快取以整個區塊為單位，需要裁切回請求的區間
+            timestamps = [ts for ts in timestamps if from_timestamp * 1000 <= ts <= to_timestamp * 1000]
+
+        merged = {"data": [candles_by_timestamp[ts] for ts in timestamps]}
+        request_info = {
+            "pair": pair,
+            "resolution": resolution,
+            "from": from_timestamp,
+            "to": to_timestamp,
+            "chunks": len(chunks),
+        }
+        req_resp = {"request": request_info, "chunks": [chunk_req_resp for _, chunk_req_resp in results]}
+        if self._cache is not None:
+            req_resp["cache"] = self._cache.stats.to_dict()
+        if as_columns:
+            return OHLCColumns.from_response(merged, precision), req_resp
+        return merged, req_resp
+
+    async def _fetch_cached_bucket(
+        self, pair: str, resolution: str, chunk_from: int, semaphore: asyncio.Semaphore
+    ) -> Tuple[Dict[str, List[Dict[str, Union[int, str]]]], Dict[str, Any]]:
+        """
+        透過磁碟快取獲取 chunk_from 所在的整個對齊區塊
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+            chunk_from: 子區間的開始時間戳（秒）
+            semaphore: 限制併發請求數的信號量
+
+        Returns:
+            區塊內的 OHLC 數據，以及請求和響應詳細信息
+        """
+        span = self.range_span(resolution)
+        bucket_start = chunk_from // span * span
+        bucket_end = bucket_start + span
+        request_info = {"pair": pair, "resolution": resolution, "from": bucket_start, "to": bucket_end}
+
+        candles = self._cache.get(pair, resolution, bucket_start, namespace=self.base_url)
+        if candles is not None:
+            return {"data": candles}, {"request": request_info, "response": {"cache": "hit"}}
+
+        async with semaphore:
+            data, req_resp = await self.get_ohlc_data(pair, resolution, bucket_start, bucket_end)
+        candles = [
+            candle for candle in data.get("data", []) if bucket_start * 1000 <= candle["timestamp"] < bucket_end * 1000
+        ]
+        self._cache.put(pair, resolution, bucket_start, bucket_end, candles, namespace=self.base_url)
+        return {"data": candles}, req_resp
+
+    @staticmethod
+    def build_ohlc_jobs(
+        pairs: Iterable[str], resolutions: Iterable[str], from_timestamp: int, to_timestamp: int
+    ) -> List[OHLCJob]:
+        """
+        建立交易對 × 時間框架的批次請求矩陣
+
+        Args:
+            pairs: 交易對列表
+            resolutions: 時間框架列表
+            from_timestamp: 開始時間的 Unix 時間戳（秒）
+            to_timestamp: 結束時間的 Unix 時間戳（秒）
+
+        Returns:
+            OHLCJob 列表
+        """
+        resolutions = list(resolutions)
+        return [OHLCJob(pair, resolution, from_timestamp, to_timestamp) for pair in pairs for resolution in resolutions]
+
+    async def iter_ohlc_batch(
+        self,
+        jobs: Iterable[OHLCJob],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[OHLCJobResult]:
+        """
+        併發執行多個 OHLC 請求，並依完成順序逐一產出結果
+
+        單一請求失敗不會中斷整個批次，錯誤會記錄在對應的 OHLCJobResult.error。
+        若呼叫端提前結束迭代，尚未完成的請求會被取消。
+
+        Args:
+            jobs: OHLCJob 列表
+            max_concurrency: 最大併發請求數
+            timeout: 單一請求的逾時秒數（不含排隊等待時間），None 表示不限制
+
+        Yields:
+            依完成順序排列的 OHLCJobResult
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(job: OHLCJob) -> OHLCJobResult:
+            try:
+                data, req_resp = await self.get_ohlc_data(
+                    job.pair, job.resolution, job.from_timestamp, job.to_timestamp
+                )
+            except Exception as e:
+                # 請求本身的錯誤（包含 deadline 與 aiohttp 的逾時）保留原始例外
+                return OHLCJobResult(job=job, error=e)
+            return OHLCJobResult(job=job, data=data, req_resp=req_resp)
+
+        async def run_job(job: OHLCJob) -> OHLCJobResult:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(fetch(job), timeout)
+                except asyncio.TimeoutError:
+                    # fetch 不會拋出例外，到這裡只可能是批次層級的 timeout
+                    error = asyncio.TimeoutError(f"OHLC request timed out after {timeout}s")
+                    return OHLCJobResult(job=job, error=error)
+
+        tasks = [asyncio.ensure_future(run_job(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def rate_limit_metrics(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """
+        取得速率限制器的等待統計
+
+        Returns:
+            各端點的等待統計，未設定速率限制器時為空字典
+        """
+        return self._rate_limiter.metrics() if self._rate_limiter is not None else {}
+
+    def timing_summary(self) -> Dict[str, Union[int, Dict[str, float]]]:
+        """
+        取得此客戶端所有成功請求的各階段耗時統計
+
+        Returns:
+            各階段（dns、connect、ttfb、transfer、decode、total）的統計
+        """
+        return self.timing_stats.summary()
+
+    async def stream_ohlc_data(
+        self,
+        pair: str,
+        resolution: str,
+        from_timestamp: int,
+        to_timestamp: int,
+        batch_size: int = 1000,
+        *,
+        as_columns: bool = False,
+        precision: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[Union[List[Dict[str, Union[int, str]]], OHLCColumns]]:
+        """
+        以串流方式獲取 OHLC 數據，邊下載邊解析並分批產出
+
+        只發送單一請求，與併發執行多個 OHLCJob 的 iter_ohlc_batch 不同。
+        響應內容不會整份緩衝，記憶體用量只與 batch_size 有關，
+        呼叫端可以在下載尚未完成時就開始驗證已收到的 K 線。
+        串流模式不套用重試、對沖與請求合併。
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+            from_timestamp: 開始時間的 Unix 時間戳
+            to_timestamp: 結束時間的 Unix 時間戳
+            batch_size: 每批最多的 K 線數量
+            as_columns: 為 True 時每批以 OHLCColumns 產出
+            precision: as_columns 時各欄位保留的小數位數
+
+        Yields:
+            K 線字典列表，或 as_columns 時的 OHLCColumns
+        """
+        if self._session is None:
+            raise RuntimeError("Session is not initialized. Use 'async with' context manager.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        endpoint = f"/trading-history/{pair}"
+        params = {"resolution": resolution, "from": from_timestamp, "to": to_timestamp}
+        self._logger.info("Streaming OHLC data: {}{} with params: {}", self.base_url, endpoint, params)
+
+        decoder = OHLCStreamDecoder()
+        batch: List[Dict[str, Union[int, str]]] = []
+        async for chunk in self._stream_chunks(endpoint, params):
+            batch.extend(decoder.feed(chunk))
+            while len(batch) >= batch_size:
+                ready, batch = batch[:batch_size], batch[batch_size:]
+                yield OHLCColumns.from_records(ready, precision) if as_columns else ready
+        decoder.close()
+
+        if batch:
+            yield OHLCColumns.from_records(batch, precision) if as_columns else batch
+        self._logger.debug(f"Streamed {decoder.items_decoded} candles in {decoder.bytes_received} bytes")
+
+    async def _stream_chunks(self, endpoint: str, params: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """
+        逐塊產出響應內容
+
+        重播模式下從卡帶讀取並以 STREAM_CHUNK_SIZE 切塊，與實際串流的行為一致；
+        錄製模式下保留已收到的區塊，串流結束後整份寫入卡帶。
+
+        Args:
+            endpoint: 相對於 API 根網址的路徑
+            params: 查詢參數
+
+        Yields:
+            響應內容的區塊
+        """
+        url = f"{self.base_url}{endpoint}"
+        if self._cassette is not None and self._cassette.replaying:
+            body = self._replay_entry(endpoint, params, url, {}).body
+            for offset in range(0, len(body), self.STREAM_CHUNK_SIZE):
+                yield body[offset : offset + self.STREAM_CHUNK_SIZE]
+            return
+
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire(self.OHLC_RATE_LIMIT_ENDPOINT)
+
+        async with self._session.get(url, params=params) as response:
+            if self._rate_limiter is not None:
+                self._rate_limiter.update_from_response(
+                    self.OHLC_RATE_LIMIT_ENDPOINT, response.status, response.headers
+                )
+            if self._cassette is not None and response.status >= 400:
+                self._cassette.record(endpoint, params, response.status, response.headers, await response.read())
+            response.raise_for_status()
+
+            chunks: List[bytes] = []
+            async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                if self._cassette is not None:
+                    chunks.append(chunk)
+                yield chunk
+            if self._cassette is not None:
+                self._cassette.record(endpoint, params, response.status, response.headers, b"".join(chunks))
@@ -0,0 +1,59 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict
+
+# 完整保存響應內容
+CAPTURE_FULL = "full"
+# 只保存 data 的前後幾筆
+CAPTURE_TRUNCATED = "truncated"
+# 只保存響應內容的雜湊值與大小
+CAPTURE_HASH = "hash"
+
+CAPTURE_MODES = (CAPTURE_FULL, CAPTURE_TRUNCATED, CAPTURE_HASH)
+
+
+@dataclass(frozen=True)
+class CapturePolicy:
+    """決定 req_resp["response"]["body"] 保存多少響應內容"""
+
+    mode: str = CAPTURE_FULL
+    # truncated 模式保留的前後筆數
+    head: int = 3
+    tail: int = 3
+
+    def __post_init__(self):
+        if self.mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {self.mode}, expected one of {CAPTURE_MODES}")
+
+    def capture(self, data: Any, raw_body: bytes = b"") -> Any:
+        """
+        依模式產生要保存的響應內容
+
+        Args:
+            data: 解析後的響應內容
+            raw_body: 原始響應位元組，hash 模式使用
+
+        Returns:
+            full 模式為原本的 data（不複製），其餘為精簡後的摘要字典
+        """
+        if self.mode == CAPTURE_FULL:
+            return data
+
+        items = data.get("data") if isinstance(data, dict) else None
+        if self.mode == CAPTURE_HASH:
+            summary: Dict[str, Any] = {"sha256": hashlib.sha256(raw_body).hexdigest(), "bytes": len(raw_body)}
+            if isinstance(items, list):
+                summary["data_count"] = len(items)
+            return summary
+
+        if not isinstance(items, list):
+            return data
+        summary = {key: value for key, value in data.items() if key != "data"}
+        summary["data_count"] = len(items)
+        if len(items) <= self.head + self.tail:
+            summary["data"] = items
+        else:
+            summary["data_head"] = items[: self.head]
+            summary["data_tail"] = items[len(items) - self.tail :] if self.tail else []
+            summary["truncated"] = True
+        return summary
@@ -0,0 +1,185 @@
+import sqlite3
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, Mapping, Union
+from urllib.parse import urlencode
+
+import orjson
+
+# 錄製模式：照常發送請求，並將響應寫入卡帶
+CASSETTE_RECORD = "record"
+# 重播模式：只從卡帶讀取響應，不發送任何網路請求
+CASSETTE_REPLAY = "replay"
+CASSETTE_MODES = (CASSETTE_RECORD, CASSETTE_REPLAY)
+
+
+class CassetteMiss(LookupError):
+    """重播模式下卡帶中沒有對應請求的錄製內容"""
+
+
+@dataclass
+class CassetteEntry:
+    """一次錄製的響應"""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    recorded_at: float
+
+
+@dataclass
+class CassetteStats:
+    """卡帶的讀寫統計"""
+
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class Cassette:
+    """
+    以 SQLite 保存 API 響應的錄製卡帶
+
+    每筆錄製以請求鍵（端點路徑加上排序後的查詢參數，不含主機，因此正式網址與模擬伺服器共用同一份卡帶）
+    為主鍵，響應內容以 zlib 壓縮後保存。重播時每次請求只做一次主鍵查詢，
+    開啟卡帶不需要載入全部內容，錄製數量多時也不影響啟動時間。
+    同一請求重複錄製時保留最後一次的響應。錄製時使用 WAL 模式並逐筆提交，
+    多個 worker 行程可以同時錄製到同一份卡帶。
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = CASSETTE_REPLAY, compression_level: int = 6):
+        """
+        開啟錄製卡帶
+
+        Args:
+            path: SQLite 檔案路徑，錄製模式下不存在時會建立
+            mode: CASSETTE_RECORD 或 CASSETTE_REPLAY
+            compression_level: zlib 壓縮等級（0 到 9）
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.compression_level = compression_level
+        self.stats = CassetteStats()
+
+        if mode == CASSETTE_REPLAY:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            # 重播時以唯讀方式開啟，多個行程可以同時讀取同一份卡帶
+            self._connection = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), timeout=30.0)
+            # WAL 模式下逐筆提交不需要每次 fsync，寫入鎖只在單筆 INSERT 期間持有
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS interactions (
+                    request_key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers BLOB NOT NULL,
+                    body BLOB NOT NULL,
+                    recorded_at REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._connection.commit()
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == CASSETTE_REPLAY
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @staticmethod
+    def request_key(endpoint: str, params: Mapping[str, Any]) -> str:
+        """
+        建立請求鍵
+
+        Args:
+            endpoint: 相對於 API 根網址的路徑，例如 "/trading-history/btc_twd"
+            params: 查詢參數
+
+        Returns:
+            例如 "/trading-history/btc_twd?from=0&resolution=1h&to=3600"
+        """
+        return f"{endpoint}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+    def get(self, endpoint: str, params: Mapping[str, Any]) -> CassetteEntry:
+        """
+        讀取錄製的響應
+
+        Args:
+            endpoint: 相對於 API 根網址的路徑
+            params: 查詢參數
+
+        Returns:
+            CassetteEntry 實例
+
+        Raises:
+            CassetteMiss: 卡帶中沒有此請求
+        """
+        key = self.request_key(endpoint, params)
+        row = self._connection.execute(
+            "SELECT status, headers, body, recorded_at FROM interactions WHERE request_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.stats.misses += 1
+            raise CassetteMiss(f"No recorded interaction for {key} in {self.path}")
+        self.stats.hits += 1
+        status, headers, body, recorded_at = row
+        return CassetteEntry(
+            status=status,
+            headers=orjson.loads(zlib.decompress(headers)),
+            body=zlib.decompress(body),
+            recorded_at=recorded_at,
+        )
+
+    def record(
+        self, endpoint: str, params: Mapping[str, Any], status: int, headers: Mapping[str, str], body: bytes
+    ) -> None:
+        """
+        錄製一次響應
+
+        Args:
+            endpoint: 相對於 API 根網址的路徑
+            params: 查詢參數
+            status: HTTP 狀態碼
+            headers: 響應標頭
+            body: 原始響應內容
+        """
+        if self.replaying:
+            raise RuntimeError("Cannot record to a cassette opened for replay")
+        self._connection.execute(
+            "INSERT OR REPLACE INTO interactions (request_key, status, headers, body, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                self.request_key(endpoint, params),
+                status,
+                zlib.compress(orjson.dumps({str(k): str(v) for k, v in headers.items()}), self.compression_level),
+                zlib.compress(body, self.compression_level),
+                time.time(),
+            ),
+        )
+        self._connection.commit()
+        self.stats.recorded += 1
+        logger.debug(f"Recorded interaction {self.request_key(endpoint, params)} ({len(body)} bytes)")
+
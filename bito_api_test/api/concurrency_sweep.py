@@ -0,0 +1,286 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .latency_histogram import LatencyHistogram
+
+# 停止掃描的原因
+STOP_MAX_CONCURRENCY = "max_concurrency"
+STOP_PLATEAU = "plateau"
+STOP_ERROR_RATE = "error_rate"
+STOP_LATENCY = "latency"
+
+# 請求失敗後 worker 暫停的起始秒數，連續失敗時加倍，成功後重設
+DEFAULT_FAILURE_BACKOFF = 0.05
+MAX_FAILURE_BACKOFF = 1.0
+
+# 錯誤率提前判定超過上限前至少需要完成的請求數，避免少數早期失敗就結束量測
+EARLY_STOP_MIN_REQUESTS = 20
+
+
+@dataclass
+class SweepLevel:
+    """單一併發級別的量測結果"""
+
+    concurrency: int
+    elapsed: float = 0.0
+    succeeded: int = 0
+    failed: int = 0
+    stopped_early: bool = False
+    latencies: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """每秒成功完成的請求數"""
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        total = self.succeeded + self.failed
+        return self.failed / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "elapsed": self.elapsed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "throughput": self.throughput,
+            "error_rate": self.error_rate,
+            "stopped_early": self.stopped_early,
+            "latency": self.latencies.summary(),
+        }
+
+
+@dataclass
+class SweepResult:
+    """併發掃描的結果，knee 為吞吐量開始趨於平緩的併發級別"""
+
+    levels: List[SweepLevel] = field(default_factory=list)
+    stop_reason: Optional[str] = None
+    knee: Optional[SweepLevel] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stop_reason": self.stop_reason,
+            "knee_concurrency": self.knee.concurrency if self.knee is not None else None,
+            "knee_throughput": self.knee.throughput if self.knee is not None else None,
+            "levels": [level.to_dict() for level in self.levels],
+        }
+
+    def summary(self) -> str:
+        """
+        產生適合附加到測試報告的文字摘要
+
+        Returns:
+            各併發級別的吞吐量與延遲表格
+        """
+        knee = self.knee.concurrency if self.knee is not None else "-"
+        report = f"飽和點（knee）併發級別: {knee}，停止原因: {self.stop_reason}\n\n"
+        report += "| 併發級別 | 吞吐量 (req/s) | 錯誤率 | p50 (秒) | p99 (秒) |\n"
+        report += "|----------|----------------|--------|----------|----------|\n"
+        for level in self.levels:
+            p50, p99 = level.latencies.percentile(50), level.latencies.percentile(99)
+            latency = " | ".join("-" if value is None else f"{value:.4f}" for value in (p50, p99))
+            marker = " ←" if level is self.knee else ""
+            report += f"| {level.concurrency}{marker} | {level.throughput:.2f} | {level.error_rate:.2%} | {latency} |\n"
+        return report
+
+    def to_svg(self, width: int = 640, height: int = 360) -> str:
+        """
+        繪製吞吐量與 p99 延遲對併發級別的曲線（x 軸為對數刻度）
+
+        Args:
+            width: 圖片寬度
+            height: 圖片高度
+
+        Returns:
+            SVG 字串，可直接以 allure.attachment_type.SVG 附加
+        """
+        margin = 50
+        plot_width, plot_height = width - 2 * margin, height - 2 * margin
+        concurrencies = [math.log2(level.concurrency) for level in self.levels]
+        throughputs = [level.throughput for level in self.levels]
+        latencies = [level.latencies.percentile(99) or 0.0 for level in self.levels]
+        x_max = max(concurrencies[-1] if concurrencies else 0.0, 1.0)
+        y_max = max(throughputs, default=0.0) or 1.0
+        latency_max = max(latencies, default=0.0) or 1.0
+
+        def point(index: int, value: float, maximum: float) -> str:
+            x = margin + concurrencies[index] / x_max * plot_width
+            y = margin + plot_height - value / maximum * plot_height
+            return f"{x:.1f},{y:.1f}"
+
+        throughput_points = " ".join(point(i, value, y_max) for i, value in enumerate(throughputs))
+        latency_points = " ".join(point(i, value, latency_max) for i, value in enumerate(latencies))
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-size="12">',
+            f'<rect width="{width}" height="{height}" fill="white"/>',
+            f'<line x1="{margin}" y1="{margin + plot_height}" x2="{margin + plot_width}" '
+            f'y2="{margin + plot_height}" stroke="black"/>',
+            f'<line x1="{margin}" y1="{margin}" x2="{margin}" y2="{margin + plot_height}" stroke="black"/>',
+            f'<polyline points="{throughput_points}" fill="none" stroke="steelblue" stroke-width="2"/>',
+            f'<polyline points="{latency_points}" fill="none" stroke="indianred" stroke-width="2" '
+            f'stroke-dasharray="4 2"/>',
+            f'<text x="{margin}" y="{margin - 20}" fill="steelblue">吞吐量 (最大 {y_max:.2f} req/s)</text>',
+            f'<text x="{margin + plot_width}" y="{margin - 20}" fill="indianred" text-anchor="end">'
+            f"p99 延遲 (最大 {latency_max:.3f} 秒)</text>",
+        ]
+        for i, level in enumerate(self.levels):
+            x = point(i, 0.0, 1.0).split(",")[0]
+            parts.append(
+                f'<text x="{x}" y="{margin + plot_height + 16}" text-anchor="middle">{level.concurrency}</text>'
+            )
+            if level is self.knee:
+                cx, cy = point(i, level.throughput, y_max).split(",")
+                parts.append(f'<circle cx="{cx}" cy="{cy}" r="6" fill="none" stroke="darkorange" stroke-width="2"/>')
+        parts.append(
+            f'<text x="{margin + plot_width / 2}" y="{height - 10}" text-anchor="middle">併發級別</text></svg>'
+        )
+        return "".join(parts)
+
+
+def find_knee(levels: List[SweepLevel]) -> Optional[SweepLevel]:
+    """
+    找出吞吐量曲線的拐點（Kneedle 方法）
+
+    將 log2(併發級別) 與吞吐量分別正規化到 0 到 1，取曲線高於對角線最多的點，
+    即增加併發後吞吐量不再等比例增加的位置。少於三個級別時取吞吐量最高者。
+
+    Args:
+        levels: 依併發級別遞增排列的量測結果
+
+    Returns:
+        拐點所在的級別，沒有資料時為 None
+    """
+    if not levels:
+        return None
+    if len(levels) < 3:
+        return max(levels, key=lambda level: level.throughput)
+    xs = [math.log2(level.concurrency) for level in levels]
+    ys = [level.throughput for level in levels]
+    x_span = (xs[-1] - xs[0]) or 1.0
+    y_min, y_span = min(ys), (max(ys) - min(ys)) or 1.0
+    distances = [(y - y_min) / y_span - (x - xs[0]) / x_span for x, y in zip(xs, ys)]
+    return levels[max(range(len(levels)), key=distances.__getitem__)]
+
+
+async def measure_concurrency(
+    request_factory: Callable[[], Awaitable[Any]],
+    concurrency: int,
+    duration: float,
+    failure_backoff: float = DEFAULT_FAILURE_BACKOFF,
+    max_error_rate: Optional[float] = None,
+) -> SweepLevel:
+    """
+    以封閉模型量測單一併發級別：concurrency 個 worker 在 duration 秒內連續發送請求
+
+    請求失敗後 worker 會先等待 failure_backoff 秒（連續失敗時加倍）再發送下一個請求，
+    避免快速失敗的端點被大量請求轟炸。設定 max_error_rate 時，完成的請求數足夠且錯誤率已超過上限，
+    即提前結束此級別的量測。
+
+    Args:
+        request_factory: 每次呼叫回傳一個請求協程的函數
+        concurrency: 同時進行的請求數
+        duration: 量測秒數，進行中的請求會等待完成
+        failure_backoff: 請求失敗後的起始等待秒數
+        max_error_rate: 提前結束量測的錯誤率上限，None 表示不提前結束
+
+    Returns:
+        SweepLevel 實例
+    """
+    level = SweepLevel(concurrency=concurrency)
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+
+    async def worker() -> None:
+        backoff = failure_backoff
+        while time.perf_counter() < deadline and not level.stopped_early:
+            sent_at = time.perf_counter()
+            try:
+                await request_factory()
+            except Exception:
+                level.failed += 1
+                if (
+                    max_error_rate is not None
+                    and level.succeeded + level.failed >= EARLY_STOP_MIN_REQUESTS
+                    and level.error_rate > max_error_rate
+                ):
+                    level.stopped_early = True
+                    return
+                await asyncio.sleep(max(min(backoff, deadline - time.perf_counter()), 0))
+                backoff = min(backoff * 2, MAX_FAILURE_BACKOFF)
+                continue
+            backoff = failure_backoff
+            level.succeeded += 1
+            level.latencies.record(time.perf_counter() - sent_at)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    level.elapsed = time.perf_counter() - started_at
+    return level
+
+
+async def run_concurrency_sweep(
+    request_factory: Callable[[], Awaitable[Any]],
+    start: int = 1,
+    factor: int = 2,
+    max_concurrency: int = 64,
+    level_duration: float = 5.0,
+    plateau_gain: float = 0.1,
+    max_error_rate: float = 0.01,
+    max_p99: Optional[float] = None,
+) -> SweepResult:
+    """
+    以等比遞增的併發級別量測吞吐量與延遲，直到飽和或違反 SLO
+
+    吞吐量相較目前最佳值的增幅低於 plateau_gain、錯誤率超過 max_error_rate，
+    或 p99 延遲超過 max_p99 時停止掃描。錯誤率明顯超過上限的級別會提前結束量測。
+
+    Args:
+        request_factory: 每次呼叫回傳一個請求協程的函數
+        start: 起始併發級別
+        factor: 每一級的倍數
+        max_concurrency: 最高併發級別
+        level_duration: 每一級的量測秒數
+        plateau_gain: 視為吞吐量已趨平的最小相對增幅
+        max_error_rate: 錯誤率上限
+        max_p99: p99 延遲上限（秒），None 表示不檢查
+
+    Returns:
+        SweepResult 實例
+    """
+    if start < 1 or factor < 2 or max_concurrency < start:
+        raise ValueError("start must be at least 1, factor at least 2 and max_concurrency at least start")
+
+    result = SweepResult()
+    best_throughput = 0.0
+    concurrency = start
+    while True:
+        level = await measure_concurrency(request_factory, concurrency, level_duration, max_error_rate=max_error_rate)
+        result.levels.append(level)
+        p99 = level.latencies.percentile(99)
+        logger.info(
+            f"Concurrency {concurrency}: {level.throughput:.2f} req/s, "
+            f"error rate {level.error_rate:.2%}, p99 {p99 if p99 is not None else '-'}"
+        )
+
+        if level.error_rate > max_error_rate:
+            result.stop_reason = STOP_ERROR_RATE
+        elif max_p99 is not None and p99 is not None and p99 > max_p99:
+            result.stop_reason = STOP_LATENCY
+        elif len(result.levels) > 1 and level.throughput < best_throughput * (1 + plateau_gain):
+            result.stop_reason = STOP_PLATEAU
+        elif concurrency * factor > max_concurrency:
+            result.stop_reason = STOP_MAX_CONCURRENCY
+        if result.stop_reason is not None:
+            break
+        best_throughput = max(best_throughput, level.throughput)
+        concurrency *= factor
+
+    # 違反 SLO 的最後一級不列入拐點候選
+    violated = result.stop_reason in (STOP_ERROR_RATE, STOP_LATENCY) and len(result.levels) > 1
+    result.knee = find_knee(result.levels[:-1] if violated else result.levels)
+    return result
@@ -0,0 +1,88 @@
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Sequence
+
+import numpy as np
+
+# OHLC 各欄位預設保留的小數位數
+DEFAULT_PRECISION: Dict[str, int] = {"open": 8, "high": 8, "low": 8, "close": 8, "volume": 8}
+
+# int64 可完整表示的最大十進位位數
+_MAX_INT64_DIGITS = 18
+
+
+def parse_fixed_point(values: Sequence[str], scale: int) -> np.ndarray:
+    """
+    將十進位字串精確轉換為放大 10**scale 倍的 int64 陣列
+
+    一般格式（可選正負號、整數部分、小數點、小數部分）以 NumPy 字串運算一次處理；
+    科學記號或小數位數超過 scale 的少數值才逐一以 Decimal 檢查。
+    無法精確表示的值（非數字、捨去後會失真、超出 int64 範圍）會引發 ValueError。
+
+    Args:
+        values: 十進位字串序列，例如 ["4099.99", "13.35162928"]
+        scale: 保留的小數位數
+
+    Returns:
+        int64 陣列，例如 scale=2 時 "4099.99" 轉換為 409999
+    """
+    if scale < 0:
+        raise ValueError("scale must not be negative")
+
+    strings = np.asarray(values, dtype=np.str_)
+    if strings.size == 0:
+        return np.empty(0, dtype=np.int64)
+
+    negative = np.char.startswith(strings, "-")
+    unsigned = np.char.lstrip(strings, "+-")
+    parts = np.char.partition(unsigned, ".")
+    integer_part, fraction_part = parts[:, 0], parts[:, 2]
+    integer_length, fraction_length = np.char.str_len(integer_part), np.char.str_len(fraction_part)
+
+    digits = np.char.add(integer_part, np.char.ljust(fraction_part, scale, "0"))
+    regular = (
+        (np.char.str_len(strings) - np.char.str_len(unsigned) <= 1)
+        & (integer_length + fraction_length > 0)
+        & ((integer_length == 0) | np.char.isdigit(integer_part))
+        & ((fraction_length == 0) | np.char.isdigit(fraction_part))
+        & (fraction_length <= scale)
+        & (np.char.str_len(digits) <= _MAX_INT64_DIGITS)
+    )
+
+    result = np.zeros(strings.shape, dtype=np.int64)
+    result[regular] = digits[regular].astype(np.int64)
+    result[negative & regular] *= -1
+
+    for index in np.flatnonzero(~regular):
+        result[index] = _parse_decimal(str(strings[index]), scale)
+    return result
+
+
+def _parse_decimal(value: str, scale: int) -> int:
+    """以 Decimal 精確解析單一值，無法精確表示時引發 ValueError"""
+    try:
+        scaled = Decimal(value).scaleb(scale)
+    except InvalidOperation:
+        raise ValueError(f"Invalid decimal value: {value!r}") from None
+    if not scaled.is_finite() or scaled != scaled.to_integral_value():
+        raise ValueError(f"Value {value!r} cannot be represented exactly with {scale} decimal places")
+    integer = int(scaled)
+    if not np.iinfo(np.int64).min <= integer <= np.iinfo(np.int64).max:
+        raise ValueError(f"Value {value!r} is out of int64 range with {scale} decimal places")
+    return integer
+
+
+def format_fixed_point(value: int, scale: int) -> str:
+    """
+    將定點整數轉換回十進位字串（去除多餘的尾端 0）
+
+    Args:
+        value: 放大 10**scale 倍的整數
+        scale: 小數位數
+
+    Returns:
+        十進位字串，例如 format_fixed_point(409999, 2) 為 "4099.99"
+    """
+    text = format(Decimal(int(value)).scaleb(-scale), "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text
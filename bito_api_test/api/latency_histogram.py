@@ -0,0 +1,188 @@
+import math
+from typing import Any, Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    固定記憶體、可合併的延遲直方圖
+
+    以對數刻度分桶，每個桶的寬度為下界的 precision 倍，任何延遲的百分位數誤差都在 precision 以內，
+    不論記錄多少樣本，記憶體都只有固定數量的計數器。分桶設定相同的直方圖可以直接相加合併，
+    因此多次執行或多個 worker 的結果可以序列化後再彙整。
+    小於 lowest 的值計入第一個桶，大於 highest 的值計入最後一個桶，min 與 max 仍保留精確值。
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600.0, precision: float = 0.01):
+        """
+        初始化延遲直方圖
+
+        Args:
+            lowest: 可區分的最小延遲（秒）
+            highest: 可區分的最大延遲（秒）
+            precision: 相對誤差上限，例如 0.01 表示 1%
+        """
+        if not 0 < lowest < highest:
+            raise ValueError("lowest must be positive and less than highest")
+        if not 0 < precision < 1:
+            raise ValueError("precision must be between 0 and 1")
+        self.lowest = lowest
+        self.highest = highest
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        bucket_count = math.ceil(math.log(highest / lowest) / self._log_base) + 1
+        self.counts = np.zeros(bucket_count, dtype=np.int64)
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def mean(self) -> Optional[float]:
+        count = self.count
+        return self.total / count if count else None
+
+    def _indices(self, values: np.ndarray) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            scaled = np.log(np.maximum(values, self.lowest) / self.lowest) / self._log_base
+        return np.clip(scaled.astype(np.int64), 0, len(self.counts) - 1)
+
+    def record(self, value: float) -> None:
+        """
+        記錄一個延遲
+
+        Args:
+            value: 延遲秒數
+        """
+        self.record_many((value,))
+
+    def record_many(self, values: Union[Sequence[float], np.ndarray]) -> None:
+        """
+        一次記錄多個延遲
+
+        Args:
+            values: 延遲秒數序列
+        """
+        array = np.asarray(values, dtype=np.float64)
+        if array.size == 0:
+            return
+        if np.any(array < 0) or not np.all(np.isfinite(array)):
+            raise ValueError("latencies must be finite and non-negative")
+        self.counts += np.bincount(self._indices(array), minlength=len(self.counts))
+        self.total += float(array.sum())
+        low, high = float(array.min()), float(array.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        查詢百分位數
+
+        Args:
+            percentile: 0 到 100 之間的百分位數
+
+        Returns:
+            對應的延遲秒數（誤差在 precision 以內），沒有樣本時為 None
+        """
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        count = self.count
+        if not count:
+            return None
+        if percentile == 0:
+            return self.min
+        if percentile == 100:
+            return self.max
+        rank = max(math.ceil(percentile / 100 * count), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        # 取桶的幾何中點，並限制在實際的最小與最大值之間
+        value = self.lowest * math.exp((index + 0.5) * self._log_base)
+        return min(max(value, self.min), self.max)
+
+    def percentiles(self, percentiles: Iterable[float]) -> Dict[str, Optional[float]]:
+        """
+        查詢多個百分位數
+
+        Args:
+            percentiles: 百分位數序列
+
+        Returns:
+            以 "p50"、"p99.9" 等為鍵的百分位數字典
+        """
+        return {f"p{p:g}": self.percentile(p) for p in percentiles}
+
+    def _check_compatible(self, other: "LatencyHistogram") -> None:
+        if (self.lowest, self.highest, self.precision) != (other.lowest, other.highest, other.precision):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        將另一個直方圖的樣本併入此直方圖
+
+        Args:
+            other: 分桶設定相同的直方圖
+
+        Returns:
+            自身，方便串接
+        """
+        self._check_compatible(other)
+        self.counts += other.counts
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> Dict[str, Optional[float]]:
+        """
+        取得樣本數、平均、最小、最大與百分位數
+
+        Args:
+            percentiles: 要列出的百分位數
+
+        Returns:
+            統計字典（秒）
+        """
+        summary = {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max}
+        return {**summary, **self.percentiles(percentiles)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        序列化為可轉成 JSON 的字典，只保存非零的桶
+
+        Returns:
+            可傳給 from_dict 還原的字典
+        """
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            "lowest": self.lowest,
+            "highest": self.highest,
+            "precision": self.precision,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": nonzero.tolist(),
+            "counts": self.counts[nonzero].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        從 to_dict 的結果還原直方圖
+
+        Args:
+            data: to_dict 產生的字典
+
+        Returns:
+            LatencyHistogram 實例
+        """
+        histogram = cls(data["lowest"], data["highest"], data["precision"])
+        histogram.counts[np.asarray(data["buckets"], dtype=np.int64)] = np.asarray(data["counts"], dtype=np.int64)
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from loguru import logger
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Set
+
+from .latency_histogram import LatencyHistogram
+
+# 報告中列出的百分位數
+LOAD_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+@dataclass
+class LoadResult:
+    """
+    開放模型負載測試的結果
+
+    latencies 從排程的預定發送時間起算（修正協調遺漏），
+    service_times 從實際發送時間起算，兩者差距即為客戶端排程落後造成的排隊時間。
+    """
+
+    target_rate: float
+    duration: float
+    scheduled: int = 0
+    sent: int = 0
+    succeeded: int = 0
+    # 同時進行中的請求達到上限而未發送的數量
+    dropped: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    latencies: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
+    service_times: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """每秒成功完成的請求數"""
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """失敗與未發送的請求佔排程請求的比例"""
+        return (self.failed + self.dropped) / self.scheduled if self.scheduled else 0.0
+
+    def record_error(self, error: BaseException) -> None:
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def latency_percentiles(self, percentiles: Sequence[float] = LOAD_PERCENTILES) -> Dict[str, Optional[float]]:
+        """成功請求的延遲百分位數（秒，從預定發送時間起算）"""
+        return self.latencies.percentiles(percentiles)
+
+    def service_time_percentiles(self, percentiles: Sequence[float] = LOAD_PERCENTILES) -> Dict[str, Optional[float]]:
+        """成功請求的服務時間百分位數（秒，從實際發送時間起算）"""
+        return self.service_times.percentiles(percentiles)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "target_rate": self.target_rate,
+            "duration": self.duration,
+            "elapsed": self.elapsed,
+            "scheduled": self.scheduled,
+            "sent": self.sent,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "errors": dict(self.errors),
+            "throughput": self.throughput,
+            "error_rate": self.error_rate,
+            "latency": self.latency_percentiles(),
+            "service_time": self.service_time_percentiles(),
+            "latency_histogram": self.latencies.to_dict(),
+            "service_time_histogram": self.service_times.to_dict(),
+        }
+
+    def summary(self) -> str:
+        """
+        產生適合附加到測試報告的文字摘要
+
+        Returns:
+            包含吞吐量、錯誤率與延遲百分位數的 Markdown 表格
+        """
+        latency = self.latency_percentiles()
+        service_time = self.service_time_percentiles()
+        report = f"目標速率: {self.target_rate:g} req/s，持續 {self.duration:g} 秒（實際 {self.elapsed:.2f} 秒）\n"
+        report += f"排程 {self.scheduled}，發送 {self.sent}，成功 {self.succeeded}，失敗 {self.failed}，"
+        report += f"未發送 {self.dropped}\n"
+        report += f"吞吐量: {self.throughput:.2f} req/s，錯誤率: {self.error_rate:.2%}\n\n"
+        report += "| 百分位數 | 延遲 (秒) | 服務時間 (秒) |\n"
+        report += "|----------|-----------|---------------|\n"
+        for key in latency:
+            cells = " | ".join("-" if value is None else f"{value:.4f}" for value in (latency[key], service_time[key]))
+            report += f"| {key} | {cells} |\n"
+        return report
+
+
+async def run_open_load(
+    request_factory: Callable[[], Awaitable[Any]],
+    rate: float,
+    duration: float,
+    max_in_flight: int = 1000,
+) -> LoadResult:
+    """
+    以開放模型依固定速率發送請求
+
+    第 i 個請求的預定發送時間為 start + i / rate，不論先前的請求是否完成，
+    因此伺服器變慢時會反映為排隊與延遲上升，而不是發送速率下降。
+    延遲從預定發送時間起算，事件循環忙碌導致的發送落後也會計入（修正協調遺漏）。
+
+    Args:
+        request_factory: 每次呼叫回傳一個請求協程的函數
+        rate: 每秒發送的請求數
+        duration: 持續秒數
+        max_in_flight: 同時進行中請求的上限，超過時該次請求記為未發送
+
+    Returns:
+        LoadResult 實例
+    """
+    if rate <= 0 or duration <= 0:
+        raise ValueError("rate and duration must be positive")
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1")
+
+    result = LoadResult(target_rate=rate, duration=duration, scheduled=int(rate * duration))
+    in_flight: Set[asyncio.Task] = set()
+
+    async def fire(intended_at: float) -> None:
+        sent_at = time.perf_counter()
+        try:
+            await request_factory()
+        except Exception as e:
+            result.record_error(e)
+            return
+        finished_at = time.perf_counter()
+        result.succeeded += 1
+        result.latencies.record(finished_at - intended_at)
+        result.service_times.record(finished_at - sent_at)
+
+    started_at = time.perf_counter()
+    try:
+        for i in range(result.scheduled):
+            intended_at = started_at + i / rate
+            delay = intended_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                result.dropped += 1
+                continue
+            result.sent += 1
+            task = asyncio.ensure_future(fire(intended_at))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        result.elapsed = time.perf_counter() - started_at
+
+    logger.info(
+        f"Open load finished: {result.succeeded}/{result.scheduled} succeeded, "
+        f"throughput {result.throughput:.2f} req/s, error rate {result.error_rate:.2%}"
+    )
+    return result
@@ -0,0 +1,355 @@
+import asyncio
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from loguru import logger
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import orjson
+from aiohttp import web
+
+from .bitopro_client import BitoProClient
+from .ohlc_columns import OHLCColumns
+from .ohlc_resample import bucket_bounds, resample_ohlc
+
+# 支援的延遲分佈
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+# 模擬伺服器提供 K 線的交易對，其他交易對回傳 400
+MOCK_PAIRS = ("btc_twd", "eth_twd", "usdt_twd", "btc_usdt", "eth_usdt", "eth_btc")
+
+# 模擬 K 線的小數位數（open/high/low/close/volume），內部以放大後的整數產生與聚合
+MOCK_SCALES = (2, 2, 2, 2, 8)
+
+# 手續費端點的路徑（與 bito_front 使用的正式網址相同）
+FEES_PATH = "/ns-api/v3/provisioning/limitations-and-fees"
+
+# 手續費端點回傳的固定內容，欄位與正式 API 相同
+MOCK_FEES = {
+    "tradingFeeRate": [
+        {"rank": 0, "twdVolumeSymbol": "<", "twdVolume": "3,000,000", "makerFee": "0.2%", "takerFee": "0.2%"},
+        {"rank": 1, "twdVolumeSymbol": "≥", "twdVolume": "3,000,000", "makerFee": "0.194%", "takerFee": "0.194%"},
+        {"rank": 2, "twdVolumeSymbol": "≥", "twdVolume": "10,000,000", "makerFee": "0.18%", "takerFee": "0.18%"},
+    ],
+    "orderFeesAndLimitations": [
+        {
+            "pair": "BTC/TWD",
+            "minimumOrderAmount": "0.0001",
+            "minimumOrderAmountBase": "BTC",
+            "minimumOrderNumberOfDigits": "0",
+        },
+        {
+            "pair": "ETH/TWD",
+            "minimumOrderAmount": "0.001",
+            "minimumOrderAmountBase": "ETH",
+            "minimumOrderNumberOfDigits": "0",
+        },
+    ],
+    "restrictionsOfWithdrawalFees": [
+        {"currency": "BTC", "fee": "0.0005", "minimumTradingAmount": "0.001", "maximumTradingAmount": "10"},
+        {"currency": "ETH", "fee": "0.005", "minimumTradingAmount": "0.01", "maximumTradingAmount": "100"},
+    ],
+}
+
+
+@dataclass(frozen=True)
+class MockServerConfig:
+    """模擬伺服器的行為設定"""
+
+    # 延遲分佈與參數（秒）：fixed 固定為 latency；uniform 為 latency ± latency_jitter；
+    # exponential 的平均為 latency；lognormal 的中位數為 latency、對數標準差為 latency_jitter
+    latency: float = 0.0
+    latency_distribution: str = "fixed"
+    latency_jitter: float = 0.0
+    # 每次回傳的 K 線數量，None 表示依時間範圍計算（最多 max_candles 根）
+    candles: Optional[int] = None
+    max_candles: int = BitoProClient.MAX_CANDLES_PER_REQUEST
+    # 最早有 K 線的時間戳（秒），更早的區間回傳空數據
+    history_start: int = 1577836800
+    # 隨機回傳 error_status 的比例
+    error_rate: float = 0.0
+    error_status: int = 500
+    # 每秒允許的請求數，超過時回傳 429，None 表示不限制
+    rate_limit: Optional[int] = None
+    # 隨機種子，相同設定與種子會產生相同的延遲、錯誤與價格
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency_distribution}")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+
+@dataclass
+class MockServerStats:
+    """模擬伺服器收到的請求統計"""
+
+    requests: int = 0
+    injected_errors: int = 0
+    throttled: int = 0
+
+
+class MockBitoProServer:
+    """
+    在目前事件循環中執行的 BitoPro API 模擬伺服器
+
+    提供 /v3/trading-history/{pair} 與手續費端點，可設定延遲分佈、回傳大小、錯誤注入與速率限制，
+    讓客戶端的吞吐量與額外負擔可以在沒有網路的環境下重現地量測。
+    K 線由依交易對與種子產生的 1m 價格聚合而成，各時間框架彼此一致；
+    相同請求的響應內容會快取，避免伺服器本身成為瓶頸。
+
+    使用方式:
+        async with MockBitoProServer(MockServerConfig(latency=0.05)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                ...
+    """
+
+    # 響應內容快取的最大項目數
+    BODY_CACHE_SIZE = 256
+
+    def __init__(self, config: Optional[MockServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化模擬伺服器
+
+        Args:
+            config: 行為設定，預設為無延遲、無錯誤、不限速
+            host: 監聽位址
+            port: 監聽埠號，0 表示自動選擇
+        """
+        self.config = config or MockServerConfig()
+        self.stats = MockServerStats()
+        self._host = host
+        self._port = port
+        self._random = random.Random(self.config.seed)
+        self._runner: Optional[web.AppRunner] = None
+        self._bodies: Dict[Tuple[str, str, int, int], bytes] = {}
+        self._window_start = 0.0
+        self._window_count = 0
+
+        self.app = web.Application()
+        self.app.router.add_get("/v3/trading-history/{pair}", self._trading_history)
+        self.app.router.add_get(FEES_PATH, self._fees)
+
+    async def __aenter__(self) -> "MockBitoProServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self) -> None:
+        """開始監聽"""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self._host, self._port).start()
+        self._port = self._runner.addresses[0][1]
+        logger.info(f"Mock BitoPro server listening on {self.root_url}")
+
+    async def close(self) -> None:
+        """停止監聽"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def root_url(self) -> str:
+        return f"http://{self._host}:{self._port}"
+
+    @property
+    def base_url(self) -> str:
+        """傳給 BitoProClient(base_url=...) 的 API 根網址"""
+        return f"{self.root_url}/v3"
+
+    @property
+    def fees_url(self) -> str:
+        return f"{self.root_url}{FEES_PATH}"
+
+    def _sample_latency(self) -> float:
+        config = self.config
+        if config.latency <= 0:
+            return 0.0
+        if config.latency_distribution == "uniform":
+            low, high = config.latency - config.latency_jitter, config.latency + config.latency_jitter
+            return max(self._random.uniform(low, high), 0.0)
+        if config.latency_distribution == "exponential":
+            return self._random.expovariate(1.0 / config.latency)
+        if config.latency_distribution == "lognormal":
+            return self._random.lognormvariate(np.log(config.latency), config.latency_jitter)
+        return config.latency
+
+    def _rate_limit_headers(self) -> Tuple[bool, Dict[str, str]]:
+        """固定一秒的時間窗計數，回傳是否超過限制與速率限制標頭"""
+        limit = self.config.rate_limit
+        if limit is None:
+            return False, {}
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        reset_in = max(1.0 - (now - self._window_start), 0.0)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(limit - self._window_count, 0)),
+            "X-RateLimit-Reset": f"{reset_in:.3f}",
+        }
+        if self._window_count > limit:
+            headers["Retry-After"] = f"{reset_in:.3f}"
+            return True, headers
+        return False, headers
+
+    async def _before_response(self) -> Tuple[Optional[web.Response], Dict[str, str]]:
+        """套用延遲、速率限制與錯誤注入，需要直接回應時回傳該響應"""
+        self.stats.requests += 1
+        # 超過速率限制的請求立即拒絕，不套用延遲
+        throttled, headers = self._rate_limit_headers()
+        if throttled:
+            self.stats.throttled += 1
+            return web.json_response({"error": "Too many requests"}, status=429, headers=headers), headers
+
+        latency = self._sample_latency()
+        if latency:
+            await asyncio.sleep(latency)
+        if self.config.error_rate and self._random.random() < self.config.error_rate:
+            self.stats.injected_errors += 1
+            error = web.json_response({"error": "Injected error"}, status=self.config.error_status, headers=headers)
+            return error, headers
+        return None, headers
+
+    @staticmethod
+    def _bucket_starts(resolution: str, from_timestamp: int, count: int) -> np.ndarray:
+        """從 from_timestamp 之後第一個完整 K 線開始，連續 count 根 K 線的開始時間戳（秒）"""
+        first = bucket_bounds(np.array([from_timestamp * 1000], dtype=np.int64), resolution)[:, 0] // 1000
+        start = int(first[0]) if first[0] >= from_timestamp else int(first[1])
+        if resolution == "1M":
+            month = np.datetime64(start, "s").astype("datetime64[M]")
+            return np.arange(month, month + count).astype("datetime64[s]").astype(np.int64)
+        return start + np.arange(count, dtype=np.int64) * BitoProClient.RESOLUTION_SECONDS[resolution]
+
+    def _minute_candles(self, pair: str, start: int, end: int) -> OHLCColumns:
+        """
+        產生 [start, end) 之間的 1m K 線（定點整數）
+
+        價格為緩慢的週期性走勢加上每日重新起算的隨機漫步，每天以 (種子, 交易對, 日期) 產生，
+        因此不論請求的範圍或時間框架為何，同一分鐘的 K 線都相同，較粗的時間框架可由 1m 聚合而得。
+        """
+        pair_seed = zlib.crc32(pair.encode("utf-8"))
+        days = []
+        for day in range(start // 86400, -(-end // 86400)):
+            rng = np.random.default_rng([self.config.seed, pair_seed, day])
+            minutes = day * 86400 + np.arange(1440, dtype=np.int64) * 60
+            phase = 2 * np.pi * minutes / 86400
+            trend = 0.1 * np.sin(phase / 30) + 0.05 * np.sin(phase / 7)
+            log_price = trend + np.cumsum(rng.normal(0, 0.0005, 1440))
+            close = np.round(1_000_000 * np.exp(log_price) * 100).astype(np.int64)
+            open_ = np.concatenate(([round(1_000_000 * np.exp(trend[0]) * 100)], close[:-1]))
+            spread = np.round(np.abs(rng.normal(0, 0.0003, (2, 1440))) * close).astype(np.int64)
+            high = np.maximum(open_, close) + spread[0]
+            low = np.minimum(open_, close) - spread[1]
+            volume = np.round(rng.gamma(2.0, 0.05, 1440) * 10**8).astype(np.int64)
+            days.append((minutes, np.stack([open_, high, low, close, volume])))
+
+        timestamps = np.concatenate([minutes for minutes, _ in days])
+        values = np.concatenate([values for _, values in days], axis=1)
+        mask = (timestamps >= start) & (timestamps < end)
+        return OHLCColumns(timestamp=timestamps[mask] * 1000, values=values[:, mask], scales=MOCK_SCALES)
+
+    def _candles_body(self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int) -> bytes:
+        key = (pair, resolution, from_timestamp, to_timestamp)
+        body = self._bodies.get(key)
+        if body is not None:
+            return body
+
+        # 只有 history_start 之後到現在的 K 線；固定數量模式忽略時間範圍的結束
+        config = self.config
+        now = int(time.time())
+        from_timestamp = min(max(from_timestamp, config.history_start if config.candles is None else 0), now)
+        count = config.candles if config.candles is not None else config.max_candles
+        starts = self._bucket_starts(resolution, from_timestamp, count) if count > 0 else np.zeros(0, np.int64)
+        if config.candles is None:
+            starts = starts[starts <= min(to_timestamp, now)]
+
+        data = []
+        if len(starts):
+            end = int(bucket_bounds(starts[-1:] * 1000, resolution)[1, 0]) // 1000
+            if config.candles is None:
+                end = min(end, now // 60 * 60 + 60)
+            candles = self._minute_candles(pair, int(starts[0]), end)
+            if resolution != "1m":
+                candles = resample_ohlc(candles, resolution)
+            open_, high, low, close, volume = candles.values.tolist()
+            data = [
+                {
+                    "timestamp": timestamp,
+                    "open": f"{open_[i] // 100}.{open_[i] % 100:02d}",
+                    "high": f"{high[i] // 100}.{high[i] % 100:02d}",
+                    "low": f"{low[i] // 100}.{low[i] % 100:02d}",
+                    "close": f"{close[i] // 100}.{close[i] % 100:02d}",
+                    "volume": f"{volume[i] // 10**8}.{volume[i] % 10**8:08d}",
+                }
+                for i, timestamp in enumerate(candles.timestamp.tolist())
+            ]
+        body = orjson.dumps({"data": data})
+        if len(self._bodies) >= self.BODY_CACHE_SIZE:
+            self._bodies.clear()
+        self._bodies[key] = body
+        return body
+
+    async def _trading_history(self, request: web.Request) -> web.Response:
+        early, headers = await self._before_response()
+        if early is not None:
+            return early
+
+        pair = request.match_info["pair"]
+        if pair not in MOCK_PAIRS:
+            return web.json_response({"error": f"Invalid pair: {pair}"}, status=400, headers=headers)
+        resolution = request.query.get("resolution", "")
+        try:
+            from_timestamp = int(request.query["from"])
+            to_timestamp = int(request.query["to"])
+        except (KeyError, ValueError):
+            return web.json_response({"error": "Invalid from/to"}, status=400, headers=headers)
+        if resolution not in BitoProClient.RESOLUTION_SECONDS:
+            return web.json_response({"error": "Invalid resolution"}, status=400, headers=headers)
+        if from_timestamp > to_timestamp:
+            return web.json_response({"error": "from must not be greater than to"}, status=400, headers=headers)
+
+        body = self._candles_body(pair, resolution, from_timestamp, to_timestamp)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    async def _fees(self, request: web.Request) -> web.Response:
+        early, headers = await self._before_response()
+        if early is not None:
+            return early
+        return web.json_response(MOCK_FEES, dumps=lambda data: orjson.dumps(data).decode("utf-8"), headers=headers)
+
+
+def parse_mock_server_config(spec: str) -> MockServerConfig:
+    """
+    解析命令列或環境變數中的模擬伺服器設定
+
+    Args:
+        spec: 以逗號分隔的 key=value，例如 "latency=0.05,error_rate=0.01,rate_limit=100"，
+            空字串表示使用預設值；candles 與 rate_limit 可設為 none 或 off 表示不限制
+
+    Returns:
+        MockServerConfig 實例
+    """
+    fields = MockServerConfig.__dataclass_fields__
+    values: Dict[str, Any] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, raw = item.partition("=")
+        key = key.strip()
+        if key not in fields:
+            raise ValueError(f"Unknown mock server option: {key}")
+        if key == "latency_distribution":
+            values[key] = raw.strip()
+        elif key in ("latency", "latency_jitter", "error_rate"):
+            values[key] = float(raw)
+        elif key in ("candles", "rate_limit") and raw.strip().lower() in ("none", "off"):
+            values[key] = None
+        else:
+            values[key] = int(raw)
+    return MockServerConfig(**values)
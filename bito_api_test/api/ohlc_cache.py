@@ -0,0 +1,184 @@
+import hashlib
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+
+# 交易對名稱可直接作為目錄名稱的字元
+_SAFE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# 命名空間目錄名稱中保留的字元，其餘以底線取代
+_UNSAFE_CHARS_PATTERN = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+@dataclass
+class CacheStats:
+    """磁碟快取的命中統計"""
+
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class OHLCDiskCache:
+    """
+    以 (命名空間, 交易對, 時間框架, 區塊) 為鍵的 OHLC 磁碟快取
+
+    命名空間通常為 API 根網址，讓正式環境與模擬伺服器的數據共用同一個目錄也不會互相覆寫。
+    區塊為 BitoProClient.split_time_range 所使用的對齊網格。區塊結束時間早於
+    獲取時間（加上結算緩衝）且有數據時，其中的 K 線都已收盤，視為不可變並永久有效；
+    仍在進行中的尾端區塊，以及沒有任何 K 線的區塊（可能是伺服器暫時未回傳），只在 open_bucket_ttl 秒內有效。
+    快取總大小超過 max_bytes 時，依最近使用時間（檔案 mtime）淘汰最舊的區塊。
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        open_bucket_ttl: float = 60.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        settle_seconds: int = 60,
+    ):
+        """
+        初始化磁碟快取
+
+        Args:
+            directory: 快取目錄
+            open_bucket_ttl: 未收盤區塊的有效秒數
+            max_bytes: 快取總大小上限（位元組）
+            settle_seconds: 區塊結束後仍可能被伺服器修正的緩衝秒數
+        """
+        self.directory = Path(directory)
+        self.open_bucket_ttl = open_bucket_ttl
+        self.max_bytes = max_bytes
+        self.settle_seconds = settle_seconds
+        self.stats = CacheStats()
+        self._total_bytes: Optional[int] = None
+        self._logger = logger
+
+    def _bucket_path(self, pair: str, resolution: str, bucket_start: int, namespace: str = "") -> Path:
+        if not _SAFE_NAME_PATTERN.match(pair):
+            pair = "_" + hashlib.sha1(pair.encode("utf-8")).hexdigest()
+        directory = self.directory
+        if namespace:
+            # 可讀的前綴加上雜湊，避免不同網址清理後的名稱相同
+            readable = _UNSAFE_CHARS_PATTERN.sub("_", namespace.split("://", 1)[-1]).strip("_")[:48]
+            directory = directory / f"{readable}-{hashlib.sha1(namespace.encode('utf-8')).hexdigest()[:8]}"
+        return directory / pair / resolution / f"{bucket_start}.json"
+
+    def get(
+        self, pair: str, resolution: str, bucket_start: int, namespace: str = ""
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        讀取快取的區塊
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+            bucket_start: 區塊開始時間戳（秒）
+            namespace: 命名空間，例如 API 根網址
+
+        Returns:
+            區塊內的 K 線列表，未命中或已過期時返回 None
+        """
+        path = self._bucket_path(pair, resolution, bucket_start, namespace)
+        try:
+            entry = orjson.loads(path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            self.stats.misses += 1
+            return None
+
+        if not entry["closed"] and time.time() - entry["fetched_at"] > self.open_bucket_ttl:
+            self.stats.stale += 1
+            self.stats.misses += 1
+            return None
+
+        # 更新 mtime 作為 LRU 的最近使用時間
+        os.utime(path)
+        self.stats.hits += 1
+        return entry["data"]
+
+    def put(
+        self,
+        pair: str,
+        resolution: str,
+        bucket_start: int,
+        bucket_end: int,
+        candles: List[Dict[str, Any]],
+        namespace: str = "",
+    ) -> None:
+        """
+        寫入區塊到快取
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+            bucket_start: 區塊開始時間戳（秒）
+            bucket_end: 區塊結束時間戳（秒，不含）
+            candles: 區塊內的 K 線列表
+            namespace: 命名空間，例如 API 根網址
+        """
+        fetched_at = time.time()
+        entry = {
+            "fetched_at": fetched_at,
+            # 空的區塊不視為已收盤，過期後重新請求，避免暫時性的空響應被永久保存
+            "closed": bool(candles) and bucket_end + self.settle_seconds <= fetched_at,
+            "data": candles,
+        }
+        payload = orjson.dumps(entry)
+
+        path = self._bucket_path(pair, resolution, bucket_start, namespace)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        previous_size = path.stat().st_size if path.exists() else 0
+
+        # 先寫入暫存檔再替換，避免讀到寫入一半的檔案
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        self.stats.stores += 1
+
+        self._total_bytes = self._current_total_bytes() + len(payload) - previous_size
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _current_total_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(path.stat().st_size for path in self.directory.rglob("*.json"))
+        return self._total_bytes
+
+    def _evict(self) -> None:
+        """依最近使用時間淘汰區塊，直到總大小低於上限的 90%"""
+        entries = sorted(
+            ((path.stat(), path) for path in self.directory.rglob("*.json")),
+            key=lambda item: item[0].st_mtime,
+        )
+        target = self.max_bytes * 0.9
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            self.stats.evictions += 1
+        self._total_bytes = total
+        self._logger.debug(f"OHLC cache evicted down to {total} bytes")
+
+    def clear(self) -> None:
+        """清除所有快取區塊"""
+        for path in self.directory.rglob("*.json"):
+            path.unlink(missing_ok=True)
+        self._total_bytes = 0
@@ -0,0 +1,165 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .fixed_point import format_fixed_point, parse_fixed_point
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# K 線中以字串表示的數值欄位，順序即 OHLCColumns.values 的列順序
+OHLC_VALUE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class OHLCColumns:
+    """
+    以 NumPy 陣列按欄儲存的 K 線數據
+
+    timestamp 為 int64 毫秒時間戳，open/high/low/close/volume 共用一個
+    形狀為 (5, n) 的陣列 values，每個欄位是其中一列的視圖，
+    轉換成 pandas DataFrame 時不需要複製數值。
+
+    values 預設為 float64；以 precision 建立時為定點 int64，
+    scales 記錄各欄位放大的小數位數，可與前端字串做精確比對。
+    """
+
+    timestamp: np.ndarray
+    values: np.ndarray
+    scales: Optional[Tuple[int, ...]] = None
+
+    def __post_init__(self):
+        if self.values.shape != (len(OHLC_VALUE_FIELDS), len(self.timestamp)):
+            raise ValueError(f"values shape {self.values.shape} does not match {len(self.timestamp)} timestamps")
+        if self.scales is not None and len(self.scales) != len(OHLC_VALUE_FIELDS):
+            raise ValueError(f"scales must have {len(OHLC_VALUE_FIELDS)} entries")
+
+    @classmethod
+    def from_records(
+        cls, records: Sequence[Dict[str, Any]], precision: Optional[Dict[str, int]] = None
+    ) -> "OHLCColumns":
+        """
+        將 get_ohlc_data 回傳的 K 線字典列表轉換為按欄儲存的格式
+
+        每個欄位先收集成字串陣列，再由 NumPy 一次轉換為數值。
+
+        Args:
+            records: K 線字典列表
+            precision: 各欄位保留的小數位數（例如 fixed_point.DEFAULT_PRECISION），
+                提供時以定點 int64 精確儲存，否則轉換為 float64
+
+        Returns:
+            OHLCColumns 實例
+        """
+        timestamp = np.fromiter((record["timestamp"] for record in records), dtype=np.int64, count=len(records))
+        dtype = np.float64 if precision is None else np.int64
+        values = np.empty((len(OHLC_VALUE_FIELDS), len(records)), dtype=dtype)
+        for row, name in enumerate(OHLC_VALUE_FIELDS):
+            strings = [record[name] for record in records]
+            if precision is None:
+                values[row] = np.asarray(strings, dtype=np.str_).astype(np.float64)
+            else:
+                values[row] = parse_fixed_point(strings, precision[name])
+        scales = None if precision is None else tuple(precision[name] for name in OHLC_VALUE_FIELDS)
+        return cls(timestamp=timestamp, values=values, scales=scales)
+
+    @classmethod
+    def from_response(
+        cls, response: Dict[str, List[Dict[str, Any]]], precision: Optional[Dict[str, int]] = None
+    ) -> "OHLCColumns":
+        """
+        從 get_ohlc_data 的回應字典建立
+
+        Args:
+            response: 包含 data 欄位的回應字典
+            precision: 各欄位保留的小數位數，提供時以定點 int64 儲存
+
+        Returns:
+            OHLCColumns 實例
+        """
+        return cls.from_records(response.get("data", []), precision)
+
+    @property
+    def is_fixed_point(self) -> bool:
+        return self.scales is not None
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.values[0]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.values[1]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.values[2]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.values[3]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.values[4]
+
+    @property
+    def nbytes(self) -> int:
+        """陣列佔用的位元組數"""
+        return self.timestamp.nbytes + self.values.nbytes
+
+    def sort(self) -> "OHLCColumns":
+        """
+        依 timestamp 排序
+
+        Returns:
+            已排序的新 OHLCColumns；原本已排序時返回自身
+        """
+        if len(self) < 2 or bool(np.all(self.timestamp[1:] >= self.timestamp[:-1])):
+            return self
+        order = np.argsort(self.timestamp, kind="stable")
+        return OHLCColumns(
+            timestamp=self.timestamp[order], values=np.ascontiguousarray(self.values[:, order]), scales=self.scales
+        )
+
+    def to_float(self) -> "OHLCColumns":
+        """
+        轉換為 float64 數值
+
+        Returns:
+            float64 的 OHLCColumns；原本即為 float64 時返回自身
+        """
+        if self.scales is None:
+            return self
+        divisors = np.power(10.0, np.asarray(self.scales, dtype=np.float64))[:, np.newaxis]
+        return OHLCColumns(timestamp=self.timestamp, values=self.values / divisors)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """轉換回 K 線字典列表（float64 時數值為 float，定點時還原為十進位字串）"""
+        if self.scales is None:
+            rows = [row.tolist() for row in self.values]
+        else:
+            rows = [
+                [format_fixed_point(value, scale) for value in row.tolist()]
+                for row, scale in zip(self.values, self.scales)
+            ]
+        columns = [self.timestamp.tolist(), *rows]
+        return [dict(zip(("timestamp", *OHLC_VALUE_FIELDS), row)) for row in zip(*columns)]
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        轉換為以 UTC 時間為索引的 pandas DataFrame
+
+        數值欄位直接引用 values 的記憶體，不會複製。
+
+        Returns:
+            欄位為 open/high/low/close/volume 的 DataFrame
+        """
+        import pandas as pd
+
+        index = pd.DatetimeIndex(pd.to_datetime(self.timestamp, unit="ms", utc=True), name="timestamp")
+        return pd.DataFrame(self.values.T, index=index, columns=list(OHLC_VALUE_FIELDS), copy=False)
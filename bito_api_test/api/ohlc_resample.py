@@ -0,0 +1,260 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .bitopro_client import BitoProClient
+from .fixed_point import DEFAULT_PRECISION
+from .ohlc_columns import OHLC_VALUE_FIELDS, OHLCColumns
+from .ohlc_validation import WEEK_ALIGN_OFFSET
+
+
+def bucket_bounds(timestamps: np.ndarray, resolution: str, align_offset: int = 0) -> np.ndarray:
+    """
+    計算每個 timestamp 所屬的目標時間框架 K 線的起訖時間
+
+    Args:
+        timestamps: int64 毫秒時間戳陣列
+        resolution: 目標時間框架
+        align_offset: K 線邊界相對 UTC 的偏移秒數
+
+    Returns:
+        形狀為 (2, n) 的 int64 陣列，依序為開始與結束（不含）毫秒時間戳
+    """
+    seconds = timestamps // 1000 - align_offset
+    if resolution == "1M":
+        months = seconds.astype("datetime64[s]").astype("datetime64[M]")
+        starts = months.astype("datetime64[s]").astype(np.int64)
+        ends = (months + 1).astype("datetime64[s]").astype(np.int64)
+    else:
+        step = BitoProClient.RESOLUTION_SECONDS[resolution]
+        origin = WEEK_ALIGN_OFFSET if resolution == "1w" else 0
+        starts = (seconds - origin) // step * step + origin
+        ends = starts + step
+    return (np.stack([starts, ends]) + align_offset) * 1000
+
+
+def _sum_volume(volume: np.ndarray, firsts: np.ndarray) -> np.ndarray:
+    """依區間加總 volume，定點整數以 Python 整數計算並檢查是否超出 int64"""
+    if not np.issubdtype(volume.dtype, np.integer):
+        return np.add.reduceat(volume, firsts)
+    sums = np.add.reduceat(volume.astype(object), firsts)
+    info = np.iinfo(volume.dtype)
+    if len(sums) and (max(sums) > info.max or min(sums) < info.min):
+        raise OverflowError("Aggregated fixed-point volume exceeds int64; use a lower volume precision")
+    return sums.astype(volume.dtype)
+
+
+def resample_ohlc(columns: OHLCColumns, resolution: str, align_offset: int = 0) -> OHLCColumns:
+    """
+    將細粒度 K 線聚合為較粗的時間框架
+
+    open 取區間第一根、close 取最後一根、high/low 取極值、volume 加總，
+    全部以 NumPy reduceat 一次完成。定點整數的 volume 以 Python 整數加總，
+    超出 int64 範圍時拋出 OverflowError，不會靜默溢位。
+
+    Args:
+        columns: 細粒度的 OHLCColumns
+        resolution: 目標時間框架
+        align_offset: K 線邊界相對 UTC 的偏移秒數
+
+    Returns:
+        聚合後的 OHLCColumns，與輸入使用相同的數值型別與精度
+    """
+    columns = columns.sort()
+    if len(columns) == 0:
+        return columns
+
+    bucket_starts = bucket_bounds(columns.timestamp, resolution, align_offset)[0]
+    boundaries = np.flatnonzero(np.diff(bucket_starts)) + 1
+    firsts = np.concatenate(([0], boundaries))
+    lasts = np.concatenate((boundaries - 1, [len(columns) - 1]))
+
+    open_, high, low, close, volume = columns.values
+    values = np.stack(
+        [
+            open_[firsts],
+            np.maximum.reduceat(high, firsts),
+            np.minimum.reduceat(low, firsts),
+            close[lasts],
+            _sum_volume(volume, firsts),
+        ]
+    )
+    return OHLCColumns(timestamp=bucket_starts[firsts], values=values, scales=columns.scales)
+
+
+@dataclass
+class ConsistencyResult:
+    """單一時間框架的聚合結果與伺服器 K 線比對結果"""
+
+    resolution: str
+    compared: int = 0
+    # 各欄位不一致的 K 線數量
+    mismatches: Dict[str, int] = field(default_factory=dict)
+    # 聚合結果有但伺服器沒有的 K 線 timestamp
+    missing_served: List[int] = field(default_factory=list)
+    # 伺服器有但聚合結果沒有的 K 線 timestamp
+    missing_aggregated: List[int] = field(default_factory=list)
+    # 不一致的 K 線 timestamp 範例
+    examples: List[int] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.error is None
+            and not any(self.mismatches.values())
+            and not self.missing_served
+            and not self.missing_aggregated
+        )
+
+
+@dataclass
+class ConsistencyReport:
+    """跨時間框架一致性檢查的整體結果"""
+
+    pair: str
+    base_resolution: str
+    base_candles: int
+    results: Dict[str, ConsistencyResult] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results.values())
+
+    def summary(self) -> str:
+        """產生可附加到 Allure 的文字報告"""
+        report = f"{self.pair} 以 {self.base_resolution}（{self.base_candles} 根）聚合的一致性比對:\n\n"
+        report += "| 時間框架 | 比對數量 | 欄位不一致 | 伺服器缺少 | 聚合缺少 | 結果 |\n"
+        report += "|----------|----------|------------|------------|----------|------|\n"
+        for resolution, result in self.results.items():
+            mismatches = ", ".join(f"{name}:{count}" for name, count in result.mismatches.items() if count) or "-"
+            status = "通過" if result.ok else (result.error or "不一致")
+            report += (
+                f"| {resolution} | {result.compared} | {mismatches} | {len(result.missing_served)} "
+                f"| {len(result.missing_aggregated)} | {status} |\n"
+            )
+        return report
+
+
+def compare_ohlc(
+    aggregated: OHLCColumns,
+    served: OHLCColumns,
+    resolution: str,
+    from_timestamp: int,
+    to_timestamp: int,
+    align_offset: int = 0,
+    tolerance: float = 0,
+    max_examples: int = 20,
+) -> ConsistencyResult:
+    """
+    比對聚合結果與伺服器的 K 線，只比較完整落在區間內的 K 線
+
+    Args:
+        aggregated: 由細粒度 K 線聚合的結果
+        served: 伺服器回傳的同一時間框架 K 線
+        resolution: 時間框架
+        from_timestamp: 細粒度數據的開始時間戳（秒）
+        to_timestamp: 細粒度數據的結束時間戳（秒）
+        align_offset: K 線邊界相對 UTC 的偏移秒數
+        tolerance: 允許的絕對誤差（定點數據時為放大後的整數單位）
+        max_examples: 最多保留的不一致 timestamp 數量
+
+    Returns:
+        ConsistencyResult 比對結果
+    """
+
+    def complete(columns: OHLCColumns) -> OHLCColumns:
+        bounds = bucket_bounds(columns.timestamp, resolution, align_offset)
+        mask = (bounds[0] >= from_timestamp * 1000) & (bounds[1] <= to_timestamp * 1000)
+        return OHLCColumns(timestamp=columns.timestamp[mask], values=columns.values[:, mask], scales=columns.scales)
+
+    aggregated, served = complete(aggregated.sort()), complete(served.sort())
+    common, aggregated_index, served_index = np.intersect1d(
+        aggregated.timestamp, served.timestamp, assume_unique=True, return_indices=True
+    )
+
+    difference = np.abs(aggregated.values[:, aggregated_index] - served.values[:, served_index]) > tolerance
+    mismatched = difference.any(axis=0)
+    return ConsistencyResult(
+        resolution=resolution,
+        compared=len(common),
+        mismatches={name: int(np.count_nonzero(row)) for name, row in zip(OHLC_VALUE_FIELDS, difference)},
+        missing_served=np.setdiff1d(aggregated.timestamp, served.timestamp).tolist(),
+        missing_aggregated=np.setdiff1d(served.timestamp, aggregated.timestamp).tolist(),
+        examples=common[mismatched][:max_examples].tolist(),
+    )
+
+
+async def check_resolution_consistency(
+    client: BitoProClient,
+    pair: str,
+    from_timestamp: int,
+    to_timestamp: int,
+    base_resolution: str = "1m",
+    resolutions: Optional[Iterable[str]] = None,
+    precision: Optional[Dict[str, int]] = DEFAULT_PRECISION,
+    align_offset: int = 0,
+    tolerance: float = 0,
+) -> ConsistencyReport:
+    """
+    檢查伺服器各時間框架的 K 線是否等於最細時間框架的聚合結果
+
+    最細時間框架只透過 get_ohlc_range 下載一次，再於本地聚合成所有較粗的時間框架；
+    伺服器的較粗 K 線同樣以 get_ohlc_range 併發獲取（超過單次請求上限時自動切分），再逐一比對。
+
+    Args:
+        client: 已進入 async with 的 BitoProClient 實例
+        pair: 交易對
+        from_timestamp: 開始時間戳（秒）
+        to_timestamp: 結束時間戳（秒）
+        base_resolution: 作為聚合來源的最細時間框架
+        resolutions: 要比對的時間框架，預設為所有比 base_resolution 粗的時間框架
+        precision: 各欄位保留的小數位數，None 表示以 float64 比對
+        align_offset: K 線邊界相對 UTC 的偏移秒數
+        tolerance: 允許的絕對誤差
+
+    Returns:
+        ConsistencyReport 一致性檢查結果
+    """
+    base_seconds = BitoProClient.RESOLUTION_SECONDS[base_resolution]
+    if resolutions is None:
+        resolutions = [
+            resolution
+            for resolution in BitoProClient.VALID_RESOLUTIONS
+            if BitoProClient.RESOLUTION_SECONDS[resolution] > base_seconds
+        ]
+    resolutions = list(resolutions)
+
+    base, _ = await client.get_ohlc_range(
+        pair, base_resolution, from_timestamp, to_timestamp, as_columns=True, precision=precision
+    )
+    report = ConsistencyReport(pair=pair, base_resolution=base_resolution, base_candles=len(base))
+
+    # 單次請求最多回傳 MAX_CANDLES_PER_REQUEST 根，較長的區間需切分，否則截斷的部分會被誤報為伺服器缺少
+    served_results = await asyncio.gather(
+        *(
+            client.get_ohlc_range(
+                pair, resolution, from_timestamp, to_timestamp, as_columns=True, precision=precision
+            )
+            for resolution in resolutions
+        ),
+        return_exceptions=True,
+    )
+
+    for resolution, served_result in zip(resolutions, served_results):
+        if isinstance(served_result, BaseException):
+            report.results[resolution] = ConsistencyResult(resolution=resolution, error=str(served_result))
+            continue
+        served, _ = served_result
+        report.results[resolution] = compare_ohlc(
+            resample_ohlc(base, resolution, align_offset),
+            served,
+            resolution,
+            from_timestamp,
+            to_timestamp,
+            align_offset,
+            tolerance,
+        )
+    return report
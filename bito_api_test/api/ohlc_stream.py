@@ -0,0 +1,75 @@
+from typing import Any, Dict, List
+
+import orjson
+
+_WHITESPACE_AND_COMMA = b" \t\r\n,"
+
+
+class OHLCStreamDecoder:
+    """
+    逐段解析 {"data": [...]} 格式 OHLC 響應的增量解碼器
+
+    每次 feed 收到一段位元組後，立即解析其中已完整的 K 線並回傳，
+    只保留最後一根未完整的 K 線在緩衝區，因此記憶體用量與響應大小無關。
+    K 線是沒有巢狀結構、數值也不含括號的扁平物件，第一個 "]" 即為陣列結尾，
+    其前最後一個 "}" 即可切出所有完整的物件，再以 orjson 一次解析整段。
+    """
+
+    DATA_KEY = b'"data"'
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._in_array = False
+        self.done = False
+        self.bytes_received = 0
+        self.items_decoded = 0
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        輸入下一段響應位元組
+
+        Args:
+            chunk: 響應內容的一段位元組
+
+        Returns:
+            本段中解析完成的 K 線列表
+        """
+        self.bytes_received += len(chunk)
+        if self.done:
+            return []
+        self._buffer += chunk
+
+        if not self._in_array and not self._seek_array():
+            return []
+
+        array_end = self._buffer.find(b"]")
+        end = self._buffer.rfind(b"}", 0, len(self._buffer) if array_end == -1 else array_end)
+        items: List[Dict[str, Any]] = []
+        if end != -1:
+            segment = bytes(self._buffer[: end + 1]).lstrip(_WHITESPACE_AND_COMMA)
+            del self._buffer[: end + 1]
+            items = orjson.loads(b"[" + segment + b"]")
+            self.items_decoded += len(items)
+
+        if array_end != -1:
+            self.done = True
+            self._buffer.clear()
+        return items
+
+    def _seek_array(self) -> bool:
+        """在緩衝區中尋找 data 陣列的開頭，找到時丟棄之前的內容"""
+        key = self._buffer.find(self.DATA_KEY)
+        if key == -1:
+            return False
+        start = self._buffer.find(b"[", key + len(self.DATA_KEY))
+        if start == -1:
+            return False
+        del self._buffer[: start + 1]
+        self._in_array = True
+        return True
+
+    def close(self) -> None:
+        """確認響應已完整結束，data 陣列不完整時引發 ValueError"""
+        if not self.done:
+            state = "incomplete data array" if self._in_array else "no data array"
+            raise ValueError(f"OHLC stream ended with {state} after {self.bytes_received} bytes")
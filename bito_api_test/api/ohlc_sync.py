@@ -0,0 +1,271 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import orjson
+
+from .bitopro_client import BitoProClient
+from .ohlc_resample import bucket_bounds
+from .ohlc_validation import missing_buckets
+
+# 半開區間 [start, end)，單位為秒
+Interval = Tuple[int, int]
+
+
+def subtract_intervals(target: Interval, covered: List[Interval]) -> List[Interval]:
+    """
+    計算 target 區間中未被 covered 覆蓋的部分
+
+    Args:
+        target: 目標區間
+        covered: 已排序且互不重疊的區間列表
+
+    Returns:
+        未覆蓋的區間列表
+    """
+    start, end = target
+    missing = []
+    for covered_start, covered_end in covered:
+        if covered_end <= start:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > start:
+            missing.append((start, covered_start))
+        start = max(start, covered_end)
+        if start >= end:
+            break
+    if start < end:
+        missing.append((start, end))
+    return missing
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    合併重疊或相鄰的區間
+
+    Args:
+        intervals: 區間列表
+
+    Returns:
+        已排序且互不重疊的區間列表
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass
+class SeriesState:
+    """單一 (交易對, 時間框架) 的本地 K 線歷史"""
+
+    pair: str
+    resolution: str
+    candles: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    covered: List[Interval] = field(default_factory=list)
+
+    @property
+    def high_water_mark(self) -> Optional[int]:
+        """已完整同步的最新時間戳（秒），尚未同步時為 None"""
+        return self.covered[-1][1] if self.covered else None
+
+    def sorted_candles(self) -> List[Dict[str, Any]]:
+        return [self.candles[ts] for ts in sorted(self.candles)]
+
+
+@dataclass
+class SyncResult:
+    """單次同步的結果"""
+
+    pair: str
+    resolution: str
+    fetched_intervals: List[Interval]
+    new_candles: int
+    updated_candles: int
+    high_water_mark: Optional[int]
+
+
+class OHLCSyncEngine:
+    """
+    增量同步 OHLC 數據的引擎
+
+    為每個 (交易對, 時間框架) 記錄已同步的時間區間與高水位，
+    同步時只請求本地尚未擁有的區間。仍在進行中的最後一根 K 線不會被視為已同步，
+    因此穩定狀態下每次同步只需要對每個序列發送一個小請求。
+    """
+
+    def __init__(self, client: BitoProClient):
+        """
+        初始化同步引擎
+
+        Args:
+            client: 已進入 async with 的 BitoProClient 實例
+        """
+        self._client = client
+        self._series: Dict[Tuple[str, str], SeriesState] = {}
+        self._logger = logger
+
+    def series(self, pair: str, resolution: str) -> SeriesState:
+        """取得（必要時建立）指定序列的本地狀態"""
+        key = (pair, resolution)
+        if key not in self._series:
+            self._series[key] = SeriesState(pair=pair, resolution=resolution)
+        return self._series[key]
+
+    def missing_intervals(
+        self, pair: str, resolution: str, from_timestamp: int, to_timestamp: int, include_gaps: bool = False
+    ) -> List[Interval]:
+        """
+        計算指定區間內需要向伺服器請求的部分
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+            from_timestamp: 開始時間戳（秒）
+            to_timestamp: 結束時間戳（秒，不含）
+            include_gaps: 是否一併重新請求已同步區間中缺少 K 線的缺口
+
+        Returns:
+            需要請求的區間列表
+        """
+        state = self.series(pair, resolution)
+        missing = subtract_intervals((from_timestamp, to_timestamp), state.covered)
+        if include_gaps:
+            gaps = [
+                (max(start, from_timestamp), min(end, to_timestamp))
+                for start, end in self.find_gaps(pair, resolution)
+                if start < to_timestamp and end > from_timestamp
+            ]
+            missing = merge_intervals(missing + gaps)
+        return missing
+
+    def find_gaps(self, pair: str, resolution: str) -> List[Interval]:
+        """
+        找出本地 K 線序列中相鄰 K 線之間缺少 K 線的缺口
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+
+        Returns:
+            缺口區間列表（秒）
+        """
+        state = self.series(pair, resolution)
+        timestamps = np.array(sorted(state.candles), dtype=np.int64)
+        if len(timestamps) < 2:
+            return []
+        # 1M 依日曆月份、1w 依週一對齊計算下一根 K 線，避免固定間距在 31 天的月份誤報缺口
+        gaps = np.flatnonzero(missing_buckets(timestamps, resolution))
+        next_starts = bucket_bounds(timestamps[gaps], resolution)[1] // 1000
+        return [(int(start), int(timestamps[index + 1] // 1000)) for index, start in zip(gaps, next_starts)]
+
+    async def sync(
+        self,
+        pair: str,
+        resolution: str,
+        from_timestamp: int,
+        to_timestamp: Optional[int] = None,
+        include_gaps: bool = False,
+    ) -> SyncResult:
+        """
+        將指定序列同步到 to_timestamp，只請求缺少的區間
+
+        Args:
+            pair: 交易對
+            resolution: 時間框架
+            from_timestamp: 需要保有歷史的開始時間戳（秒）
+            to_timestamp: 結束時間戳（秒），預設為目前時間
+            include_gaps: 是否一併重新請求已同步區間中的缺口
+
+        Returns:
+            SyncResult 同步結果
+        """
+        now = int(time.time())
+        to_timestamp = now if to_timestamp is None else to_timestamp
+        state = self.series(pair, resolution)
+        # 目前仍在進行中的 K 線開始時間，之後的數據都可能再變動
+        open_candle_start = int(bucket_bounds(np.array([now * 1000], dtype=np.int64), resolution)[0][0] // 1000)
+
+        missing = self.missing_intervals(pair, resolution, from_timestamp, to_timestamp, include_gaps)
+        new_candles = updated_candles = 0
+        for start, end in missing:
+            data, _ = await self._client.get_ohlc_range(pair, resolution, start, end)
+            for candle in data.get("data", []):
+                if candle["timestamp"] in state.candles:
+                    updated_candles += 1
+                else:
+                    new_candles += 1
+                state.candles[candle["timestamp"]] = candle
+
+        settled = [(start, min(end, open_candle_start)) for start, end in missing]
+        state.covered = merge_intervals(state.covered + settled)
+
+        self._logger.info(
+            f"Synced {pair} {resolution}: {len(missing)} intervals, {new_candles} new, {updated_candles} updated"
+        )
+        return SyncResult(
+            pair=pair,
+            resolution=resolution,
+            fetched_intervals=missing,
+            new_candles=new_candles,
+            updated_candles=updated_candles,
+            high_water_mark=state.high_water_mark,
+        )
+
+    async def sync_all(
+        self,
+        pairs: Iterable[str],
+        resolutions: Iterable[str],
+        from_timestamp: int,
+        to_timestamp: Optional[int] = None,
+    ) -> List[SyncResult]:
+        """
+        併發同步多個交易對與時間框架
+
+        Args:
+            pairs: 交易對列表
+            resolutions: 時間框架列表
+            from_timestamp: 需要保有歷史的開始時間戳（秒）
+            to_timestamp: 結束時間戳（秒），預設為目前時間
+
+        Returns:
+            各序列的 SyncResult 列表
+        """
+        resolutions = list(resolutions)
+        return await asyncio.gather(
+            *(
+                self.sync(pair, resolution, from_timestamp, to_timestamp)
+                for pair in pairs
+                for resolution in resolutions
+            )
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """將所有序列的狀態寫入 JSON 檔案"""
+        payload = [
+            {
+                "pair": state.pair,
+                "resolution": state.resolution,
+                "covered": state.covered,
+                "candles": state.sorted_candles(),
+            }
+            for state in self._series.values()
+        ]
+        Path(path).write_bytes(orjson.dumps(payload))
+
+    def load(self, path: Union[str, Path]) -> None:
+        """從 JSON 檔案載入序列狀態，覆蓋同名序列"""
+        for item in orjson.loads(Path(path).read_bytes()):
+            state = self.series(item["pair"], item["resolution"])
+            state.covered = [tuple(interval) for interval in item["covered"]]
+            state.candles = {candle["timestamp"]: candle for candle in item["candles"]}
@@ -0,0 +1,152 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+from .bitopro_client import BitoProClient
+from .ohlc_columns import OHLCColumns
+
+# 週 K 線對齊的星期一與 Unix 紀元（星期四）相差的秒數
+WEEK_ALIGN_OFFSET = 4 * 86400
+
+# 各檢查項目的說明，順序即報告中的顯示順序
+VALIDATION_CHECKS = {
+    "low_above_high": "low 大於 high",
+    "open_out_of_range": "open 不在 [low, high] 範圍內",
+    "close_out_of_range": "close 不在 [low, high] 範圍內",
+    "negative_volume": "volume 為負數",
+    "non_increasing_timestamp": "timestamp 未嚴格遞增",
+    "duplicate_timestamp": "timestamp 重複",
+    "misaligned_timestamp": "timestamp 未對齊時間框架",
+    "missing_bucket": "缺少的 K 線區間",
+}
+
+
+@dataclass
+class OHLCValidationReport:
+    """K 線數據的驗證結果"""
+
+    resolution: str
+    candle_count: int
+    # 各檢查項目的違規數量
+    counts: Dict[str, int] = field(default_factory=dict)
+    # 各檢查項目的違規 timestamp 範例（毫秒），數量受 max_examples 限制
+    examples: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.counts.values())
+
+    @property
+    def violations(self) -> Dict[str, int]:
+        """只包含有違規的檢查項目"""
+        return {name: count for name, count in self.counts.items() if count}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "resolution": self.resolution,
+            "candle_count": self.candle_count,
+            "ok": self.ok,
+            "violations": self.violations,
+            "examples": {name: self.examples[name] for name in self.violations},
+        }
+
+    def summary(self) -> str:
+        """產生可附加到 Allure 的文字報告"""
+        report = f"時間框架 {self.resolution} 驗證結果（共 {self.candle_count} 根 K 線）:\n\n"
+        report += "| 檢查項目 | 違規數量 | 範例 timestamp |\n"
+        report += "|----------|----------|----------------|\n"
+        for name, description in VALIDATION_CHECKS.items():
+            examples = ", ".join(str(ts) for ts in self.examples.get(name, []))
+            report += f"| {description} | {self.counts.get(name, 0)} | {examples} |\n"
+        return report
+
+
+def _alignment_errors(timestamps: np.ndarray, resolution: str, align_offset: int) -> np.ndarray:
+    """回傳未對齊時間框架的布林遮罩"""
+    seconds = timestamps // 1000 - align_offset
+    if resolution == "1M":
+        as_datetime = seconds.astype("datetime64[s]")
+        return (timestamps % 1000 != 0) | (as_datetime != as_datetime.astype("datetime64[M]").astype("datetime64[s]"))
+    if resolution == "1w":
+        seconds = seconds - WEEK_ALIGN_OFFSET
+    return (timestamps % 1000 != 0) | (seconds % BitoProClient.RESOLUTION_SECONDS[resolution] != 0)
+
+
+def missing_buckets(timestamps: np.ndarray, resolution: str, align_offset: int = 0) -> np.ndarray:
+    """
+    計算每對相鄰 K 線之間缺少的 K 線數量
+
+    1M 依日曆月份計算，其餘時間框架依固定秒數計算。
+
+    Args:
+        timestamps: 已排序且去重的 int64 毫秒時間戳陣列
+        resolution: 時間框架
+        align_offset: K 線邊界相對 UTC 的偏移秒數
+
+    Returns:
+        長度為 len(timestamps) - 1 的 int64 陣列，第 i 個元素為 timestamps[i] 與 timestamps[i + 1] 之間缺少的數量
+    """
+    seconds = timestamps // 1000 - align_offset
+    if resolution == "1M":
+        months = seconds.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        return np.maximum(np.diff(months) - 1, 0)
+    step = BitoProClient.RESOLUTION_SECONDS[resolution]
+    return np.maximum(np.diff(seconds) // step - 1, 0)
+
+
+def validate_ohlc(
+    candles: Union[OHLCColumns, Dict[str, List[Dict[str, Any]]]],
+    resolution: str,
+    align_offset: int = 0,
+    max_examples: int = 20,
+) -> OHLCValidationReport:
+    """
+    以向量化運算一次檢查整批 K 線的不變量
+
+    檢查 low ≤ open/close ≤ high、volume 非負、timestamp 嚴格遞增且對齊時間框架，
+    以及重複與缺少的 K 線。
+
+    Args:
+        candles: OHLCColumns，或 get_ohlc_data 回傳的數據字典
+        resolution: 時間框架
+        align_offset: K 線邊界相對 UTC 的偏移秒數（例如 UTC+8 的日 K 線為 -28800）
+        max_examples: 每個檢查項目最多保留的違規 timestamp 數量
+
+    Returns:
+        OHLCValidationReport 驗證結果
+    """
+    columns = candles if isinstance(candles, OHLCColumns) else OHLCColumns.from_response(candles)
+    if columns.scales is not None and len(set(columns.scales[:4])) != 1:
+        # 價格欄位的精度不同時無法直接比較定點整數
+        columns = columns.to_float()
+
+    timestamps = columns.timestamp
+    open_, high, low, close, volume = columns.values
+    masks = {
+        "low_above_high": low > high,
+        "open_out_of_range": (open_ < low) | (open_ > high),
+        "close_out_of_range": (close < low) | (close > high),
+        "negative_volume": volume < 0,
+        "misaligned_timestamp": _alignment_errors(timestamps, resolution, align_offset),
+    }
+
+    report = OHLCValidationReport(resolution=resolution, candle_count=len(columns))
+    for name, mask in masks.items():
+        report.counts[name] = int(np.count_nonzero(mask))
+        report.examples[name] = timestamps[mask][:max_examples].tolist()
+
+    non_increasing = np.flatnonzero(np.diff(timestamps) <= 0) + 1
+    report.counts["non_increasing_timestamp"] = len(non_increasing)
+    report.examples["non_increasing_timestamp"] = timestamps[non_increasing][:max_examples].tolist()
+
+    unique_timestamps, occurrences = np.unique(timestamps, return_counts=True)
+    duplicated = occurrences > 1
+    report.counts["duplicate_timestamp"] = int((occurrences[duplicated] - 1).sum())
+    report.examples["duplicate_timestamp"] = unique_timestamps[duplicated][:max_examples].tolist()
+
+    missing = missing_buckets(unique_timestamps, resolution, align_offset)
+    gaps = np.flatnonzero(missing)
+    report.counts["missing_bucket"] = int(missing.sum())
+    report.examples["missing_bucket"] = unique_timestamps[gaps][:max_examples].tolist()
+    return report
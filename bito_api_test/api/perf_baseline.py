@@ -0,0 +1,202 @@
+import sqlite3
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+
+from .latency_histogram import LatencyHistogram
+
+# 將 MAD 換算為常態分佈標準差的係數
+MAD_SCALE = 1.4826
+
+
+class PerformanceRegression(Exception):
+    """
+    效能相較基準線退化
+
+    刻意不繼承 AssertionError，讓 Allure 將測試標記為 broken 而不是 failed，
+    以區分功能錯誤與效能退化。
+    """
+
+
+class BaselineStore:
+    """
+    以 SQLite 保存每次執行各指標延遲直方圖的基準線資料庫
+
+    每次執行以 run_id 區分，同一次執行的同一指標重複寫入時會覆蓋。
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        開啟（必要時建立）基準線資料庫
+
+        Args:
+            path: SQLite 檔案路徑
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS latency_histograms (
+                run_id TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                recorded_at REAL NOT NULL,
+                p95 REAL,
+                histogram TEXT NOT NULL,
+                PRIMARY KEY (run_id, metric)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_latency_metric_time ON latency_histograms (metric, recorded_at)"
+        )
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def record(
+        self, run_id: str, metric: str, histogram: LatencyHistogram, recorded_at: Optional[float] = None
+    ) -> None:
+        """
+        保存一次執行中某個指標的延遲直方圖
+
+        Args:
+            run_id: 執行的識別碼
+            metric: 指標名稱，例如 "ohlc.response_time.1m"
+            histogram: 延遲直方圖
+            recorded_at: 記錄時間的 Unix 時間戳，預設為現在
+        """
+        self._connection.execute(
+            "INSERT OR REPLACE INTO latency_histograms (run_id, metric, recorded_at, p95, histogram) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                run_id,
+                metric,
+                time.time() if recorded_at is None else recorded_at,
+                histogram.percentile(95),
+                orjson.dumps(histogram.to_dict()).decode("utf-8"),
+            ),
+        )
+        self._connection.commit()
+
+    def recent_p95(self, metric: str, limit: int = 20, exclude_run_id: Optional[str] = None) -> List[float]:
+        """
+        取得某個指標最近幾次執行的 p95
+
+        Args:
+            metric: 指標名稱
+            limit: 最多取得的執行次數
+            exclude_run_id: 排除的執行（通常是目前這次）
+
+        Returns:
+            由新到舊排列的 p95 列表（秒）
+        """
+        rows = self._connection.execute(
+            "SELECT p95 FROM latency_histograms WHERE metric = ? AND run_id != ? AND p95 IS NOT NULL "
+            "ORDER BY recorded_at DESC LIMIT ?",
+            (metric, exclude_run_id or "", limit),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def histograms(self, metric: str, limit: int = 20) -> List[LatencyHistogram]:
+        """
+        取得某個指標最近幾次執行的延遲直方圖
+
+        Args:
+            metric: 指標名稱
+            limit: 最多取得的執行次數
+
+        Returns:
+            由新到舊排列的 LatencyHistogram 列表
+        """
+        rows = self._connection.execute(
+            "SELECT histogram FROM latency_histograms WHERE metric = ? ORDER BY recorded_at DESC LIMIT ?",
+            (metric, limit),
+        ).fetchall()
+        return [LatencyHistogram.from_dict(orjson.loads(row[0])) for row in rows]
+
+
+@dataclass
+class RegressionVerdict:
+    """單一指標與基準線的比較結果"""
+
+    metric: str
+    current_p95: Optional[float]
+    samples: int
+    baseline_median: Optional[float] = None
+    baseline_mad: Optional[float] = None
+    threshold: Optional[float] = None
+    regressed: bool = False
+
+    @property
+    def has_baseline(self) -> bool:
+        return self.threshold is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "has_baseline": self.has_baseline}
+
+    def describe(self) -> str:
+        if self.current_p95 is None:
+            return f"{self.metric}: 沒有樣本"
+        if not self.has_baseline:
+            return f"{self.metric}: p95 {self.current_p95:.4f} 秒，基準線樣本不足（{self.samples} 次）"
+        status = "退化" if self.regressed else "正常"
+        return (
+            f"{self.metric}: p95 {self.current_p95:.4f} 秒，基準線中位數 {self.baseline_median:.4f} 秒，"
+            f"門檻 {self.threshold:.4f} 秒（{self.samples} 次）→ {status}"
+        )
+
+
+def check_regression(
+    store: BaselineStore,
+    metric: str,
+    current_p95: Optional[float],
+    run_id: Optional[str] = None,
+    window: int = 20,
+    min_samples: int = 5,
+    k: float = 3.0,
+    min_relative: float = 0.1,
+) -> RegressionVerdict:
+    """
+    將目前的 p95 與最近幾次執行的基準線比較
+
+    門檻為 中位數 + max(k × 1.4826 × MAD, min_relative × 中位數)：
+    以中位數與 MAD 估計基準線的分佈，不受少數異常執行影響；
+    min_relative 避免基準線非常穩定時，微小的波動也被判為退化。
+
+    Args:
+        store: 基準線資料庫
+        metric: 指標名稱
+        current_p95: 目前這次執行的 p95（秒）
+        run_id: 目前這次執行的識別碼，比較時排除
+        window: 基準線採用的最近執行次數
+        min_samples: 基準線至少需要的執行次數，不足時不判定退化
+        k: 允許偏離的 MAD 倍數
+        min_relative: 最小允許的相對增幅
+
+    Returns:
+        RegressionVerdict 實例
+    """
+    history = store.recent_p95(metric, limit=window, exclude_run_id=run_id)
+    verdict = RegressionVerdict(metric=metric, current_p95=current_p95, samples=len(history))
+    if current_p95 is None or len(history) < min_samples:
+        return verdict
+
+    median = statistics.median(history)
+    mad = statistics.median(abs(value - median) for value in history)
+    verdict.baseline_median = median
+    verdict.baseline_mad = mad
+    verdict.threshold = median + max(k * MAD_SCALE * mad, min_relative * median)
+    verdict.regressed = current_p95 > verdict.threshold
+    return verdict
@@ -0,0 +1,232 @@
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from loguru import logger
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+# BitoPro 公開 API 的預設速率上限（每秒請求數）
+DEFAULT_RATE = 10.0
+
+
+@dataclass
+class RateLimitMetrics:
+    """令牌桶的等待統計"""
+
+    acquisitions: int = 0
+    # 需要等待才取得令牌的次數
+    waits: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    # 收到 429 的次數
+    throttled: int = 0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.acquisitions if self.acquisitions else 0.0
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        return {**asdict(self), "avg_wait": self.avg_wait}
+
+
+class TokenBucket:
+    """
+    非同步令牌桶
+
+    每秒補充 rate 個令牌，最多累積 capacity 個。取得令牌的協程依先後順序排隊，
+    pause 可讓整個桶在指定秒數內停止發放令牌（例如伺服器回傳 Retry-After 時）。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+    ):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒補充的令牌數
+            capacity: 令牌上限（允許的突發量），預設等於 rate
+            min_rate: 自動調整時的最低速率，預設為 rate 的 5%
+            max_rate: 自動調整時的最高速率，預設為 rate
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.capacity = max(capacity if capacity is not None else rate, 1.0)
+        self.min_rate = min_rate if min_rate is not None else rate * 0.05
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.rate = rate
+        self.metrics = RateLimitMetrics()
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def set_rate(self, rate: float) -> None:
+        """在 min_rate 與 max_rate 範圍內調整補充速率"""
+        self._refill(time.monotonic())
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def pause(self, seconds: float) -> None:
+        """在接下來的 seconds 秒內停止發放令牌"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 0.0)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        取得令牌，令牌不足時等待
+
+        Args:
+            tokens: 需要的令牌數
+
+        Returns:
+            實際等待的秒數
+        """
+        started_at = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                else:
+                    delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+
+        waited = time.monotonic() - started_at
+        self.metrics.acquisitions += 1
+        if waited > 0.001:
+            self.metrics.waits += 1
+            self.metrics.total_wait += waited
+            self.metrics.max_wait = max(self.metrics.max_wait, waited)
+        return waited
+
+
+class RateLimiter:
+    """
+    依端點區分的共享速率限制器
+
+    每個端點各有一個令牌桶，並根據回應的速率限制標頭自動調整補充速率：
+    收到 429 時依 Retry-After 暫停並將速率減半；標頭顯示剩餘配額不足以維持
+    目前速率時降低速率；其餘成功回應則逐步恢復到設定的上限。
+    """
+
+    # 讀取的速率限制標頭（不分大小寫）
+    LIMIT_HEADER = "x-ratelimit-limit"
+    REMAINING_HEADER = "x-ratelimit-remaining"
+    RESET_HEADER = "x-ratelimit-reset"
+    RETRY_AFTER_HEADER = "retry-after"
+
+    # 成功回應時每次恢復的速率比例（相對於上限）
+    RECOVERY_STEP = 0.05
+
+    def __init__(
+        self,
+        default_rate: float = DEFAULT_RATE,
+        default_capacity: Optional[float] = None,
+        endpoint_rates: Optional[Mapping[str, Union[float, Tuple[float, float]]]] = None,
+        adaptive: bool = True,
+    ):
+        """
+        初始化速率限制器
+
+        Args:
+            default_rate: 未個別設定的端點使用的每秒請求數
+            default_capacity: 未個別設定的端點允許的突發量
+            endpoint_rates: 個別端點的設定，值為每秒請求數或 (每秒請求數, 突發量)
+            adaptive: 是否根據回應標頭自動調整速率
+        """
+        self.default_rate = default_rate
+        self.default_capacity = default_capacity
+        self.adaptive = adaptive
+        self._endpoint_rates = dict(endpoint_rates or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._logger = logger
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        """取得（必要時建立）端點的令牌桶"""
+        if endpoint not in self._buckets:
+            setting = self._endpoint_rates.get(endpoint, (self.default_rate, self.default_capacity))
+            rate, capacity = setting if isinstance(setting, tuple) else (setting, None)
+            self._buckets[endpoint] = TokenBucket(rate, capacity)
+        return self._buckets[endpoint]
+
+    async def acquire(self, endpoint: str) -> float:
+        """
+        取得端點的一個令牌
+
+        Args:
+            endpoint: 端點名稱，例如 trading-history
+
+        Returns:
+            實際等待的秒數
+        """
+        return await self.bucket(endpoint).acquire()
+
+    def update_from_response(self, endpoint: str, status: int, headers: Mapping[str, Any]) -> None:
+        """
+        根據回應狀態與速率限制標頭調整端點的補充速率
+
+        Args:
+            endpoint: 端點名稱
+            status: HTTP 狀態碼
+            headers: 回應標頭
+        """
+        if not self.adaptive:
+            return
+
+        bucket = self.bucket(endpoint)
+        hints = {str(key).lower(): value for key, value in headers.items()}
+
+        if status == 429:
+            bucket.metrics.throttled += 1
+            retry_after = self._parse_seconds(hints.get(self.RETRY_AFTER_HEADER))
+            bucket.pause(retry_after if retry_after is not None else 1.0 / bucket.rate)
+            bucket.set_rate(bucket.rate / 2)
+            self._logger.warning(f"Rate limited on {endpoint}, slowing down to {bucket.rate:.2f} req/s")
+            return
+
+        remaining = self._parse_number(hints.get(self.REMAINING_HEADER))
+        reset_in = self._parse_seconds(hints.get(self.RESET_HEADER))
+        if remaining is not None and reset_in is not None:
+            sustainable = remaining / max(reset_in, 1.0)
+            if sustainable < bucket.rate:
+                bucket.set_rate(sustainable)
+                return
+
+        if bucket.rate < bucket.max_rate:
+            bucket.set_rate(bucket.rate + bucket.max_rate * self.RECOVERY_STEP)
+
+    @staticmethod
+    def _parse_number(value: Any) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _parse_seconds(cls, value: Any) -> Optional[float]:
+        """解析秒數標頭，大於 10^9 的值視為 Unix 時間戳（大於 10^12 時為毫秒）"""
+        seconds = cls._parse_number(value)
+        if seconds is None:
+            return None
+        if seconds > 1e12:
+            seconds = seconds / 1000 - time.time()
+        elif seconds > 1e9:
+            seconds -= time.time()
+        return max(seconds, 0.0)
+
+    def metrics(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """各端點的等待統計與目前速率"""
+        return {
+            endpoint: {**bucket.metrics.to_dict(), "rate": bucket.rate} for endpoint, bucket in self._buckets.items()
+        }
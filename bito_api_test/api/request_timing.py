@@ -0,0 +1,191 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+
+import aiohttp
+
+from .latency_histogram import LatencyHistogram
+
+# 單次請求拆分出的各階段（秒）
+TIMING_PHASES = ("dns", "connect", "ttfb", "transfer", "decode", "total")
+
+
+@dataclass
+class RequestTimings:
+    """
+    單次請求各階段的耗時
+
+    由 create_trace_config 的 hook 與客戶端在請求過程中打點，finish 時換算成各階段秒數：
+    dns 為域名解析，connect 為 TCP 與 TLS 建立，ttfb 為連線就緒到收到響應標頭，
+    transfer 為讀取響應內容，decode 為解析 JSON，total 為整個請求。
+    重用連線或 DNS 快取命中時對應階段為 0；session 未掛上 trace config 時為 None。
+    """
+
+    dns: Optional[float] = None
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    transfer: Optional[float] = None
+    decode: Optional[float] = None
+    total: Optional[float] = None
+    connection_reused: bool = False
+    marks: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    def mark(self, name: str) -> None:
+        """記錄某個事件的時間點，同名事件只保留第一次"""
+        self.marks.setdefault(name, time.perf_counter())
+
+    def _span(self, start: str, end: str) -> Optional[float]:
+        if start not in self.marks or end not in self.marks:
+            return None
+        return self.marks[end] - self.marks[start]
+
+    def finish(self) -> "RequestTimings":
+        """
+        依打點換算各階段耗時
+
+        Returns:
+            自身，方便串接
+        """
+        marks = self.marks
+        self.dns = 0.0 if "dns_cache_hit" in marks else self._span("dns_start", "dns_end")
+        if self.connection_reused:
+            self.connect = 0.0
+        else:
+            connection = self._span("connect_start", "connected")
+            self.connect = None if connection is None else max(connection - (self.dns or 0.0), 0.0)
+        self.ttfb = self._span("connected" if "connected" in marks else "request_start", "headers")
+        self.transfer = self._span("headers", "body_read")
+        self.decode = self._span("body_read", "decoded")
+        self.total = self._span("request_start", "decoded")
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**{phase: getattr(self, phase) for phase in TIMING_PHASES}, "connection_reused": self.connection_reused}
+
+
+def _timings(trace_config_ctx: Any) -> Optional[RequestTimings]:
+    ctx = trace_config_ctx.trace_request_ctx
+    return ctx if isinstance(ctx, RequestTimings) else None
+
+
+def _mark_hook(name: str):
+    async def hook(session: aiohttp.ClientSession, trace_config_ctx: Any, params: Any) -> None:
+        timings = _timings(trace_config_ctx)
+        if timings is not None:
+            timings.mark(name)
+
+    return hook
+
+
+async def _on_connection_reuseconn(session: aiohttp.ClientSession, trace_config_ctx: Any, params: Any) -> None:
+    timings = _timings(trace_config_ctx)
+    if timings is not None:
+        timings.connection_reused = True
+        timings.mark("connected")
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """
+    建立記錄請求各階段時間點的 TraceConfig
+
+    只有以 trace_request_ctx=RequestTimings() 發出的請求會被記錄，其他請求不受影響。
+
+    Returns:
+        aiohttp.TraceConfig 實例
+    """
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_mark_hook("request_start"))
+    trace_config.on_dns_resolvehost_start.append(_mark_hook("dns_start"))
+    trace_config.on_dns_resolvehost_end.append(_mark_hook("dns_end"))
+    trace_config.on_dns_cache_hit.append(_mark_hook("dns_cache_hit"))
+    trace_config.on_connection_create_start.append(_mark_hook("connect_start"))
+    trace_config.on_connection_create_end.append(_mark_hook("connected"))
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_request_end.append(_mark_hook("headers"))
+    return trace_config
+
+
+class TimingStats:
+    """彙整多個請求的各階段耗時，用於區分網路端與伺服器端的效能退化"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in TIMING_PHASES}
+        self.requests = 0
+        self.reused_connections = 0
+
+    def record(self, timings: RequestTimings) -> None:
+        """
+        加入一個已完成請求的耗時
+
+        Args:
+            timings: 已呼叫 finish 的 RequestTimings
+        """
+        self.requests += 1
+        self.reused_connections += timings.connection_reused
+        for phase in TIMING_PHASES:
+            value = getattr(timings, phase)
+            if value is not None:
+                self.histograms[phase].record(value)
+
+    def merge(self, other: "TimingStats") -> "TimingStats":
+        """
+        併入另一個 TimingStats 的統計（例如其他客戶端或 worker）
+
+        Args:
+            other: 要併入的 TimingStats
+
+        Returns:
+            自身，方便串接
+        """
+        self.requests += other.requests
+        self.reused_connections += other.reused_connections
+        for phase, histogram in self.histograms.items():
+            histogram.merge(other.histograms[phase])
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        序列化為可轉成 JSON 的字典，例如讓 worker 行程將統計交給主行程合併
+
+        Returns:
+            可傳給 from_dict 還原的字典
+        """
+        return {
+            "requests": self.requests,
+            "reused_connections": self.reused_connections,
+            "histograms": {phase: histogram.to_dict() for phase, histogram in self.histograms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TimingStats":
+        """
+        從 to_dict 的結果還原統計
+
+        Args:
+            data: to_dict 產生的字典
+
+        Returns:
+            TimingStats 實例
+        """
+        stats = cls()
+        stats.requests = data["requests"]
+        stats.reused_connections = data["reused_connections"]
+        for phase, histogram in data["histograms"].items():
+            stats.histograms[phase] = LatencyHistogram.from_dict(histogram)
+        return stats
+
+    def summary(self) -> Dict[str, Union[int, Dict[str, float]]]:
+        """
+        取得各階段的統計
+
+        Returns:
+            各階段的樣本數、平均、最小、最大、p50、p95 與 p99（秒），以及請求數與重用連線數
+        """
+        summary: Dict[str, Union[int, Dict[str, float]]] = {
+            "requests": self.requests,
+            "reused_connections": self.reused_connections,
+        }
+        for phase, histogram in self.histograms.items():
+            if histogram.count:
+                summary[phase] = histogram.summary((50, 95, 99))
+        return summary
@@ -0,0 +1,123 @@
+import asyncio
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, FrozenSet, Optional
+
+import aiohttp
+import numpy as np
+
+
+class RetryBudget:
+    """整次執行共用的重試額度，避免伺服器異常時重試放大流量"""
+
+    def __init__(self, max_retries: int = 100):
+        """
+        初始化重試額度
+
+        Args:
+            max_retries: 整次執行允許的重試總次數
+        """
+        self.max_retries = max_retries
+        self.spent = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(self.max_retries - self.spent, 0)
+
+    def try_spend(self) -> bool:
+        """嘗試使用一次重試額度，額度用完時返回 False"""
+        if self.spent >= self.max_retries:
+            return False
+        self.spent += 1
+        return True
+
+
+@dataclass
+class RetryPolicy:
+    """
+    冪等 GET 請求的重試策略
+
+    只重試連線錯誤、逾時與 retry_statuses 中的狀態碼，
+    等待時間為指數退避加上完整抖動（0 到退避上限之間的隨機值），
+    429 回應帶有 Retry-After 時至少等待該秒數。
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    budget: Optional[RetryBudget] = None
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """判斷錯誤是否值得重試"""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in self.retry_statuses
+        if isinstance(error, aiohttp.ClientSSLError):
+            return False
+        return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """
+        判斷第 attempt 次嘗試失敗後是否重試，會消耗重試額度
+
+        Args:
+            error: 本次嘗試的錯誤
+            attempt: 已嘗試的次數（從 1 開始）
+
+        Returns:
+            是否應該重試
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return False
+        return self.budget is None or self.budget.try_spend()
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        計算第 attempt 次失敗後的等待秒數
+
+        Args:
+            attempt: 已嘗試的次數（從 1 開始）
+            error: 本次嘗試的錯誤，用於讀取 Retry-After
+
+        Returns:
+            等待秒數
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        headers = getattr(error, "headers", None)
+        if headers and "Retry-After" in headers:
+            try:
+                delay = max(delay, min(float(headers["Retry-After"]), self.max_delay))
+            except ValueError:
+                pass
+        return delay
+
+
+@dataclass
+class HedgePolicy:
+    """
+    對沖請求策略
+
+    請求超過近期延遲的指定百分位數仍未完成時，再發送一個相同的請求，
+    採用先完成的結果並取消另一個。樣本數不足 min_samples 時不對沖。
+    """
+
+    percentile: float = 95.0
+    min_samples: int = 20
+    min_delay: float = 0.05
+    window: int = 200
+    latencies: Deque[float] = field(default_factory=deque)
+    hedged: int = 0
+
+    def __post_init__(self):
+        self.latencies = deque(self.latencies, maxlen=self.window)
+
+    def record(self, latency: float) -> None:
+        """記錄一次成功請求的延遲（秒）"""
+        self.latencies.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """目前的對沖等待秒數，樣本不足時為 None"""
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, float(np.percentile(self.latencies, self.percentile)))
@@ -0,0 +1,99 @@
+import asyncio
+import weakref
+from dataclasses import dataclass
+from loguru import logger
+from typing import Any, Optional
+
+import aiohttp
+import orjson
+
+from .request_timing import create_trace_config
+
+
+@dataclass(frozen=True)
+class ConnectorConfig:
+    """aiohttp 連線池設定"""
+
+    # 連線池總上限
+    limit: int = 100
+    # 每個主機的連線上限
+    limit_per_host: int = 20
+    # 閒置連線保持的秒數
+    keepalive_timeout: float = 30.0
+    # DNS 快取的秒數，None 表示停用 DNS 快取
+    ttl_dns_cache: Optional[int] = 300
+    # 是否啟用 Happy Eyeballs（IPv4/IPv6 併發連線）
+    happy_eyeballs: bool = True
+    # Happy Eyeballs 嘗試下一個位址前的等待秒數
+    happy_eyeballs_delay: float = 0.25
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """
+        根據設定建立 TCPConnector
+
+        Returns:
+            aiohttp.TCPConnector 實例
+        """
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.ttl_dns_cache is not None,
+            ttl_dns_cache=self.ttl_dns_cache,
+            happy_eyeballs_delay=self.happy_eyeballs_delay if self.happy_eyeballs else None,
+        )
+
+
+DEFAULT_CONNECTOR_CONFIG = ConnectorConfig()
+
+# 每個事件循環各自持有一個共享 session（aiohttp session 不能跨事件循環使用）
+_shared_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def create_session(config: Optional[ConnectorConfig] = None, **kwargs: Any) -> aiohttp.ClientSession:
+    """
+    建立使用連線池設定的 aiohttp.ClientSession
+
+    Args:
+        config: 連線池設定，未提供時使用 DEFAULT_CONNECTOR_CONFIG
+        **kwargs: 傳給 aiohttp.ClientSession 的其他參數，trace_configs 會再加上記錄耗時的設定
+
+    Returns:
+        新的 aiohttp.ClientSession 實例，由呼叫端負責關閉
+    """
+    config = config or DEFAULT_CONNECTOR_CONFIG
+    kwargs.setdefault("json_serialize", orjson.dumps)
+    kwargs["trace_configs"] = [*kwargs.get("trace_configs", ()), create_trace_config()]
+    return aiohttp.ClientSession(connector=config.create_connector(), **kwargs)
+
+
+def get_shared_session(config: Optional[ConnectorConfig] = None) -> aiohttp.ClientSession:
+    """
+    取得目前事件循環的共享 session，不存在或已關閉時建立新的
+
+    同一事件循環內的所有呼叫者共用同一個連線池，以重用已建立的連線。
+
+    Args:
+        config: 連線池設定，只在建立新 session 時生效
+
+    Returns:
+        共享的 aiohttp.ClientSession 實例，請使用 close_shared_session 關閉
+    """
+    loop = asyncio.get_running_loop()
+    session = _shared_sessions.get(loop)
+    if session is None or session.closed:
+        session = create_session(config)
+        _shared_sessions[loop] = session
+        logger.debug(f"Created shared aiohttp session with {config or DEFAULT_CONNECTOR_CONFIG}")
+    elif config is not None and config != DEFAULT_CONNECTOR_CONFIG:
+        logger.warning("Shared aiohttp session already exists, ignoring the new connector config")
+    return session
+
+
+async def close_shared_session() -> None:
+    """關閉目前事件循環的共享 session"""
+    session = _shared_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -0,0 +1,300 @@
+import os
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from loguru import logger
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import orjson
+
+from .request_timing import TimingStats
+
+# 傳給 worker 行程的效能基準線執行識別碼，讓所有 worker 的結果屬於同一次執行
+PERF_RUN_ID_ENV = "BITOPRO_PERF_RUN_ID"
+
+# pytest 沒有收集到任何測試時的結束代碼，分片數多於測試分組時會發生，不視為失敗
+PYTEST_NO_TESTS_COLLECTED = 5
+
+# pytest 被中斷時的結束代碼，worker 逾時或被訊號終止時以此回報
+PYTEST_INTERRUPTED = 2
+
+# 單一 worker 的預設最長執行秒數，逾時後先 terminate，等待 WORKER_KILL_GRACE 秒仍未結束則 kill
+DEFAULT_WORKER_TIMEOUT = 3600.0
+WORKER_KILL_GRACE = 10.0
+
+# 檢查 worker 是否結束的間隔秒數
+WORKER_POLL_INTERVAL = 0.2
+
+# 寫入 Allure environment.properties 的百分位數
+ENVIRONMENT_PERCENTILES = (50, 95, 99)
+
+
+def shard_group(nodeid: str) -> str:
+    """
+    取得測試項目的分組鍵
+
+    同一個測試類別（沒有類別時為同一個模組）的測試分到同一個 worker，
+    讓 class 與 module 範圍的 fixture 和預先獲取的數據只在一個行程中建立。
+
+    Args:
+        nodeid: pytest 的測試項目 nodeid，例如 "tests/test_ohlc_api.py::TestOHLCApi::test_x[1m]"
+
+    Returns:
+        例如 "tests/test_ohlc_api.py::TestOHLCApi"
+    """
+    parts = nodeid.split("::")
+    return "::".join(parts[:2]) if len(parts) > 2 else parts[0]
+
+
+def assign_shards(nodeids: Sequence[str], shard_count: int) -> Dict[str, int]:
+    """
+    將測試項目依分組分配到各個 worker
+
+    分組依測試數量由多到少，逐一分配給目前測試數量最少的 worker（最長處理時間優先），
+    結果只取決於 nodeid 集合，與收集順序無關，因此每個 worker 獨立計算都會得到相同的分配。
+
+    Args:
+        nodeids: 所有測試項目的 nodeid
+        shard_count: worker 數量
+
+    Returns:
+        nodeid 對應 worker 編號（從 0 開始）的字典
+    """
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+    groups: Dict[str, List[str]] = {}
+    for nodeid in nodeids:
+        groups.setdefault(shard_group(nodeid), []).append(nodeid)
+
+    loads = [0] * shard_count
+    assignment: Dict[str, int] = {}
+    for group in sorted(groups, key=lambda name: (-len(groups[name]), name)):
+        shard = min(range(shard_count), key=loads.__getitem__)
+        loads[shard] += len(groups[group])
+        for nodeid in groups[group]:
+            assignment[nodeid] = shard
+    return assignment
+
+
+def environment_properties(timing: TimingStats, shard_count: int) -> Dict[str, str]:
+    """
+    將合併後的各階段耗時轉成 Allure 環境資訊
+
+    Args:
+        timing: 所有 worker 合併後的耗時統計
+        shard_count: worker 數量
+
+    Returns:
+        例如 {"shards": "4", "requests": "120", "total.p95": "0.1234", ...}（秒）
+    """
+    properties = {
+        "shards": str(shard_count),
+        "requests": str(timing.requests),
+        "reused_connections": str(timing.reused_connections),
+    }
+    for phase, histogram in timing.histograms.items():
+        if not histogram.count:
+            continue
+        properties[f"{phase}.count"] = str(histogram.count)
+        for name, value in histogram.percentiles(ENVIRONMENT_PERCENTILES).items():
+            properties[f"{phase}.{name}"] = f"{value:.4f}"
+    return properties
+
+
+def write_allure_environment(alluredir: Union[str, Path], properties: Dict[str, str]) -> Path:
+    """
+    寫入 Allure 報告總覽頁顯示的 environment.properties，保留檔案中已有的其他項目
+
+    Args:
+        alluredir: Allure 結果目錄
+        properties: 要寫入的項目
+
+    Returns:
+        environment.properties 的路徑
+    """
+    path = Path(alluredir) / "environment.properties"
+    merged: Dict[str, str] = {}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            key, separator, value = line.partition("=")
+            if separator and not key.startswith("#"):
+                merged[key.strip()] = value.strip()
+    merged.update(properties)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"{key}={value}\n" for key, value in merged.items()), encoding="utf-8")
+    return path
+
+
+@dataclass
+class ShardResult:
+    """單一 worker 行程的執行結果"""
+
+    index: int
+    returncode: int
+    elapsed: float
+    log_path: Path
+    timing_path: Path
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.timed_out and self.returncode in (0, PYTEST_NO_TESTS_COLLECTED)
+
+
+@dataclass
+class ShardedRunResult:
+    """分片執行的整體結果，timing 為所有 worker 合併後的各階段耗時"""
+
+    shards: List[ShardResult] = field(default_factory=list)
+    timing: TimingStats = field(default_factory=TimingStats)
+    elapsed: float = 0.0
+
+    @property
+    def returncode(self) -> int:
+        """
+        所有 worker 中最嚴重的 pytest 結束代碼，沒有收集到測試的 worker 視為成功，
+        逾時或被訊號終止（結束代碼為負數）的 worker 視為中斷
+        """
+        codes = [
+            0 if shard.ok else shard.returncode if shard.returncode > 0 else PYTEST_INTERRUPTED
+            for shard in self.shards
+        ]
+        return max(codes, default=0)
+
+
+def _stop_worker(process: subprocess.Popen) -> int:
+    """先 terminate，等待 WORKER_KILL_GRACE 秒仍未結束則 kill，回傳結束代碼"""
+    process.terminate()
+    try:
+        return process.wait(WORKER_KILL_GRACE)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        return process.wait()
+
+
+def _run_workers(
+    commands: Dict[int, List[str]],
+    work_dir: Path,
+    result: ShardedRunResult,
+    cwd: Optional[Union[str, Path]],
+    env: Dict[str, str],
+    worker_timeout: Optional[float],
+) -> None:
+    """
+    同時啟動 commands 中的 worker 行程，等待全部結束（或逾時終止）並把結果加入 result
+
+    Args:
+        commands: worker 編號對應的 pytest 參數（不含 --timing-dump）
+        work_dir: 存放 worker 日誌與耗時統計的目錄
+        result: 要加入 ShardResult 與合併耗時統計的 ShardedRunResult
+        cwd: worker 的工作目錄
+        env: worker 的環境變數
+        worker_timeout: 單一 worker 的最長執行秒數，None 表示不限制
+    """
+    started_at = time.perf_counter()
+    workers = []
+    for index, args in commands.items():
+        log_path = work_dir / f"shard-{index}.log"
+        timing_path = work_dir / f"timing-{index}.json"
+        timing_path.unlink(missing_ok=True)
+        command = [sys.executable, "-m", "pytest", *args, f"--timing-dump={timing_path}"]
+        log_file = log_path.open("wb")
+        process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT, cwd=cwd, env=env)
+        workers.append((index, process, log_file, log_path, timing_path))
+    logger.info(f"Started {len(workers)} pytest workers, logs in {work_dir}")
+
+    # 輪詢而非依序等待，讓每個 worker 的耗時反映實際結束的時間
+    pending = workers
+    while pending:
+        time.sleep(WORKER_POLL_INTERVAL)
+        running = []
+        for worker in pending:
+            index, process, log_file, log_path, timing_path = worker
+            returncode = process.poll()
+            timed_out = returncode is None and worker_timeout is not None
+            timed_out = timed_out and time.perf_counter() - started_at > worker_timeout
+            if returncode is None and not timed_out:
+                running.append(worker)
+                continue
+            if timed_out:
+                logger.error(f"Shard {index} exceeded {worker_timeout}s, terminating")
+                returncode = _stop_worker(process)
+            log_file.close()
+            result.shards.append(
+                ShardResult(
+                    index=index,
+                    returncode=returncode,
+                    elapsed=time.perf_counter() - started_at,
+                    log_path=log_path,
+                    timing_path=timing_path,
+                    timed_out=timed_out,
+                )
+            )
+            if timing_path.exists():
+                result.timing.merge(TimingStats.from_dict(orjson.loads(timing_path.read_bytes())))
+            logger.info(f"Shard {index} finished with exit code {returncode}")
+        pending = running
+
+
+def run_sharded_tests(
+    test_path: Union[str, Path],
+    shard_count: int,
+    alluredir: Union[str, Path],
+    extra_args: Sequence[str] = (),
+    work_dir: Optional[Union[str, Path]] = None,
+    cwd: Optional[Union[str, Path]] = None,
+    worker_timeout: Optional[float] = DEFAULT_WORKER_TIMEOUT,
+    perf_phase: bool = True,
+) -> ShardedRunResult:
+    """
+    將測試分配到多個 pytest worker 行程並行執行，再合併結果
+
+    每個 worker 以 --shard-index/--shard-count 只執行分配到的測試，擁有自己的連線池與客戶端，
+    整體的請求速率與重試額度由 conftest 依 worker 數量平均分配，總和不超過單一行程時的上限。
+    標記為 performance 的測試不分片：所有 worker 結束後，再以單一行程（編號為 shard_count）
+    加上 --perf-phase 執行，取得完整的額度，而任何時刻的總速率仍不超過上限。
+    執行超過 worker_timeout 秒的 worker 會被終止，不會讓整個執行卡住。
+    所有 worker 寫入同一個 Allure 結果目錄（檔名皆為 UUID，不會衝突），
+    各 worker 的請求耗時直方圖合併後寫入 environment.properties，顯示在報告總覽頁。
+
+    Args:
+        test_path: 測試目錄或檔案
+        shard_count: worker 數量
+        alluredir: Allure 結果目錄
+        extra_args: 額外傳給每個 worker 的 pytest 參數
+        work_dir: 存放 worker 日誌與耗時統計的目錄，預設為 alluredir 旁的 shard-logs
+        cwd: worker 的工作目錄，預設為目前目錄
+        worker_timeout: 單一 worker 的最長執行秒數，None 表示不限制
+        perf_phase: 是否在所有 worker 結束後執行效能測試階段
+
+    Returns:
+        ShardedRunResult 實例
+    """
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+    alluredir = Path(alluredir)
+    work_dir = Path(work_dir) if work_dir is not None else alluredir.parent / "shard-logs"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    env = {**os.environ, PERF_RUN_ID_ENV: f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"}
+    common_args = [str(test_path), f"--alluredir={alluredir}", *extra_args]
+
+    started_at = time.perf_counter()
+    result = ShardedRunResult()
+    shard_commands = {
+        index: [*common_args, f"--shard-index={index}", f"--shard-count={shard_count}"] for index in range(shard_count)
+    }
+    _run_workers(shard_commands, work_dir, result, cwd, env, worker_timeout)
+    if perf_phase:
+        _run_workers({shard_count: [*common_args, "--perf-phase"]}, work_dir, result, cwd, env, worker_timeout)
+    result.shards.sort(key=lambda shard: shard.index)
+    result.elapsed = time.perf_counter() - started_at
+
+    write_allure_environment(alluredir, environment_properties(result.timing, shard_count))
+    (work_dir / "timing-merged.json").write_bytes(
+        orjson.dumps({"summary": result.timing.summary(), "stats": result.timing.to_dict()})
+    )
+    return result
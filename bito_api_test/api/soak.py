@@ -0,0 +1,341 @@
+import asyncio
+import csv
+import io
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from loguru import logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import aiohttp
+import numpy as np
+import orjson
+
+from .bitopro_client import BitoProClient, OHLCJob
+from .load_generator import run_open_load
+
+# 檢查漂移的指標
+SOAK_METRICS = ("rss_bytes", "open_sockets", "connections_in_use", "connections_idle", "p50", "p99")
+
+# 每個取樣區間內輪詢連線池的次數，請求進行中的連線只有在負載期間才看得到
+CONNECTOR_POLLS_PER_SAMPLE = 20
+
+
+def read_rss_bytes() -> Optional[int]:
+    """
+    讀取目前行程的常駐記憶體（RSS）
+
+    Returns:
+        位元組數，非 Linux 系統時為 None
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def count_open_sockets() -> Optional[int]:
+    """
+    計算目前行程開啟的 socket 數量
+
+    Returns:
+        socket 數量，非 Linux 系統時為 None
+    """
+    fd_dir = "/proc/self/fd"
+    try:
+        names = os.listdir(fd_dir)
+    except OSError:
+        return None
+    count = 0
+    for name in names:
+        try:
+            if os.readlink(os.path.join(fd_dir, name)).startswith("socket:"):
+                count += 1
+        except OSError:
+            # 讀取期間已關閉的檔案描述符
+            continue
+    return count
+
+
+def connector_occupancy(session: Optional[aiohttp.ClientSession]) -> Optional[int]:
+    """
+    取得連線池中正在使用的連線數
+
+    aiohttp 沒有公開這個數值，這裡讀取 TCPConnector 的內部集合，版本不支援時回傳 None。
+
+    Args:
+        session: aiohttp.ClientSession 實例
+
+    Returns:
+        正在使用的連線數
+    """
+    acquired = getattr(getattr(session, "connector", None), "_acquired", None)
+    return len(acquired) if acquired is not None else None
+
+
+def connector_idle(session: Optional[aiohttp.ClientSession]) -> Optional[int]:
+    """
+    取得連線池中閒置、可供重用的連線數
+
+    與 connector_occupancy 相同，讀取 TCPConnector 的內部結構，版本不支援時回傳 None。
+
+    Args:
+        session: aiohttp.ClientSession 實例
+
+    Returns:
+        閒置的連線數
+    """
+    conns = getattr(getattr(session, "connector", None), "_conns", None)
+    return sum(len(pooled) for pooled in conns.values()) if conns is not None else None
+
+
+async def _poll_connector(
+    session: Optional[aiohttp.ClientSession], interval: float, in_use: List[int], idle: List[int]
+) -> None:
+    """每 interval 秒記錄一次連線池的使用中與閒置連線數，直到被取消"""
+    while True:
+        busy, pooled = connector_occupancy(session), connector_idle(session)
+        if busy is not None:
+            in_use.append(busy)
+        if pooled is not None:
+            idle.append(pooled)
+        await asyncio.sleep(interval)
+
+
+def _mean(values: Sequence[int]) -> Optional[float]:
+    return float(np.mean(values)) if values else None
+
+
+@dataclass
+class SoakSample:
+    """
+    一個取樣區間的資源用量與延遲
+
+    rss_bytes 與 open_sockets 為區間結束時的數值；connections_in_use、connections_idle 為區間內
+    定期輪詢連線池的平均值，connections_in_use_max 為區間內的最大值。
+    """
+
+    elapsed: float
+    requests: int
+    errors: int
+    rss_bytes: Optional[int]
+    open_sockets: Optional[int]
+    connections_in_use: Optional[float]
+    connections_in_use_max: Optional[int]
+    connections_idle: Optional[float]
+    p50: Optional[float]
+    p99: Optional[float]
+
+
+@dataclass
+class DriftFinding:
+    """
+    單一指標的漂移判定
+
+    trend 為 Kendall tau（時間與數值的等級相關，1 表示單調遞增），
+    growth 為最後三分之一樣本的中位數相對最前三分之一的增幅。
+    """
+
+    metric: str
+    samples: int
+    trend: Optional[float] = None
+    growth: Optional[float] = None
+    drifting: bool = False
+
+
+def detect_drift(
+    metric: str,
+    values: Sequence[Optional[float]],
+    min_samples: int = 6,
+    min_trend: float = 0.6,
+    min_growth: float = 0.2,
+) -> DriftFinding:
+    """
+    判斷時間序列是否持續單調成長
+
+    同時要求趨勢夠一致（Kendall tau 至少 min_trend）與成長幅度夠大（至少 min_growth），
+    避免把穩定但有雜訊的序列，或單調但幅度極小的成長誤判為洩漏。
+
+    Args:
+        metric: 指標名稱
+        values: 依時間排列的數值，None 表示該次未取得
+        min_samples: 至少需要的樣本數，不足時不判定
+        min_trend: Kendall tau 門檻
+        min_growth: 相對增幅門檻
+
+    Returns:
+        DriftFinding 實例
+    """
+    series = np.asarray([value for value in values if value is not None], dtype=np.float64)
+    finding = DriftFinding(metric=metric, samples=len(series))
+    if len(series) < min_samples:
+        return finding
+
+    # Kendall tau：所有樣本對中遞增減去遞減的比例
+    diffs = np.sign(series[None, :] - series[:, None])
+    pairs = len(series) * (len(series) - 1) / 2
+    finding.trend = float(np.triu(diffs, k=1).sum() / pairs)
+
+    third = max(len(series) // 3, 1)
+    head, tail = float(np.median(series[:third])), float(np.median(series[-third:]))
+    finding.growth = (tail - head) / head if head > 0 else (float("inf") if tail > 0 else 0.0)
+    finding.drifting = finding.trend >= min_trend and finding.growth >= min_growth
+    return finding
+
+
+@dataclass
+class SoakReport:
+    """長時間執行的時間序列與漂移判定"""
+
+    samples: List[SoakSample] = field(default_factory=list)
+    findings: List[DriftFinding] = field(default_factory=list)
+
+    @property
+    def drifting(self) -> List[DriftFinding]:
+        return [finding for finding in self.findings if finding.drifting]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "samples": [asdict(sample) for sample in self.samples],
+            "findings": [asdict(finding) for finding in self.findings],
+        }
+
+    def to_csv(self) -> str:
+        """
+        將時間序列轉成 CSV
+
+        Returns:
+            每個取樣一列的 CSV 字串
+        """
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(SoakSample.__dataclass_fields__))
+        writer.writeheader()
+        for sample in self.samples:
+            writer.writerow(asdict(sample))
+        return output.getvalue()
+
+    def summary(self) -> str:
+        """
+        產生適合附加到測試報告的文字摘要
+
+        Returns:
+            各指標的趨勢與增幅表格
+        """
+        duration = self.samples[-1].elapsed if self.samples else 0.0
+        requests = sum(sample.requests for sample in self.samples)
+        errors = sum(sample.errors for sample in self.samples)
+        report = f"持續 {duration:.0f} 秒，{len(self.samples)} 次取樣，請求 {requests}，錯誤 {errors}\n\n"
+        report += "| 指標 | 樣本數 | 趨勢 (Kendall tau) | 增幅 | 漂移 |\n"
+        report += "|------|--------|--------------------|------|------|\n"
+        for finding in self.findings:
+            trend = "-" if finding.trend is None else f"{finding.trend:.2f}"
+            growth = "-" if finding.growth is None else f"{finding.growth:.1%}"
+            drifting = "是" if finding.drifting else "否"
+            report += f"| {finding.metric} | {finding.samples} | {trend} | {growth} | {drifting} |\n"
+        return report
+
+    def write(self, directory: Union[str, Path]) -> Path:
+        """
+        將時間序列（CSV）與完整結果（JSON）寫入目錄
+
+        Args:
+            directory: 輸出目錄
+
+        Returns:
+            JSON 檔案的路徑
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"soak-{time.strftime('%Y%m%dT%H%M%S')}"
+        (directory / f"{stem}.csv").write_text(self.to_csv(), encoding="utf-8")
+        path = directory / f"{stem}.json"
+        path.write_bytes(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
+        return path
+
+
+async def run_soak(
+    client: BitoProClient,
+    jobs: Sequence[OHLCJob],
+    duration: float,
+    rate: float = 1.0,
+    sample_interval: float = 60.0,
+    weights: Optional[Sequence[float]] = None,
+    warmup_samples: int = 1,
+    seed: Optional[int] = None,
+    connector_poll_interval: Optional[float] = None,
+) -> SoakReport:
+    """
+    以固定速率長時間發送 OHLC 請求組合，定期取樣資源用量與延遲並判斷是否漂移
+
+    每個取樣區間以開放模型發送 rate × sample_interval 個請求，每次依 weights 從 jobs 隨機選擇，
+    負載進行期間定期輪詢連線池的使用中與閒置連線數，區間結束時記錄 RSS、socket 數、
+    連線池用量與該區間的延遲百分位數。前 warmup_samples 個取樣（快取與連線池暖機）不列入漂移判定。
+
+    Args:
+        client: 已初始化 session 的 BitoProClient
+        jobs: 請求組合
+        duration: 總秒數，取樣次數為 duration / sample_interval 取整數
+        rate: 每秒請求數
+        sample_interval: 取樣間隔秒數
+        weights: 各請求的權重，預設平均
+        warmup_samples: 不列入漂移判定的前幾個取樣
+        seed: 隨機種子，用於重現請求順序
+        connector_poll_interval: 輪詢連線池的間隔秒數，預設為 sample_interval / CONNECTOR_POLLS_PER_SAMPLE
+
+    Returns:
+        SoakReport 實例
+    """
+    if not jobs:
+        raise ValueError("jobs must not be empty")
+    if duration < sample_interval:
+        raise ValueError("duration must be at least one sample interval")
+
+    chooser = random.Random(seed)
+
+    def next_request():
+        job = chooser.choices(jobs, weights=weights)[0]
+        # 長時間執行時每個請求都要真正送出，不合併相同的請求
+        return client.get_ohlc_data(job.pair, job.resolution, job.from_timestamp, job.to_timestamp, coalesce=False)
+
+    if connector_poll_interval is None:
+        connector_poll_interval = sample_interval / CONNECTOR_POLLS_PER_SAMPLE
+
+    report = SoakReport()
+    started_at = time.perf_counter()
+    # 加上微小的容差，避免 0.6 / 0.1 之類的浮點誤差少取一次
+    for _ in range(int(duration / sample_interval + 1e-9)):
+        in_use: List[int] = []
+        idle: List[int] = []
+        poller = asyncio.ensure_future(_poll_connector(client.session, connector_poll_interval, in_use, idle))
+        try:
+            result = await run_open_load(next_request, rate=rate, duration=sample_interval)
+        finally:
+            poller.cancel()
+        sample = SoakSample(
+            elapsed=time.perf_counter() - started_at,
+            requests=result.sent,
+            errors=result.failed + result.dropped,
+            rss_bytes=read_rss_bytes(),
+            open_sockets=count_open_sockets(),
+            connections_in_use=_mean(in_use),
+            connections_in_use_max=max(in_use, default=None),
+            connections_idle=_mean(idle),
+            p50=result.latencies.percentile(50),
+            p99=result.latencies.percentile(99),
+        )
+        report.samples.append(sample)
+        logger.info(f"Soak sample: {sample}")
+
+    measured = report.samples[warmup_samples:]
+    report.findings = [
+        detect_drift(metric, [getattr(sample, metric) for sample in measured]) for metric in SOAK_METRICS
+    ]
+    for finding in report.drifting:
+        logger.warning(
+            f"Soak drift detected in {finding.metric}: trend {finding.trend:.2f}, growth {finding.growth:.1%}"
+        )
+    return report
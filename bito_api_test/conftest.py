@@ -1,50 +1,292 @@
-from typing import Any, AsyncGenerator, Dict, List
+import copy
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
 
 import aiohttp
 import allure
 import orjson
 import pytest
 import pytest_asyncio
-from api.bitopro_client import BitoProClient
-
+from api.bitopro_client import BitoProClient, OHLCJob, OHLCJobResult
+from api.cassette import CASSETTE_MODES, CASSETTE_REPLAY, Cassette
+from api.mock_server import MockBitoProServer, parse_mock_server_config
+from api.perf_baseline import BaselineStore
+from api.rate_limiter import RateLimiter
+from api.retry import RetryBudget, RetryPolicy
+from api.session_pool import close_shared_session, get_shared_session
+from api.sharding import PERF_RUN_ID_ENV, assign_shards
+
+# 預先獲取數據時的最大併發請求數與單一請求逾時秒數
+PREFETCH_CONCURRENCY = 6
+PREFETCH_TIMEOUT = 30.0
+
+# 整個測試執行期間共用的速率上限（每秒請求數）與突發量
+SUITE_RATE_LIMIT = 10.0
+SUITE_RATE_BURST = 20.0
+
+# 整個測試執行期間的重試額度與單次呼叫的最長秒數
+SUITE_RETRY_BUDGET = 50
+SUITE_REQUEST_DEADLINE = 60.0
+
+# 效能基準線資料庫的預設路徑
+DEFAULT_PERF_BASELINE_PATH = Path(__file__).parent / "perf_baseline.sqlite3"
+
+# 錄製卡帶的預設路徑
+DEFAULT_CASSETTE_PATH = Path(__file__).parent / "cassettes" / "bitopro.sqlite3"
+
+# 長時間執行報告的預設輸出目錄
+DEFAULT_SOAK_REPORT_DIR = Path(__file__).parent / "soak-results"
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """註冊命令列參數"""
+    parser.addoption(
+        "--perf-baseline",
+        default=str(DEFAULT_PERF_BASELINE_PATH),
+        help="效能基準線 SQLite 資料庫的路徑",
+    )
+    parser.addoption("--mock-server", action="store_true", default=False, help="改用本機的模擬伺服器")
+    parser.addoption(
+        "--mock-server-options",
+        default="",
+        metavar="OPTIONS",
+        help="模擬伺服器設定，需搭配 --mock-server，例如 --mock-server-options=latency=0.05,error_rate=0.01,rate_limit=100",
+    )
+    parser.addoption(
+        "--cassette-mode",
+        choices=CASSETTE_MODES,
+        default=None,
+        help="record 將所有響應錄製到卡帶；replay 只從卡帶讀取響應，不發送任何網路請求",
+    )
+    parser.addoption(
+        "--cassette",
+        default=str(DEFAULT_CASSETTE_PATH),
+        help="錄製卡帶（SQLite）的路徑，請以 --cassette=PATH 指定，避免 pytest 將已存在的檔案當成測試路徑",
+    )
+    parser.addoption("--shard-index", type=int, default=0, help="分片執行時此 worker 的編號（從 0 開始）")
+    parser.addoption(
+        "--shard-count",
+        type=int,
+        default=1,
+        help="分片執行的 worker 總數，整體的請求速率與重試額度依此平均分配；效能測試不分片，改以 --perf-phase 執行",
+    )
+    parser.addoption(
+        "--perf-phase",
+        action="store_true",
+        default=False,
+        help="只執行標記為 performance 的測試，分片執行時由主行程在所有 worker 結束後以單一行程執行",
+    )
+    parser.addoption("--timing-dump", default=None, help="測試結束時將客戶端的請求耗時統計寫入此 JSON 檔案")
+    parser.addoption(
+        "--soak",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="執行長時間（soak）測試的總秒數，未指定時略過",
+    )
+    parser.addoption("--soak-interval", type=float, default=60.0, help="長時間測試的取樣間隔秒數")
+    parser.addoption("--soak-rate", type=float, default=1.0, help="長時間測試每秒發送的請求數")
+    parser.addoption("--soak-report-dir", default=str(DEFAULT_SOAK_REPORT_DIR), help="長時間測試報告的輸出目錄")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    """
+    只保留分配給此 worker 的測試，並讓所有非同步測試共用同一個 session 範圍的事件循環，
+    以重用連線與預先獲取的數據
 
-@pytest_asyncio.fixture
+    標記為 performance 的測試不分片：分片的 worker 略過它們，由 --perf-phase 在所有 worker 結束後
+    以單一行程執行，使效能測試取得完整的速率額度，同時任何時刻的總速率都不超過整體上限。
+    """
+    shard_index, shard_count = config.getoption("--shard-index"), config.getoption("--shard-count")
+    if not 0 <= shard_index < shard_count:
+        raise pytest.UsageError("--shard-index must be between 0 and --shard-count - 1")
+    perf_phase = config.getoption("--perf-phase")
+    if perf_phase or shard_count > 1:
+        selected = [item for item in items if (item.get_closest_marker("performance") is not None) == perf_phase]
+        if shard_count > 1:
+            assignment = assign_shards([item.nodeid for item in selected], shard_count)
+            selected = [item for item in selected if assignment[item.nodeid] == shard_index]
+        kept = set(selected)
+        config.hook.pytest_deselected(items=[item for item in items if item not in kept])
+        items[:] = selected
+
+    session_loop_marker = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if pytest_asyncio.is_async_test(item):
+            item.add_marker(session_loop_marker, append=False)
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def aiohttp_session() -> AsyncGenerator[aiohttp.ClientSession, None]:
-    """提供一個 aiohttp.ClientSession 實例"""
-    session = aiohttp.ClientSession()
+    """提供整個測試執行期間共用連線池的 aiohttp.ClientSession 實例"""
+    session = get_shared_session()
     try:
         yield session
     finally:
-        await session.close()
+        await close_shared_session()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api_base_url(request: pytest.FixtureRequest) -> AsyncGenerator[Optional[str], None]:
+    """
+    客戶端使用的 API 根網址
+
+    指定 --mock-server 時啟動本機模擬伺服器並回傳其網址，
+    否則為 None（客戶端依序使用 BITOPRO_API_BASE_URL 環境變數與正式網址）。
+    """
+    if not request.config.getoption("--mock-server"):
+        yield None
+        return
+    config = parse_mock_server_config(request.config.getoption("--mock-server-options"))
+    async with MockBitoProServer(config) as server:
+        yield server.base_url
+        allure.attach(safe_json_dumps(vars(server.stats)), "模擬伺服器請求統計", allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session")
+def cassette(request: pytest.FixtureRequest) -> Generator[Optional[Cassette], None, None]:
+    """指定 --cassette-mode 時提供整個測試執行期間共用的錄製卡帶，否則為 None"""
+    mode = request.config.getoption("--cassette-mode")
+    if mode is None:
+        yield None
+        return
+    with Cassette(request.config.getoption("--cassette"), mode) as store:
+        yield store
+        allure.attach(safe_json_dumps(store.stats.to_dict()), "錄製卡帶統計", allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session")
+def suite_limits(pytestconfig: pytest.Config) -> Tuple[RateLimiter, RetryPolicy]:
+    """
+    此行程所有客戶端共用的速率限制器與重試策略
+
+    分片執行時每個 worker 只使用 1 / worker 數量的速率與重試額度，所有 worker 的總和不超過整體上限。
+    """
+    shard_count = pytestconfig.getoption("--shard-count")
+    rate_limiter = RateLimiter(
+        default_rate=SUITE_RATE_LIMIT / shard_count, default_capacity=max(SUITE_RATE_BURST / shard_count, 1.0)
+    )
+    return rate_limiter, RetryPolicy(budget=RetryBudget(max(SUITE_RETRY_BUDGET // shard_count, 1)))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def bitopro_client(
+    pytestconfig: pytest.Config,
+    aiohttp_session,
+    suite_limits: Tuple[RateLimiter, RetryPolicy],
+    api_base_url: Optional[str],
+    cassette: Optional[Cassette],
+) -> AsyncGenerator[BitoProClient, None]:
+    """提供整個測試執行期間共用的 BitoProClient 實例，速率與重試額度來自 suite_limits"""
+    rate_limiter, retry_policy = suite_limits
+    async with BitoProClient(
+        session=aiohttp_session,
+        rate_limiter=rate_limiter,
+        retry_policy=retry_policy,
+        default_deadline=SUITE_REQUEST_DEADLINE,
+        coalesce_requests=True,
+        base_url=api_base_url,
+        cassette=cassette,
+    ) as client:
+        yield client
+        allure.attach(
+            safe_json_dumps(client.rate_limit_metrics()), "速率限制等待統計", allure.attachment_type.JSON
+        )
+        allure.attach(safe_json_dumps(client.timing_summary()), "請求各階段耗時統計", allure.attachment_type.JSON)
+        timing_dump = pytestconfig.getoption("--timing-dump")
+        if timing_dump:
+            Path(timing_dump).write_bytes(orjson.dumps(client.timing_stats.to_dict()))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def perf_bitopro_client(
+    aiohttp_session,
+    bitopro_client: BitoProClient,
+    suite_limits: Tuple[RateLimiter, RetryPolicy],
+    api_base_url: Optional[str],
+    cassette: Optional[Cassette],
+) -> AsyncGenerator[BitoProClient, None]:
+    """
+    提供效能測試使用的 BitoProClient 實例
+
+    不合併相同的請求，速率與重試額度與 bitopro_client 共用同一個 suite_limits。
+    分片執行時效能測試在 --perf-phase 以單一行程執行，因此取得完整的整體額度。
+    耗時統計與 bitopro_client 共用，一併寫入 --timing-dump。
+    """
+    rate_limiter, retry_policy = suite_limits
+    async with BitoProClient(
+        session=aiohttp_session,
+        rate_limiter=rate_limiter,
+        retry_policy=retry_policy,
+        default_deadline=SUITE_REQUEST_DEADLINE,
+        base_url=api_base_url,
+        cassette=cassette,
+    ) as client:
+        client.timing_stats = bitopro_client.timing_stats
+        yield client
+
+
+@pytest.fixture(scope="session")
+def perf_run_id() -> str:
+    """本次測試執行的識別碼，用於在基準線資料庫中區分每次執行，分片執行時由主行程指定"""
+    return os.environ.get(PERF_RUN_ID_ENV) or f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture(scope="session")
+def perf_baseline(request: pytest.FixtureRequest) -> Generator[BaselineStore, None, None]:
+    """
+    提供整個測試執行期間共用的效能基準線資料庫
+
+    重播卡帶或使用模擬伺服器時的延遲不代表正式環境，改用記憶體中的資料庫，不寫入基準線。
+    """
+    simulated = (
+        request.config.getoption("--cassette-mode") == CASSETTE_REPLAY
+        or request.config.getoption("--mock-server")
+    )
+    store = BaselineStore(":memory:" if simulated else request.config.getoption("--perf-baseline"))
+    try:
+        yield store
+    finally:
+        store.close()
 
 
 @pytest_asyncio.fixture
-async def bitopro_client(aiohttp_session) -> AsyncGenerator[BitoProClient, None]:
-    """提供一個 BitoProClient 實例"""
-    async with BitoProClient(session=aiohttp_session) as client:
+async def isolated_bitopro_client(
+    suite_limits: Tuple[RateLimiter, RetryPolicy], api_base_url: Optional[str], cassette: Optional[Cassette]
+) -> AsyncGenerator[BitoProClient, None]:
+    """
+    提供擁有獨立 session 的 BitoProClient 實例，供需要修改客戶端狀態的測試使用
+
+    不套用重試與期限，但與其他客戶端共用 suite_limits 的速率限制器，總速率仍不超過此行程的額度。
+    """
+    rate_limiter, _ = suite_limits
+    async with BitoProClient(rate_limiter=rate_limiter, base_url=api_base_url, cassette=cassette) as client:
         yield client
 
 
 # 定義測試數據
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_pair() -> str:
     """測試用的交易對"""
     return "btc_twd"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_resolution() -> str:
     """測試用的時間框架"""
     return "1h"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_from_timestamp() -> int:
     """測試用的開始時間戳"""
     return 1609459200  # 2021-01-01 00:00:00 UTC
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_to_timestamp() -> int:
     """測試用的結束時間戳"""
     return 1609545600  # 2021-01-02 00:00:00 UTC
@@ -114,8 +356,8 @@ def safe_json_dumps(data: Any) -> str:
             raise
 
 
-@pytest_asyncio.fixture
-async def gather_all_test_data(
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def prefetched_test_data(
     bitopro_client: BitoProClient,
     test_pair: str,
     test_resolution: str,
@@ -123,20 +365,33 @@ async def gather_all_test_data(
     test_to_timestamp: int,
 ) -> Dict[str, Any]:
     """
-    預先獲取所有測試數據，以便在測試中重複使用
+    預先獲取所有測試數據，整個測試執行期間只獲取一次
+
+    測試中請使用 gather_all_test_data，以取得可安全修改的副本。
 
     Returns:
         包含所有測試數據的字典
     """
+    valid_job = OHLCJob(test_pair, test_resolution, test_from_timestamp, test_to_timestamp)
+    resolution_jobs = {
+        resolution: OHLCJob(test_pair, resolution, test_from_timestamp, test_to_timestamp)
+        for resolution in BitoProClient.VALID_RESOLUTIONS
+    }
+
+    # 併發獲取所有數據（相同參數的請求只發送一次），再依固定順序記錄到 Allure
+    results: Dict[OHLCJob, OHLCJobResult] = {}
+    async for result in bitopro_client.iter_ohlc_batch(
+        {valid_job, *resolution_jobs.values()}, max_concurrency=PREFETCH_CONCURRENCY, timeout=PREFETCH_TIMEOUT
+    ):
+        results[result.job] = result
+
     try:
         # 獲取有效參數的 OHLC 數據
         with allure.step("獲取有效參數的 OHLC 數據"):
-            valid_data, valid_req_resp = await bitopro_client.get_ohlc_data(
-                pair=test_pair,
-                resolution=test_resolution,
-                from_timestamp=test_from_timestamp,
-                to_timestamp=test_to_timestamp,
-            )
+            valid_result = results[valid_job]
+            if not valid_result.ok:
+                raise valid_result.error
+            valid_data, valid_req_resp = valid_result.data, valid_result.req_resp
 
             # 記錄請求和響應資料
             allure.attach(
@@ -151,35 +406,30 @@ async def gather_all_test_data(
         resolution_req_resp = {}
 
         with allure.step("獲取所有時間框架的 OHLC 數據"):
-            for resolution in BitoProClient.VALID_RESOLUTIONS:
-                try:
-                    data, req_resp = await bitopro_client.get_ohlc_data(
-                        pair=test_pair,
-                        resolution=resolution,
-                        from_timestamp=test_from_timestamp,
-                        to_timestamp=test_to_timestamp,
-                    )
-                    resolution_data[resolution] = data
-                    resolution_req_resp[resolution] = req_resp
+            for resolution, job in resolution_jobs.items():
+                result = results[job]
+                if result.ok:
+                    resolution_data[resolution] = result.data
+                    resolution_req_resp[resolution] = result.req_resp
 
                     # 記錄請求和響應資料
                     allure.attach(
-                        safe_json_dumps(req_resp["request"]),
+                        safe_json_dumps(result.req_resp["request"]),
                         f"時間框架 {resolution} 的請求資料",
                         allure.attachment_type.JSON,
                     )
                     allure.attach(
-                        safe_json_dumps(req_resp["response"]),
+                        safe_json_dumps(result.req_resp["response"]),
                         f"時間框架 {resolution} 的響應資料",
                         allure.attachment_type.JSON,
                     )
-                except Exception as e:
-                    resolution_data[resolution] = {"error": str(e)}
-                    resolution_req_resp[resolution] = {"error": str(e)}
+                else:
+                    resolution_data[resolution] = {"error": str(result.error)}
+                    resolution_req_resp[resolution] = {"error": str(result.error)}
 
                     # 記錄錯誤
                     allure.attach(
-                        f"獲取時間框架 {resolution} 的數據時發生錯誤: {str(e)}",
+                        f"獲取時間框架 {resolution} 的數據時發生錯誤: {str(result.error)}",
                         f"時間框架 {resolution} 錯誤",
                         allure.attachment_type.TEXT,
                     )
@@ -194,3 +444,14 @@ async def gather_all_test_data(
         # 如果獲取數據失敗，返回錯誤信息
         allure.attach(f"獲取測試數據時發生錯誤: {str(e)}", "錯誤", allure.attachment_type.TEXT)
         return {"error": str(e)}
+
+
+@pytest.fixture
+def gather_all_test_data(prefetched_test_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    提供預先獲取的測試數據副本，測試可任意修改而不影響其他測試
+
+    Returns:
+        包含所有測試數據的字典
+    """
+    return copy.deepcopy(prefetched_test_data)
@@ -0,0 +1,205 @@
+import asyncio
+
+import allure
+import pytest
+from api.bitopro_client import BitoProClient
+from api.session_pool import ConnectorConfig, get_shared_session
+
+pytestmark = [allure.feature("BitoProClient 客戶端邏輯")]
+
+
+class TestBitoProClientRange:
+    """BitoProClient 區間切分測試類（不需連線）"""
+
+    @allure.story("區間切分")
+    @allure.title("測試長區間依伺服器上限切分並對齊網格")
+    def test_split_time_range_aligned_chunks(self):
+        """測試 90 天 1m 區間切分後首尾相接且每段不超過上限"""
+        from_timestamp = 1609459200 + 123
+        to_timestamp = from_timestamp + 90 * 86400
+        span = BitoProClient.RESOLUTION_SECONDS["1m"] * BitoProClient.MAX_CANDLES_PER_REQUEST
+
+        chunks = BitoProClient.split_time_range("1m", from_timestamp, to_timestamp)
+
+        with allure.step("驗證子區間首尾相接"):
+            assert chunks[0][0] == from_timestamp
+            assert chunks[-1][1] == to_timestamp
+            for (_, prev_end), (next_start, _) in zip(chunks, chunks[1:]):
+                assert prev_end == next_start
+
+        with allure.step("驗證子區間對齊網格且不超過上限"):
+            for chunk_from, chunk_to in chunks:
+                assert chunk_to - chunk_from <= span
+            for _, chunk_to in chunks[:-1]:
+                assert chunk_to % span == 0
+
+    @allure.story("區間切分")
+    @allure.title("測試短區間只產生單一請求")
+    def test_split_time_range_single_chunk(self):
+        """測試不超過上限的區間不會被切分"""
+        assert BitoProClient.split_time_range("1h", 1609459200, 1609545600) == [(1609459200, 1609545600)]
+
+    @allure.story("區間切分")
+    @allure.title("測試無效的區間參數")
+    def test_split_time_range_invalid(self):
+        """測試不支援的時間框架與反向區間會引發 ValueError"""
+        with pytest.raises(ValueError):
+            BitoProClient.split_time_range("2m", 1609459200, 1609545600)
+        with pytest.raises(ValueError):
+            BitoProClient.split_time_range("1h", 1609545600, 1609459200)
+
+    @allure.story("區間獲取")
+    @allure.title("測試子區間結果依 timestamp 去重並排序合併")
+    async def test_get_ohlc_range_merges_chunks(self, monkeypatch):
+        """測試相鄰子區間在邊界重複回傳的 K 線只保留一根，且合併結果依時間遞增"""
+        calls = []
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp):
+            calls.append((from_timestamp, to_timestamp))
+            # 伺服器的 to 為包含端點，相鄰子區間的邊界 K 線會重複；刻意以遞減順序回傳
+            candles = [{"timestamp": ts * 1000} for ts in range(from_timestamp, to_timestamp + 1, 60)]
+            return {"data": candles[::-1]}, {"request": {"from": from_timestamp, "to": to_timestamp}}
+
+        client = BitoProClient()
+        monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+        span = BitoProClient.range_span("1m")
+        from_timestamp = 1609459200 // span * span
+        to_timestamp = from_timestamp + 3 * span
+
+        data, req_resp = await client.get_ohlc_range("btc_twd", "1m", from_timestamp, to_timestamp, max_concurrency=2)
+
+        with allure.step("驗證去重、排序與子請求資訊"):
+            timestamps = [candle["timestamp"] for candle in data["data"]]
+            assert len(calls) == 3
+            assert timestamps == [ts * 1000 for ts in range(from_timestamp, to_timestamp + 1, 60)]
+            assert req_resp["request"]["chunks"] == 3
+            assert len(req_resp["chunks"]) == 3
+
+
+class TestBitoProClientBatch:
+    """BitoProClient 批次獲取測試類（以替身取代網路請求）"""
+
+    @allure.story("批次獲取")
+    @allure.title("測試批次結果依完成順序產出且保留單一請求錯誤")
+    async def test_iter_ohlc_batch_completion_order(self, monkeypatch):
+        """測試較快完成的請求先產出，失敗的請求以 error 回報"""
+        delays = {"1m": 0.03, "1h": 0.01, "1d": 0.02}
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp):
+            await asyncio.sleep(delays[resolution])
+            if pair == "bad_pair":
+                raise ValueError("bad pair")
+            return {"data": [{"timestamp": from_timestamp * 1000}]}, {"request": {"resolution": resolution}}
+
+        client = BitoProClient()
+        monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+        jobs = BitoProClient.build_ohlc_jobs(["btc_twd", "bad_pair"], ["1m", "1h", "1d"], 1609459200, 1609545600)
+
+        results = [result async for result in client.iter_ohlc_batch(jobs, max_concurrency=6)]
+
+        with allure.step("驗證完成順序與錯誤回報"):
+            assert len(results) == 6
+            assert [r.job.resolution for r in results[:2]] == ["1h", "1h"]
+            assert [r.job.resolution for r in results[-2:]] == ["1m", "1m"]
+            assert all(r.ok for r in results if r.job.pair == "btc_twd")
+            assert all(isinstance(r.error, ValueError) for r in results if r.job.pair == "bad_pair")
+
+    @allure.story("批次獲取")
+    @allure.title("測試只有批次層級的逾時會被改寫")
+    async def test_iter_ohlc_batch_timeout_errors(self, monkeypatch):
+        """測試請求本身拋出的逾時保留原始例外，超過批次 timeout 時才回報批次逾時"""
+        original = asyncio.TimeoutError("deadline exceeded")
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp):
+            if resolution == "1m":
+                raise original
+            await asyncio.sleep(1.0)
+            return {"data": []}, {}
+
+        client = BitoProClient()
+        monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+        jobs = BitoProClient.build_ohlc_jobs(["btc_twd"], ["1m", "1h"], 1609459200, 1609545600)
+
+        results = {r.job.resolution: r async for r in client.iter_ohlc_batch(jobs, timeout=0.05)}
+        assert results["1m"].error is original
+        assert isinstance(results["1h"].error, asyncio.TimeoutError)
+        assert "after 0.05s" in str(results["1h"].error)
+
+        no_timeout = [r async for r in client.iter_ohlc_batch(jobs[:1])]
+        assert no_timeout[0].error is original
+
+
+class TestBitoProClientSession:
+    """BitoProClient 連線池測試類"""
+
+    @allure.story("連線池")
+    @allure.title("測試共享 session 在同一事件循環內被重用")
+    async def test_shared_session_reused(self):
+        """測試共享 session 重複取得為同一實例，且客戶端不會關閉外部傳入的 session"""
+        session = get_shared_session()
+        assert get_shared_session() is session
+        async with BitoProClient(session=session):
+            pass
+        assert not session.closed
+
+    @allure.story("連線池")
+    @allure.title("測試客戶端依連線池設定建立並關閉自己的 session")
+    async def test_owned_session_uses_connector_config(self):
+        """測試未傳入 session 時客戶端套用連線池設定，並在離開時關閉"""
+        config = ConnectorConfig(limit=7, limit_per_host=3, ttl_dns_cache=None, happy_eyeballs=False)
+        async with BitoProClient(connector_config=config) as client:
+            session = client._session
+            assert session.connector.limit == 7
+            assert session.connector.limit_per_host == 3
+        assert session.closed
+
+
+class TestBitoProClientCoalescing:
+    """BitoProClient 請求合併測試類"""
+
+    @allure.story("請求合併")
+    @allure.title("測試相同的同時請求只發送一次")
+    async def test_identical_requests_share_one_call(self, monkeypatch):
+        """測試開啟合併時相同參數共用同一次請求與解析結果，不同參數各自請求"""
+        calls = []
+
+        async def fake_request_ohlc(pair, resolution, from_timestamp, to_timestamp):
+            calls.append((pair, resolution, from_timestamp, to_timestamp))
+            await asyncio.sleep(0.01)
+            return {"data": []}, {"request": {}, "response": {}}
+
+        async with BitoProClient(coalesce_requests=True) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake_request_ohlc)
+            results = await asyncio.gather(
+                *(client.get_ohlc_data("btc_twd", "1h", 0, 3600) for _ in range(10)),
+                client.get_ohlc_data("btc_twd", "1d", 0, 3600),
+            )
+
+        assert len(calls) == 2
+        assert all(data is results[0][0] for data, _ in results[:10])
+        assert sum(req_resp["coalesced"] for _, req_resp in results) == 9
+        assert client.coalesced_requests == 9
+
+    @allure.story("請求合併")
+    @allure.title("測試可針對單次呼叫關閉合併")
+    async def test_coalescing_switchable(self, monkeypatch):
+        """測試 coalesce=False 時每次呼叫都發送請求，且失敗會傳給所有合併的呼叫者"""
+        calls = []
+
+        async def fake_request_ohlc(pair, resolution, from_timestamp, to_timestamp):
+            calls.append(resolution)
+            await asyncio.sleep(0.01)
+            if resolution == "bad":
+                raise ValueError("bad resolution")
+            return {"data": []}, {"request": {}, "response": {}}
+
+        async with BitoProClient(coalesce_requests=True) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake_request_ohlc)
+            await asyncio.gather(*(client.get_ohlc_data("btc_twd", "1h", 0, 3600, coalesce=False) for _ in range(5)))
+            errors = await asyncio.gather(
+                *(client.get_ohlc_data("btc_twd", "bad", 0, 3600) for _ in range(3)), return_exceptions=True
+            )
+
+        assert calls.count("1h") == 5
+        assert calls.count("bad") == 1
+        assert all(isinstance(error, ValueError) for error in errors)
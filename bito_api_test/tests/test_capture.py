@@ -0,0 +1,75 @@
+import hashlib
+
+import allure
+import orjson
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from api.bitopro_client import BitoProClient
+from api.capture import CAPTURE_HASH, CAPTURE_TRUNCATED, CapturePolicy
+
+pytestmark = [allure.feature("響應內容保存策略")]
+
+RESPONSE = {"data": [{"timestamp": i * 60000, "open": str(i)} for i in range(100)]}
+
+
+class TestCapturePolicy:
+    """CapturePolicy 測試類"""
+
+    @allure.story("保存策略")
+    @allure.title("測試 full 模式保存原始內容")
+    def test_full(self):
+        """測試 full 模式直接引用原本的數據，不額外複製"""
+        assert CapturePolicy().capture(RESPONSE) is RESPONSE
+
+    @allure.story("保存策略")
+    @allure.title("測試 truncated 模式只保存前後幾筆")
+    def test_truncated(self):
+        """測試 truncated 模式保存筆數與前後幾筆數據"""
+        captured = CapturePolicy(CAPTURE_TRUNCATED, head=2, tail=1).capture(RESPONSE)
+        assert captured["data_count"] == 100
+        assert captured["data_head"] == RESPONSE["data"][:2]
+        assert captured["data_tail"] == RESPONSE["data"][-1:]
+        assert captured["truncated"] is True
+
+        short = CapturePolicy(CAPTURE_TRUNCATED).capture({"data": RESPONSE["data"][:4]})
+        assert short["data"] == RESPONSE["data"][:4]
+
+    @allure.story("保存策略")
+    @allure.title("測試 hash 模式只保存雜湊值")
+    def test_hash(self):
+        """測試 hash 模式保存原始內容的 sha256 與大小"""
+        raw_body = orjson.dumps(RESPONSE)
+        captured = CapturePolicy(CAPTURE_HASH).capture(RESPONSE, raw_body)
+        assert captured == {
+            "sha256": hashlib.sha256(raw_body).hexdigest(),
+            "bytes": len(raw_body),
+            "data_count": 100,
+        }
+
+    @allure.story("保存策略")
+    @allure.title("測試未知的模式")
+    def test_unknown_mode(self):
+        """測試未知的模式會引發 ValueError"""
+        with pytest.raises(ValueError):
+            CapturePolicy("everything")
+
+    @allure.story("客戶端整合")
+    @allure.title("測試客戶端依策略保存響應內容")
+    async def test_client_capture(self):
+        """測試 hash 模式下 req_resp 不保存完整響應，但回傳的數據完整"""
+        raw_body = orjson.dumps(RESPONSE)
+
+        async def trading_history(request: web.Request) -> web.Response:
+            return web.Response(body=raw_body, content_type="application/json")
+
+        app = web.Application()
+        app.router.add_get("/v3/trading-history/{pair}", trading_history)
+        async with TestServer(app) as server:
+            base_url = str(server.make_url("/v3"))
+            async with BitoProClient(base_url=base_url, capture_policy=CapturePolicy(CAPTURE_HASH)) as client:
+                data, req_resp = await client.get_ohlc_data("btc_twd", "1m", 0, 6000)
+
+        assert data == RESPONSE
+        assert req_resp["response"]["body"]["sha256"] == hashlib.sha256(raw_body).hexdigest()
+        assert "data" not in req_resp["response"]["body"]
@@ -0,0 +1,90 @@
+import sqlite3
+
+import allure
+import pytest
+from aiohttp import ClientResponseError
+from api.bitopro_client import BitoProClient
+from api.cassette import CASSETTE_RECORD, CASSETTE_REPLAY, Cassette, CassetteMiss
+from api.mock_server import MockBitoProServer
+
+pytestmark = [allure.feature("錄製與重播")]
+
+FROM_TIMESTAMP = 1609459200  # 2021-01-01 00:00:00 UTC
+TO_TIMESTAMP = 1609545600  # 2021-01-02 00:00:00 UTC
+
+# 不存在的網址，重播時若發送網路請求會連線失敗
+UNREACHABLE_BASE_URL = "http://127.0.0.1:9/v3"
+
+
+class TestCassette:
+    """Cassette 測試類"""
+
+    @allure.story("卡帶")
+    @allure.title("測試錄製後讀取")
+    def test_record_and_get(self, tmp_path):
+        """測試錄製的響應可依端點與參數讀回，參數順序不影響請求鍵"""
+        path = tmp_path / "cassette.sqlite3"
+        body = b'{"data": [' + b",".join(b'{"timestamp": %d}' % i for i in range(1000)) + b"]}"
+        with Cassette(path, CASSETTE_RECORD) as cassette:
+            cassette.record("/trading-history/btc_twd", {"resolution": "1h", "from": 0, "to": 3600}, 200, {}, body)
+            cassette.record("/trading-history/btc_twd", {"resolution": "1h", "from": 0, "to": 3600}, 200, {}, body)
+            assert cassette.stats.recorded == 2
+            assert len(cassette) == 1
+
+        # 響應內容以壓縮後的大小保存
+        with sqlite3.connect(str(path)) as connection:
+            (stored,) = connection.execute("SELECT length(body) FROM interactions").fetchone()
+        assert stored < len(body) / 4
+
+        with Cassette(path, CASSETTE_REPLAY) as cassette:
+            entry = cassette.get("/trading-history/btc_twd", {"to": 3600, "from": 0, "resolution": "1h"})
+            assert entry.status == 200
+            assert entry.body == body
+            with pytest.raises(CassetteMiss):
+                cassette.get("/trading-history/btc_twd", {"resolution": "1d", "from": 0, "to": 3600})
+            assert cassette.stats.to_dict() == {"hits": 1, "misses": 1, "recorded": 0}
+            with pytest.raises(RuntimeError):
+                cassette.record("/trading-history/btc_twd", {}, 200, {}, body)
+
+    @allure.story("卡帶")
+    @allure.title("測試無效的模式與不存在的卡帶")
+    def test_invalid(self, tmp_path):
+        """測試未知的模式引發 ValueError，重播不存在的卡帶引發 FileNotFoundError"""
+        with pytest.raises(ValueError):
+            Cassette(tmp_path / "cassette.sqlite3", "rewind")
+        with pytest.raises(FileNotFoundError):
+            Cassette(tmp_path / "missing.sqlite3", CASSETTE_REPLAY)
+
+    @allure.story("客戶端整合")
+    @allure.title("測試錄製後不經網路重播")
+    async def test_client_record_and_replay(self, tmp_path):
+        """測試錄製模式保存成功與錯誤響應，重播模式不發送網路請求即可取得相同結果"""
+        path = tmp_path / "cassette.sqlite3"
+        with Cassette(path, CASSETTE_RECORD) as cassette:
+            async with MockBitoProServer() as server:
+                async with BitoProClient(base_url=server.base_url, cassette=cassette) as client:
+                    recorded, _ = await client.get_ohlc_data("btc_twd", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+                    streamed = [
+                        batch
+                        async for batch in client.stream_ohlc_data("btc_twd", "1m", FROM_TIMESTAMP, TO_TIMESTAMP)
+                    ]
+                    with pytest.raises(ClientResponseError):
+                        await client.get_ohlc_data("invalid_pair", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+            assert server.stats.requests == 3
+
+        with Cassette(path, CASSETTE_REPLAY) as cassette:
+            async with BitoProClient(base_url=UNREACHABLE_BASE_URL, cassette=cassette) as client:
+                replayed, req_resp = await client.get_ohlc_data("btc_twd", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+                restreamed = [
+                    batch async for batch in client.stream_ohlc_data("btc_twd", "1m", FROM_TIMESTAMP, TO_TIMESTAMP)
+                ]
+                with pytest.raises(ClientResponseError) as exc_info:
+                    await client.get_ohlc_data("invalid_pair", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+                with pytest.raises(CassetteMiss):
+                    await client.get_ohlc_data("btc_twd", "1d", FROM_TIMESTAMP, TO_TIMESTAMP)
+
+        assert replayed == recorded
+        assert req_resp["replayed"] is True
+        assert req_resp["response"]["status"] == 200
+        assert restreamed == streamed
+        assert exc_info.value.status == 400
@@ -0,0 +1,114 @@
+import asyncio
+
+import allure
+import pytest
+from api.concurrency_sweep import (
+    STOP_ERROR_RATE,
+    STOP_MAX_CONCURRENCY,
+    STOP_PLATEAU,
+    SweepLevel,
+    find_knee,
+    measure_concurrency,
+    run_concurrency_sweep,
+)
+
+pytestmark = [allure.feature("併發掃描")]
+
+
+def _saturating_server(capacity: int, service_time: float):
+    """模擬最多同時處理 capacity 個請求的伺服器"""
+    semaphore = asyncio.Semaphore(capacity)
+
+    async def request():
+        async with semaphore:
+            await asyncio.sleep(service_time)
+
+    return request
+
+
+class TestConcurrencySweep:
+    """併發掃描測試類"""
+
+    @allure.story("飽和點")
+    @allure.title("測試吞吐量趨平時停止並找出拐點")
+    async def test_plateau(self):
+        """測試伺服器容量為 4 時，掃描在 8 停止且拐點為 4"""
+        result = await run_concurrency_sweep(_saturating_server(4, 0.02), level_duration=0.3)
+
+        assert [level.concurrency for level in result.levels] == [1, 2, 4, 8]
+        assert result.stop_reason == STOP_PLATEAU
+        assert result.knee.concurrency == 4
+        assert result.knee.throughput == pytest.approx(200, rel=0.2)
+        assert result.levels[-1].latencies.percentile(50) > result.levels[0].latencies.percentile(50)
+
+        svg = result.to_svg()
+        assert svg.startswith("<svg") and svg.endswith("</svg>")
+        assert "<circle" in svg
+        assert "| 4 ←" in result.summary()
+
+    @allure.story("停止條件")
+    @allure.title("測試違反錯誤率 SLO 時停止")
+    async def test_error_rate_slo(self):
+        """測試併發超過 2 時開始出錯，掃描停止且拐點不包含違反 SLO 的級別"""
+        in_flight = 0
+
+        async def request():
+            nonlocal in_flight
+            in_flight += 1
+            try:
+                await asyncio.sleep(0.01)
+                if in_flight > 2:
+                    raise RuntimeError("overloaded")
+            finally:
+                in_flight -= 1
+
+        result = await run_concurrency_sweep(request, level_duration=0.2)
+
+        assert result.stop_reason == STOP_ERROR_RATE
+        assert result.levels[-1].concurrency == 4
+        assert result.knee.concurrency == 2
+
+    @allure.story("停止條件")
+    @allure.title("測試快速失敗的端點不會被大量請求轟炸")
+    async def test_failure_backoff(self):
+        """測試失敗後等待再重試，錯誤率明顯超過上限時提前結束量測"""
+        calls = 0
+
+        async def request():
+            nonlocal calls
+            calls += 1
+            raise RuntimeError("connection refused")
+
+        level = await measure_concurrency(request, 2, 0.5)
+        assert not level.stopped_early
+        # 每個 worker 依 0.05、0.1、0.2 秒的退避等待，不會在 0.5 秒內重試上百次
+        assert level.failed == calls <= 10
+
+        calls = 0
+        level = await measure_concurrency(request, 4, 5.0, failure_backoff=0.0, max_error_rate=0.01)
+        assert level.stopped_early
+        assert level.elapsed < 1.0
+        assert level.failed == calls < 30
+
+    @allure.story("停止條件")
+    @allure.title("測試達到最高併發級別時停止")
+    async def test_max_concurrency(self):
+        """測試吞吐量持續增加時掃描到 max_concurrency 為止"""
+        result = await run_concurrency_sweep(_saturating_server(64, 0.02), max_concurrency=8, level_duration=0.2)
+
+        assert [level.concurrency for level in result.levels] == [1, 2, 4, 8]
+        assert result.stop_reason == STOP_MAX_CONCURRENCY
+        with pytest.raises(ValueError):
+            await run_concurrency_sweep(_saturating_server(1, 0.01), factor=1)
+
+    @allure.story("飽和點")
+    @allure.title("測試拐點計算")
+    def test_find_knee(self):
+        """測試 Kneedle 取曲線高於對角線最多的點，級別不足三個時取吞吐量最高者"""
+        levels = []
+        for concurrency, succeeded in ((1, 10), (2, 20), (4, 38), (8, 40), (16, 41)):
+            levels.append(SweepLevel(concurrency=concurrency, elapsed=1.0, succeeded=succeeded))
+
+        assert find_knee(levels).concurrency == 4
+        assert find_knee(levels[:2]).concurrency == 2
+        assert find_knee([]) is None
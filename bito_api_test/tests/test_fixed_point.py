@@ -0,0 +1,55 @@
+import allure
+import numpy as np
+import pytest
+from api.fixed_point import DEFAULT_PRECISION, format_fixed_point, parse_fixed_point
+from api.ohlc_columns import OHLCColumns
+
+pytestmark = [allure.feature("定點數解析")]
+
+
+class TestFixedPoint:
+    """定點數解析測試類"""
+
+    @allure.story("批次解析")
+    @allure.title("測試各種十進位字串精確轉換為定點整數")
+    def test_parse_fixed_point(self):
+        """測試一般格式、正負號、省略整數或小數部分與科學記號"""
+        values = ["4099.99", "-0.5", "13.35162928", "1.", ".5", "1e-8", "0", "+3", "1.500000000"]
+        expected = [409999000000, -50000000, 1335162928, 100000000, 50000000, 1, 0, 300000000, 150000000]
+
+        result = parse_fixed_point(values, 8)
+
+        assert result.dtype == np.int64
+        assert result.tolist() == expected
+
+    @allure.story("批次解析")
+    @allure.title("測試無法精確表示的值會引發錯誤")
+    @pytest.mark.parametrize("value", ["abc", "", ".", "+-5", "1.123456789", "99999999999.5"])
+    def test_parse_fixed_point_invalid(self, value: str):
+        """測試非數字、超出精度與超出 int64 範圍的值"""
+        with pytest.raises(ValueError):
+            parse_fixed_point([value], 8)
+
+    @allure.story("批次解析")
+    @allure.title("測試定點整數還原為十進位字串")
+    def test_round_trip(self):
+        """測試 format_fixed_point 可還原原始字串以便與前端數值比對"""
+        values = ["4099.99", "13.35162928", "0", "-0.5", "100"]
+        assert [format_fixed_point(v, 8) for v in parse_fixed_point(values, 8).tolist()] == values
+
+    @allure.story("按欄數據")
+    @allure.title("測試以定點整數建立 OHLCColumns")
+    def test_columns_fixed_point(self):
+        """測試 OHLCColumns 以 precision 建立時保存精確值並可轉換為 float"""
+        records = [
+            {"timestamp": 1, "open": "0.1", "high": "0.3", "low": "0.1", "close": "0.2", "volume": "1.23456789"}
+        ]
+        precision = {**DEFAULT_PRECISION, "open": 2, "high": 2, "low": 2, "close": 2}
+
+        columns = OHLCColumns.from_records(records, precision)
+
+        assert columns.is_fixed_point
+        assert columns.values.dtype == np.int64
+        assert (columns.open + columns.close).tolist() == columns.high.tolist()
+        assert columns.to_records()[0]["volume"] == "1.23456789"
+        assert columns.to_float().volume.tolist() == [1.23456789]
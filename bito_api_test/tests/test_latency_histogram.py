@@ -0,0 +1,76 @@
+import allure
+import numpy as np
+import orjson
+import pytest
+from api.latency_histogram import LatencyHistogram
+
+pytestmark = [allure.feature("延遲直方圖")]
+
+
+class TestLatencyHistogram:
+    """LatencyHistogram 測試類"""
+
+    @allure.story("百分位數")
+    @allure.title("測試百分位數誤差在設定精度內")
+    def test_percentile_precision(self):
+        """測試對數分佈的大量樣本，各百分位數與精確值的相對誤差不超過 precision"""
+        rng = np.random.default_rng(0)
+        samples = rng.lognormal(mean=-3.0, sigma=1.0, size=100_000)
+        histogram = LatencyHistogram(precision=0.01)
+        histogram.record_many(samples)
+
+        assert histogram.count == len(samples)
+        assert histogram.min == samples.min()
+        assert histogram.max == samples.max()
+        assert histogram.mean == pytest.approx(samples.mean())
+        for percentile in (1, 50, 90, 99, 99.9):
+            assert histogram.percentile(percentile) == pytest.approx(np.percentile(samples, percentile), rel=0.01)
+        assert histogram.percentile(100) == samples.max()
+
+    @allure.story("百分位數")
+    @allure.title("測試固定記憶體與邊界值")
+    def test_fixed_memory_and_edges(self):
+        """測試記錄更多樣本不會增加記憶體，超出範圍的值仍保留精確的最小與最大值"""
+        histogram = LatencyHistogram(lowest=1e-3, highest=10.0)
+        size = histogram.counts.nbytes
+        histogram.record_many([0.0, 1e-5, 0.5, 100.0])
+
+        assert histogram.counts.nbytes == size
+        assert histogram.count == 4
+        assert histogram.min == 0.0
+        assert histogram.max == 100.0
+        assert histogram.percentile(50) == pytest.approx(1e-3, rel=0.01)
+        assert LatencyHistogram().percentile(50) is None
+        with pytest.raises(ValueError):
+            histogram.record(-1.0)
+        with pytest.raises(ValueError):
+            histogram.percentile(101)
+
+    @allure.story("合併與序列化")
+    @allure.title("測試合併多個直方圖")
+    def test_merge(self):
+        """測試合併的結果與直接記錄全部樣本相同，分桶設定不同時拒絕合併"""
+        first, second, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        first.record_many([0.1, 0.2, 0.3])
+        second.record_many([1.0, 2.0])
+        combined.record_many([0.1, 0.2, 0.3, 1.0, 2.0])
+
+        merged = LatencyHistogram().merge(first).merge(second)
+        assert np.array_equal(merged.counts, combined.counts)
+        assert merged.summary() == pytest.approx(combined.summary())
+        with pytest.raises(ValueError):
+            first.merge(LatencyHistogram(precision=0.05))
+
+    @allure.story("合併與序列化")
+    @allure.title("測試序列化與還原")
+    def test_serialization(self):
+        """測試 to_dict 可經 JSON 往返還原，並只保存非零的桶"""
+        histogram = LatencyHistogram()
+        histogram.record_many([0.01, 0.01, 0.5])
+        data = orjson.loads(orjson.dumps(histogram.to_dict()))
+
+        assert len(data["buckets"]) == 2
+        restored = LatencyHistogram.from_dict(data)
+        assert np.array_equal(restored.counts, histogram.counts)
+        assert restored.summary() == histogram.summary()
+        assert LatencyHistogram.from_dict(LatencyHistogram().to_dict()).count == 0
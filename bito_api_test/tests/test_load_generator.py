@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import allure
+import pytest
+from api.load_generator import run_open_load
+
+pytestmark = [allure.feature("開放模型負載產生器")]
+
+
+class TestOpenLoad:
+    """run_open_load 測試類"""
+
+    @allure.story("排程")
+    @allure.title("測試依固定速率發送請求")
+    async def test_schedule(self):
+        """測試請求依速率發送，慢請求不會拖慢發送速率"""
+        sent_at = []
+
+        async def request():
+            sent_at.append(time.perf_counter())
+            await asyncio.sleep(0.2)
+
+        result = await run_open_load(request, rate=50.0, duration=0.4)
+
+        assert result.scheduled == result.sent == result.succeeded == 20
+        assert sent_at[-1] - sent_at[0] == pytest.approx(19 / 50.0, abs=0.05)
+        assert result.latency_percentiles()["p50"] == pytest.approx(0.2, abs=0.05)
+        assert result.error_rate == 0.0
+        assert result.elapsed == pytest.approx(0.38 + 0.2, abs=0.1)
+
+    @allure.story("協調遺漏")
+    @allure.title("測試延遲從預定發送時間起算")
+    async def test_coordinated_omission(self):
+        """測試事件循環被阻塞時，錯過預定時間的請求延遲包含排隊時間，服務時間則不包含"""
+        calls = 0
+
+        async def request():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                # 阻塞事件循環，模擬客戶端暫停
+                time.sleep(0.2)
+
+        result = await run_open_load(request, rate=100.0, duration=0.1)
+
+        assert result.succeeded == 10
+        latency, service_time = result.latency_percentiles(), result.service_time_percentiles()
+        assert latency["p50"] >= 0.1
+        assert service_time["p50"] < 0.05
+        assert result.latencies.max >= 0.15
+
+    @allure.story("錯誤統計")
+    @allure.title("測試錯誤與未發送的請求")
+    async def test_errors_and_dropped(self):
+        """測試失敗依錯誤類型計數，超過同時進行上限的請求記為未發送"""
+        calls = 0
+
+        async def request():
+            nonlocal calls
+            calls += 1
+            if calls % 2:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(1.0)
+
+        result = await run_open_load(request, rate=100.0, duration=0.1, max_in_flight=2)
+
+        assert result.errors["TimeoutError"] >= 1
+        assert result.dropped > 0
+        assert result.sent + result.dropped == result.scheduled
+        assert result.error_rate == pytest.approx((result.failed + result.dropped) / 10)
+        assert "p99.9" in result.summary()
+
+    @allure.story("參數驗證")
+    @allure.title("測試無效的參數")
+    async def test_invalid_arguments(self):
+        """測試速率或持續時間不為正數時引發 ValueError"""
+
+        async def request():
+            return None
+
+        with pytest.raises(ValueError):
+            await run_open_load(request, rate=0, duration=1)
+        with pytest.raises(ValueError):
+            await run_open_load(request, rate=1, duration=1, max_in_flight=0)
@@ -0,0 +1,181 @@
+import time
+
+import aiohttp
+import allure
+import numpy as np
+import pytest
+from aiohttp import ClientResponseError
+from api.bitopro_client import BitoProClient
+from api.mock_server import MOCK_FEES, MockBitoProServer, MockServerConfig, parse_mock_server_config
+from api.ohlc_columns import OHLCColumns
+from api.ohlc_resample import compare_ohlc, resample_ohlc
+
+pytestmark = [allure.feature("BitoPro 模擬伺服器")]
+
+FROM_TIMESTAMP = 1609459200  # 2021-01-01 00:00:00 UTC
+TO_TIMESTAMP = 1609545600  # 2021-01-02 00:00:00 UTC
+
+
+class TestMockBitoProServer:
+    """MockBitoProServer 測試類"""
+
+    @allure.story("K 線數據")
+    @allure.title("測試回傳對齊且可重現的 K 線")
+    async def test_candles(self):
+        """測試 K 線數量依時間範圍計算、timestamp 對齊時間框架，且相同種子的內容相同"""
+        async with MockBitoProServer(MockServerConfig(seed=7)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                data, req_resp = await client.get_ohlc_data("btc_twd", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+                again, _ = await client.get_ohlc_data("btc_twd", "1h", FROM_TIMESTAMP, TO_TIMESTAMP, coalesce=False)
+
+        candles = data["data"]
+        assert len(candles) == 25
+        assert [candle["timestamp"] for candle in candles] == [
+            (FROM_TIMESTAMP + i * 3600) * 1000 for i in range(25)
+        ]
+        assert all(float(c["low"]) <= min(float(c["open"]), float(c["close"])) for c in candles)
+        assert all(float(c["high"]) >= max(float(c["open"]), float(c["close"])) for c in candles)
+        assert again == data
+        assert req_resp["response"]["status"] == 200
+
+    @allure.story("K 線數據")
+    @allure.title("測試較粗的時間框架等於 1m 的聚合結果")
+    async def test_cross_resolution_consistency(self):
+        """測試 1h 與 1d K 線可由同一段 1m K 線聚合而得"""
+        precision = {"open": 2, "high": 2, "low": 2, "close": 2, "volume": 8}
+        async with MockBitoProServer() as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                base, _ = await client.get_ohlc_range(
+                    "btc_twd", "1m", FROM_TIMESTAMP, TO_TIMESTAMP, as_columns=True, precision=precision
+                )
+                for resolution in ("1h", "1d"):
+                    served, _ = await client.get_ohlc_data("btc_twd", resolution, FROM_TIMESTAMP, TO_TIMESTAMP)
+                    result = compare_ohlc(
+                        resample_ohlc(base, resolution),
+                        OHLCColumns.from_response(served, precision),
+                        resolution,
+                        FROM_TIMESTAMP,
+                        TO_TIMESTAMP,
+                    )
+                    assert result.ok, result
+                    assert result.compared > 0
+
+    @allure.story("K 線數據")
+    @allure.title("測試固定回傳數量與無效參數")
+    async def test_fixed_candles_and_invalid_params(self):
+        """測試 candles 設定固定回傳數量，無效的交易對與時間框架回傳 400"""
+        async with MockBitoProServer(MockServerConfig(candles=3000)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                data, _ = await client.get_ohlc_data("btc_twd", "1m", FROM_TIMESTAMP, FROM_TIMESTAMP)
+                assert len(data["data"]) == 3000
+
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{server.base_url}/trading-history/invalid_pair") as response:
+                    assert response.status == 400
+                params = {"resolution": "2m", "from": FROM_TIMESTAMP, "to": TO_TIMESTAMP}
+                async with session.get(f"{server.base_url}/trading-history/btc_twd", params=params) as response:
+                    assert response.status == 400
+
+    @allure.story("K 線數據")
+    @allure.title("測試超出歷史範圍的時間區間")
+    async def test_history_bounds(self):
+        """測試 history_start 之前與未來的區間回傳空數據，極大的時間戳不會造成伺服器錯誤"""
+        async with MockBitoProServer(MockServerConfig(history_start=TO_TIMESTAMP)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                before, _ = await client.get_ohlc_data("btc_twd", "1d", FROM_TIMESTAMP, TO_TIMESTAMP - 1)
+                future, _ = await client.get_ohlc_data("btc_twd", "1d", 2**62, 2**63 - 1)
+
+        assert before["data"] == []
+        assert future["data"] == []
+
+    @allure.story("延遲與錯誤")
+    @allure.title("測試延遲注入")
+    async def test_latency(self):
+        """測試固定延遲設定下，請求至少花費設定的秒數"""
+        async with MockBitoProServer(MockServerConfig(latency=0.05)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                started_at = time.perf_counter()
+                await client.get_ohlc_data("btc_twd", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+                assert time.perf_counter() - started_at >= 0.05
+
+    @allure.story("延遲與錯誤")
+    @allure.title("測試延遲分佈的取樣")
+    def test_latency_distributions(self):
+        """測試各延遲分佈的取樣結果非負且中位數接近設定值"""
+        for distribution in ("uniform", "exponential", "lognormal"):
+            server = MockBitoProServer(
+                MockServerConfig(latency=0.1, latency_distribution=distribution, latency_jitter=0.05, seed=1)
+            )
+            samples = [server._sample_latency() for _ in range(2000)]
+            assert min(samples) >= 0
+            if distribution != "exponential":
+                assert np.median(samples) == pytest.approx(0.1, rel=0.1)
+
+    @allure.story("延遲與錯誤")
+    @allure.title("測試錯誤注入")
+    async def test_error_injection(self):
+        """測試 error_rate 為 1 時每個請求都回傳 error_status"""
+        async with MockBitoProServer(MockServerConfig(error_rate=1.0, error_status=503)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                with pytest.raises(ClientResponseError) as exc_info:
+                    await client.get_ohlc_data("btc_twd", "1h", FROM_TIMESTAMP, TO_TIMESTAMP)
+
+        assert exc_info.value.status == 503
+        assert server.stats.injected_errors == 1
+
+    @allure.story("速率限制")
+    @allure.title("測試超過速率限制時回傳 429")
+    async def test_rate_limit(self):
+        """測試每秒請求數超過 rate_limit 時回傳 429 與速率限制標頭"""
+        async with MockBitoProServer(MockServerConfig(rate_limit=2)) as server:
+            async with aiohttp.ClientSession() as session:
+                statuses = []
+                for _ in range(3):
+                    async with session.get(server.fees_url) as response:
+                        statuses.append(response.status)
+                        headers = response.headers
+
+        assert statuses == [200, 200, 429]
+        assert headers["X-RateLimit-Limit"] == "2"
+        assert headers["X-RateLimit-Remaining"] == "0"
+        assert "Retry-After" in headers
+        assert server.stats.throttled == 1
+
+    @allure.story("手續費端點")
+    @allure.title("測試手續費端點")
+    async def test_fees(self):
+        """測試手續費端點回傳固定內容"""
+        async with MockBitoProServer() as server:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(server.fees_url) as response:
+                    assert response.status == 200
+                    assert await response.json() == MOCK_FEES
+
+
+class TestMockServerConfig:
+    """模擬伺服器設定與 API 根網址測試類"""
+
+    @allure.story("設定")
+    @allure.title("測試解析設定字串")
+    def test_parse(self):
+        """測試以逗號分隔的 key=value 設定轉換為對應型別"""
+        config = parse_mock_server_config("latency=0.05, latency_distribution=lognormal,rate_limit=100,seed=3")
+        assert config == MockServerConfig(latency=0.05, latency_distribution="lognormal", rate_limit=100, seed=3)
+        assert parse_mock_server_config("") == MockServerConfig()
+        assert parse_mock_server_config("rate_limit=off,candles=None") == MockServerConfig()
+
+        with pytest.raises(ValueError):
+            parse_mock_server_config("speed=1")
+        with pytest.raises(ValueError):
+            parse_mock_server_config("latency_distribution=pareto")
+
+    @allure.story("設定")
+    @allure.title("測試 API 根網址的來源")
+    def test_base_url(self, monkeypatch):
+        """測試參數優先於環境變數，都未提供時使用正式網址"""
+        monkeypatch.delenv(BitoProClient.BASE_URL_ENV, raising=False)
+        assert BitoProClient().base_url == BitoProClient.BASE_URL
+
+        monkeypatch.setenv(BitoProClient.BASE_URL_ENV, "http://127.0.0.1:8080/v3/")
+        assert BitoProClient().base_url == "http://127.0.0.1:8080/v3"
+        assert BitoProClient(base_url="http://localhost/v3").base_url == "http://localhost/v3"
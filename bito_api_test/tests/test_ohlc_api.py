@@ -6,6 +6,8 @@ import orjson
 import pytest
 from aiohttp import ClientResponseError
 from api.bitopro_client import BitoProClient
+from api.ohlc_resample import check_resolution_consistency
+from api.ohlc_validation import validate_ohlc
 
 pytestmark = [pytest.mark.asyncio, allure.feature("OHLC API")]
 
@@ -389,6 +391,91 @@ class TestOHLCApi:
                         allure.attachment_type.JSON,
                     )
 
+    @allure.story("OHLC 數據驗證")
+    @allure.title("測試所有時間框架的 OHLC 數據不變量")
+    @allure.description("""
+    以向量化驗證引擎檢查所有時間框架的 OHLC 數據內容
+    
+    檢查項目:
+        low ≤ open/close ≤ high、volume 非負
+        timestamp 嚴格遞增、對齊時間框架、沒有重複或缺少的 K 線
+    """)
+    async def test_get_ohlc_data_invariants(
+        self,
+        bitopro_client: BitoProClient,
+        gather_all_test_data: dict[str, Any],
+        all_resolutions: list[str],
+        test_pair: str,
+        test_from_timestamp: int,
+        test_to_timestamp: int,
+    ):
+        """測試所有時間框架的 OHLC 數據內容符合不變量"""
+        # 檢查是否成功獲取數據
+        assert "error" not in gather_all_test_data, f"獲取測試數據失敗: {gather_all_test_data.get('error')}"
+
+        resolution_data = gather_all_test_data["resolution_data"]
+        failed = {}
+
+        for resolution in all_resolutions:
+            data = resolution_data.get(resolution, {})
+            if "error" in data:
+                continue
+
+            # 預先獲取的數據只有單一請求，超過每次請求上限時會被截斷而誤報缺少的 K 線，改為分段獲取完整區間
+            expected_candles = (test_to_timestamp - test_from_timestamp) // BitoProClient.RESOLUTION_SECONDS[resolution]
+            if expected_candles >= BitoProClient.MAX_CANDLES_PER_REQUEST:
+                with allure.step(f"分段獲取時間框架 {resolution} 的完整數據"):
+                    data, _ = await bitopro_client.get_ohlc_range(
+                        test_pair, resolution, test_from_timestamp, test_to_timestamp
+                    )
+
+            with allure.step(f"驗證時間框架 {resolution} 的數據不變量"):
+                report = validate_ohlc(data, resolution)
+                allure.attach(report.summary(), f"時間框架 {resolution} 驗證報告", allure.attachment_type.TEXT)
+                if not report.ok:
+                    failed[resolution] = report.to_dict()
+
+        if failed:
+            allure.attach(safe_json_dumps(failed), "違規摘要", allure.attachment_type.JSON)
+        assert not failed, f"以下時間框架的數據違反不變量: {list(failed)}"
+
+    @allure.story("OHLC 數據驗證")
+    @allure.title("測試各時間框架與 1m 聚合結果一致")
+    @allure.description("""
+    下載一次 1m K 線並在本地聚合為所有較粗的時間框架，與伺服器回傳的 K 線逐一比對
+    
+    API 請求:
+    GET /trading-history/{pair}
+    
+    比對欄位: open, high, low, close, volume（定點數精確比對）
+    """)
+    async def test_ohlc_cross_resolution_consistency(
+        self, bitopro_client: BitoProClient, test_pair: str, test_from_timestamp: int, test_to_timestamp: int
+    ):
+        """測試伺服器各時間框架的 K 線等於 1m K 線的聚合結果"""
+        with allure.step("比對所有時間框架"):
+            report = await check_resolution_consistency(
+                bitopro_client, test_pair, test_from_timestamp, test_to_timestamp
+            )
+            allure.attach(report.summary(), "一致性報告", allure.attachment_type.TEXT)
+
+        failed = {resolution: result for resolution, result in report.results.items() if not result.ok}
+        for resolution, result in failed.items():
+            allure.attach(
+                safe_json_dumps(
+                    {
+                        "mismatches": result.mismatches,
+                        "examples": result.examples,
+                        "missing_served": result.missing_served,
+                        "missing_aggregated": result.missing_aggregated,
+                        "error": result.error,
+                    }
+                ),
+                f"時間框架 {resolution} 不一致詳情",
+                allure.attachment_type.JSON,
+            )
+        assert not failed, f"以下時間框架與 1m 聚合結果不一致: {list(failed)}"
+
     @allure.story("獲取 OHLC 數據")
     @allure.title("測試獲取 OHLC 數據時使用 INT64 邊界值")
     @allure.description("""
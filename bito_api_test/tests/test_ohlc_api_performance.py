@@ -1,13 +1,30 @@
 import asyncio
 import time
-from typing import Any
+from typing import Any, Awaitable, Dict
 
 import allure
 import orjson
 import pytest
 from api.bitopro_client import BitoProClient
+from api.concurrency_sweep import run_concurrency_sweep
+from api.latency_histogram import LatencyHistogram
+from api.load_generator import run_open_load
+from api.perf_baseline import BaselineStore, PerformanceRegression, check_regression
 
-pytestmark = [pytest.mark.asyncio, allure.feature("OHLC API 性能測試")]
+pytestmark = [pytest.mark.asyncio, pytest.mark.performance, allure.feature("OHLC API 性能測試")]
+
+# 響應時間測試中每個時間框架的請求次數
+RESPONSE_TIME_SAMPLES = 5
+
+# 開放模型負載測試的目標速率（每秒請求數）與持續秒數，低於 perf_bitopro_client 的速率上限以免測到客戶端排隊
+OPEN_LOAD_RATE = 5.0
+OPEN_LOAD_DURATION = 10.0
+
+# 併發掃描的最高併發級別、每一級的量測秒數，以及錯誤率與 p99 延遲 SLO
+SWEEP_MAX_CONCURRENCY = 32
+SWEEP_LEVEL_DURATION = 5.0
+SWEEP_MAX_ERROR_RATE = 0.01
+SWEEP_MAX_P99 = 2.0
 
 
 def safe_json_dumps(data: Any) -> str:
@@ -37,6 +54,19 @@ def safe_json_dumps(data: Any) -> str:
             raise
 
 
+async def _timed(awaitable: Awaitable[Any], histogram: LatencyHistogram) -> Any:
+    """等待請求完成並將耗時記錄到直方圖"""
+    started_at = time.perf_counter()
+    result = await awaitable
+    histogram.record(time.perf_counter() - started_at)
+    return result
+
+
+def _format_phase(value: Any) -> str:
+    """格式化單一階段的耗時，缺少記錄時顯示 -"""
+    return "-" if value is None else f"{value:.4f}"
+
+
 class TestOHLCApiPerformance:
     """BitoPro OHLC 數據 API 性能測試類"""
 
@@ -56,29 +86,47 @@ class TestOHLCApiPerformance:
     """)
     async def test_ohlc_api_response_time(
         self,
-        bitopro_client: BitoProClient,
+        isolated_bitopro_client: BitoProClient,
         test_pair: str,
         test_from_timestamp: int,
         test_to_timestamp: int,
+        perf_baseline: BaselineStore,
+        perf_run_id: str,
     ):
-        """測試 OHLC API 的響應時間"""
+        """測試 OHLC API 的響應時間，並與效能基準線比較各時間框架的 p95"""
+        # 使用沒有重試與期限的獨立客戶端，量測到的時間扣除限流等待，不含重試退避
+        client = isolated_bitopro_client
         # 定義測試參數
         resolutions = ["1m", "5m", "15m", "30m", "1h", "1d"]
         results = []
+        histogram = LatencyHistogram()
+        resolution_histograms: Dict[str, LatencyHistogram] = {}
+
+        with allure.step("預熱連線"):
+            # 獨立客戶端的連線池是空的，先建立連線，避免第一個樣本計入 DNS 與 TLS 握手
+            await client.get_ohlc_data(test_pair, "1d", test_from_timestamp, test_to_timestamp)
 
         for resolution in resolutions:
             with allure.step(f"測試時間框架 {resolution} 的響應時間"):
-                start_time = time.time()
+                resolution_histogram = LatencyHistogram()
+                for _ in range(RESPONSE_TIME_SAMPLES):
+                    start_time = time.perf_counter()
 
-                response, req_resp = await bitopro_client.get_ohlc_data(
-                    pair=test_pair,
-                    resolution=resolution,
-                    from_timestamp=test_from_timestamp,
-                    to_timestamp=test_to_timestamp,
-                )
+                    response, req_resp = await client.get_ohlc_data(
+                        pair=test_pair,
+                        resolution=resolution,
+                        from_timestamp=test_from_timestamp,
+                        to_timestamp=test_to_timestamp,
+                    )
 
-                end_time = time.time()
-                response_time = end_time - start_time
+                    end_time = time.perf_counter()
+                    rate_limit_wait = req_resp["request"].get("rate_limit_wait", 0.0)
+                    resolution_histogram.record(end_time - start_time - rate_limit_wait)
+
+                # 以中位數代表此時間框架的響應時間
+                response_time = resolution_histogram.percentile(50)
+                histogram.merge(resolution_histogram)
+                resolution_histograms[resolution] = resolution_histogram
 
                 # 記錄請求和響應資料
                 allure.attach(
@@ -97,11 +145,18 @@ class TestOHLCApiPerformance:
                         "resolution": resolution,
                         "response_time": response_time,
                         "data_count": len(response.get("data", [])),
+                        "timings": req_resp.get("timings", {}),
                     }
                 )
 
                 allure.attach(
-                    f"響應時間: {response_time:.4f} 秒\n數據點數量: {len(response.get('data', []))}",
+                    safe_json_dumps(req_resp.get("timings", {})),
+                    f"時間框架 {resolution} 的各階段耗時",
+                    allure.attachment_type.JSON,
+                )
+                allure.attach(
+                    f"響應時間中位數: {response_time:.4f} 秒\np95: {resolution_histogram.percentile(95):.4f} 秒\n"
+                    f"數據點數量: {len(response.get('data', []))}",
                     f"{resolution} 響應時間",
                     allure.attachment_type.TEXT,
                 )
@@ -112,13 +167,41 @@ class TestOHLCApiPerformance:
             sorted_results = sorted(results, key=lambda x: x["response_time"])
 
             report = "時間框架響應時間比較:\n\n"
-            report += "| 時間框架 | 響應時間 (秒) | 數據點數量 |\n"
-            report += "|----------|--------------|------------|\n"
+            report += "| 時間框架 | 響應時間 (秒) | 數據點數量 | 連線 (秒) | TTFB (秒) | 傳輸 (秒) | 解析 (秒) |\n"
+            report += "|----------|--------------|------------|----------|----------|----------|----------|\n"
 
             for result in sorted_results:
-                report += f"| {result['resolution']} | {result['response_time']:.4f} | {result['data_count']} |\n"
+                phases = " | ".join(
+                    _format_phase(result["timings"].get(phase)) for phase in ("connect", "ttfb", "transfer", "decode")
+                )
+                report += (
+                    f"| {result['resolution']} | {result['response_time']:.4f} | {result['data_count']} | {phases} |\n"
+                )
 
             allure.attach(report, "響應時間比較", allure.attachment_type.TEXT)
+            allure.attach(safe_json_dumps(histogram.summary()), "響應時間分佈", allure.attachment_type.JSON)
+            allure.attach(safe_json_dumps(histogram.to_dict()), "響應時間直方圖", allure.attachment_type.JSON)
+
+        # 先與先前的執行比較，再保存本次的結果
+        with allure.step("與效能基準線比較各時間框架的 p95"):
+            verdicts = []
+            for resolution, resolution_histogram in resolution_histograms.items():
+                metric = f"ohlc.response_time.{resolution}"
+                verdicts.append(
+                    check_regression(perf_baseline, metric, resolution_histogram.percentile(95), run_id=perf_run_id)
+                )
+                perf_baseline.record(perf_run_id, metric, resolution_histogram)
+
+            allure.attach("\n".join(verdict.describe() for verdict in verdicts), "效能基準線比較", allure.attachment_type.TEXT)
+            allure.attach(
+                safe_json_dumps([verdict.to_dict() for verdict in verdicts]),
+                "效能基準線比較詳細資料",
+                allure.attachment_type.JSON,
+            )
+
+        regressed = [verdict for verdict in verdicts if verdict.regressed]
+        if regressed:
+            raise PerformanceRegression("p95 響應時間退化: " + "; ".join(verdict.describe() for verdict in regressed))
 
     @allure.story("API 併發性能")
     @allure.title("測試 OHLC API 的併發性能")
@@ -138,7 +221,7 @@ class TestOHLCApiPerformance:
     """)
     async def test_ohlc_api_concurrent_performance(
         self,
-        bitopro_client: BitoProClient,
+        perf_bitopro_client: BitoProClient,
         test_pair: str,
         test_resolution: str,
         test_from_timestamp: int,
@@ -148,18 +231,25 @@ class TestOHLCApiPerformance:
         # 定義併發請求數
         concurrency_levels = [1, 5, 10]
         results = []
+        overall = LatencyHistogram()
 
         for concurrency in concurrency_levels:
             with allure.step(f"測試併發級別 {concurrency} 的性能"):
-                # 創建併發任務
+                histogram = LatencyHistogram()
+                # 創建併發任務，每個請求的耗時各自記錄到直方圖
                 tasks = []
                 for _ in range(concurrency):
+                    # 此測試刻意對伺服器施加併發負載，不合併相同的請求
                     tasks.append(
-                        bitopro_client.get_ohlc_data(
-                            pair=test_pair,
-                            resolution=test_resolution,
-                            from_timestamp=test_from_timestamp,
-                            to_timestamp=test_to_timestamp,
+                        _timed(
+                            perf_bitopro_client.get_ohlc_data(
+                                pair=test_pair,
+                                resolution=test_resolution,
+                                from_timestamp=test_from_timestamp,
+                                to_timestamp=test_to_timestamp,
+                                coalesce=False,
+                            ),
+                            histogram,
                         )
                     )
 
@@ -169,7 +259,8 @@ class TestOHLCApiPerformance:
                 end_time = time.time()
 
                 total_time = end_time - start_time
-                avg_time = total_time / concurrency
+                overall.merge(histogram)
+                latency = histogram.summary()
 
                 # 記錄請求和響應資料（僅記錄第一個請求的詳細信息）
                 if responses_with_req_resp:
@@ -185,10 +276,11 @@ class TestOHLCApiPerformance:
                         allure.attachment_type.JSON,
                     )
 
-                results.append({"concurrency": concurrency, "total_time": total_time, "avg_time": avg_time})
+                results.append({"concurrency": concurrency, "total_time": total_time, "latency": latency})
 
                 allure.attach(
-                    f"總執行時間: {total_time:.4f} 秒\n平均響應時間: {avg_time:.4f} 秒",
+                    f"總執行時間: {total_time:.4f} 秒\n平均響應時間: {latency['mean']:.4f} 秒\n"
+                    f"p50: {latency['p50']:.4f} 秒\np99: {latency['p99']:.4f} 秒",
                     f"併發級別 {concurrency} 性能",
                     allure.attachment_type.TEXT,
                 )
@@ -196,10 +288,91 @@ class TestOHLCApiPerformance:
         # 將結果添加到 Allure 報告
         with allure.step("比較不同併發級別的性能"):
             report = "併發性能比較:\n\n"
-            report += "| 併發級別 | 總執行時間 (秒) | 平均響應時間 (秒) |\n"
-            report += "|----------|----------------|------------------|\n"
+            report += "| 併發級別 | 總執行時間 (秒) | 平均 (秒) | p50 (秒) | p90 (秒) | p99 (秒) |\n"
+            report += "|----------|----------------|-----------|----------|----------|----------|\n"
 
             for result in results:
-                report += f"| {result['concurrency']} | {result['total_time']:.4f} | {result['avg_time']:.4f} |\n"
+                latency = result["latency"]
+                report += (
+                    f"| {result['concurrency']} | {result['total_time']:.4f} | {latency['mean']:.4f} "
+                    f"| {latency['p50']:.4f} | {latency['p90']:.4f} | {latency['p99']:.4f} |\n"
+                )
 
             allure.attach(report, "併發性能比較", allure.attachment_type.TEXT)
+            allure.attach(safe_json_dumps(overall.to_dict()), "併發請求延遲直方圖", allure.attachment_type.JSON)
+
+    @allure.story("API 開放模型負載")
+    @allure.title("測試 OHLC API 在固定請求速率下的延遲分佈")
+    @allure.description("""
+    以開放模型依固定速率持續發送請求，不論先前的請求是否完成，
+    延遲從預定發送時間起算以修正協調遺漏，並報告 p50/p90/p99/p99.9、吞吐量與錯誤率
+
+    API 請求:
+    GET /trading-history/{pair}
+    """)
+    async def test_ohlc_api_open_load(
+        self,
+        perf_bitopro_client: BitoProClient,
+        test_pair: str,
+        test_resolution: str,
+        test_from_timestamp: int,
+        test_to_timestamp: int,
+    ):
+        """測試 OHLC API 在固定請求速率下的延遲分佈"""
+        with allure.step(f"以 {OPEN_LOAD_RATE:g} req/s 持續 {OPEN_LOAD_DURATION:g} 秒發送請求"):
+            result = await run_open_load(
+                lambda: perf_bitopro_client.get_ohlc_data(
+                    pair=test_pair,
+                    resolution=test_resolution,
+                    from_timestamp=test_from_timestamp,
+                    to_timestamp=test_to_timestamp,
+                    coalesce=False,
+                ),
+                rate=OPEN_LOAD_RATE,
+                duration=OPEN_LOAD_DURATION,
+            )
+
+        allure.attach(result.summary(), "開放模型負載結果", allure.attachment_type.TEXT)
+        allure.attach(safe_json_dumps(result.to_dict()), "開放模型負載統計", allure.attachment_type.JSON)
+
+        assert result.succeeded > 0, f"所有請求都失敗: {result.errors}"
+
+    @allure.story("API 併發性能")
+    @allure.title("測試 OHLC API 的併發飽和點")
+    @allure.description("""
+    以 1, 2, 4, ... 等比遞增併發級別，吞吐量趨平或違反錯誤率/p99 延遲 SLO 時停止，
+    報告吞吐量開始趨平的拐點，以及吞吐量與延遲對併發級別的曲線
+
+    使用獨立連線池的客戶端，仍受此行程的整體速率限制，吞吐量不會超過測試套件允許的上限
+
+    API 請求:
+    GET /trading-history/{pair}
+    """)
+    async def test_ohlc_api_concurrency_sweep(
+        self,
+        isolated_bitopro_client: BitoProClient,
+        test_pair: str,
+        test_resolution: str,
+        test_from_timestamp: int,
+        test_to_timestamp: int,
+    ):
+        """測試 OHLC API 的併發飽和點"""
+        with allure.step(f"等比遞增併發級別至最高 {SWEEP_MAX_CONCURRENCY}"):
+            result = await run_concurrency_sweep(
+                lambda: isolated_bitopro_client.get_ohlc_data(
+                    pair=test_pair,
+                    resolution=test_resolution,
+                    from_timestamp=test_from_timestamp,
+                    to_timestamp=test_to_timestamp,
+                ),
+                max_concurrency=SWEEP_MAX_CONCURRENCY,
+                level_duration=SWEEP_LEVEL_DURATION,
+                max_error_rate=SWEEP_MAX_ERROR_RATE,
+                max_p99=SWEEP_MAX_P99,
+            )
+
+        allure.attach(result.summary(), "併發掃描結果", allure.attachment_type.TEXT)
+        allure.attach(result.to_svg(), "吞吐量與延遲曲線", allure.attachment_type.SVG)
+        allure.attach(safe_json_dumps(result.to_dict()), "併發掃描統計", allure.attachment_type.JSON)
+
+        assert result.knee is not None and result.knee.succeeded > 0, "沒有任何併發級別成功完成請求"
@@ -0,0 +1,63 @@
+from typing import Optional
+
+import allure
+import orjson
+import pytest
+from api.bitopro_client import BitoProClient, OHLCJob
+from api.rate_limiter import RateLimiter
+from api.soak import run_soak
+
+pytestmark = [pytest.mark.asyncio, allure.feature("OHLC API 長時間穩定性測試")]
+
+
+class TestOHLCApiSoak:
+    """BitoPro OHLC 數據 API 長時間穩定性測試類"""
+
+    @allure.story("資源洩漏與延遲漂移")
+    @allure.title("測試長時間執行下客戶端的記憶體、連線與延遲是否漂移")
+    @allure.description("""
+    以固定速率長時間發送不同時間框架的 OHLC 請求，定期取樣 RSS、socket 數、
+    連線池使用量與延遲百分位數，判斷是否持續單調成長
+
+    需以 --soak SECONDS 啟用，例如: pytest tests/test_ohlc_api_soak.py --soak 7200
+    """)
+    async def test_ohlc_api_soak(
+        self,
+        request: pytest.FixtureRequest,
+        api_base_url: Optional[str],
+        test_pair: str,
+        test_from_timestamp: int,
+        test_to_timestamp: int,
+    ):
+        """測試長時間執行下客戶端的記憶體、連線與延遲是否漂移"""
+        duration = request.config.getoption("--soak")
+        if duration is None:
+            pytest.skip("未指定 --soak，略過長時間測試")
+
+        rate = request.config.getoption("--soak-rate")
+        # 請求組合：常用的短時間框架比例較高
+        mix = {"1m": 4, "5m": 2, "1h": 2, "1d": 1}
+        jobs = [OHLCJob(test_pair, resolution, test_from_timestamp, test_to_timestamp) for resolution in mix]
+
+        rate_limiter = RateLimiter(default_rate=max(rate * 2, 1.0))
+        async with BitoProClient(rate_limiter=rate_limiter, base_url=api_base_url) as client:
+            with allure.step(f"以 {rate:g} req/s 持續 {duration:g} 秒發送請求"):
+                report = await run_soak(
+                    client,
+                    jobs,
+                    duration=duration,
+                    rate=rate,
+                    sample_interval=request.config.getoption("--soak-interval"),
+                    weights=list(mix.values()),
+                )
+
+        path = report.write(request.config.getoption("--soak-report-dir"))
+        allure.attach(report.summary(), "長時間測試結果", allure.attachment_type.TEXT)
+        allure.attach(report.to_csv(), "長時間測試時間序列", allure.attachment_type.CSV)
+        allure.attach(
+            orjson.dumps(report.to_dict(), option=orjson.OPT_INDENT_2).decode("utf-8"),
+            f"長時間測試完整結果（{path.name}）",
+            allure.attachment_type.JSON,
+        )
+
+        assert not report.drifting, f"偵測到持續成長: {[finding.metric for finding in report.drifting]}"
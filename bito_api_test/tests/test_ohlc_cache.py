@@ -0,0 +1,133 @@
+import time
+
+import allure
+from api.bitopro_client import BitoProClient
+from api.ohlc_cache import OHLCDiskCache
+
+pytestmark = [allure.feature("OHLC 磁碟快取")]
+
+
+def make_candles(from_timestamp: int, to_timestamp: int, step: int):
+    """產生區間內每個 step 秒一根的 K 線"""
+    start = -(-from_timestamp // step) * step
+    return [
+        {"timestamp": ts * 1000, "open": "1", "high": "2", "low": "0.5", "close": "1.5", "volume": "3"}
+        for ts in range(start, to_timestamp + 1, step)
+    ]
+
+
+class TestOHLCDiskCache:
+    """OHLCDiskCache 測試類"""
+
+    @allure.story("區塊快取")
+    @allure.title("測試已收盤區塊永久有效、未收盤區塊依 TTL 過期")
+    def test_closed_and_open_buckets(self, tmp_path):
+        """測試已收盤與未收盤區塊的有效期限"""
+        cache = OHLCDiskCache(tmp_path, open_bucket_ttl=0.0)
+        now = int(time.time())
+        cache.put("btc_twd", "1h", 0, 3600, [{"timestamp": 0}])
+        cache.put("btc_twd", "1h", now, now + 3600, [{"timestamp": now * 1000}])
+        time.sleep(0.01)
+
+        with allure.step("驗證命中統計"):
+            assert cache.get("btc_twd", "1h", 0) == [{"timestamp": 0}]
+            assert cache.get("btc_twd", "1h", now) is None
+            assert cache.get("btc_twd", "5m", 0) is None
+            assert cache.stats.hits == 1
+            assert cache.stats.misses == 2
+            assert cache.stats.stale == 1
+
+    @allure.story("區塊快取")
+    @allure.title("測試不同 API 根網址的數據互不覆寫，空區塊不會永久保存")
+    def test_namespace_and_empty_bucket(self, tmp_path):
+        """測試命名空間分開保存相同鍵的區塊，已結束但沒有 K 線的區塊依 TTL 過期"""
+        cache = OHLCDiskCache(tmp_path, open_bucket_ttl=0.0)
+        cache.put("btc_twd", "1h", 0, 3600, [{"timestamp": 0}], namespace="https://api.bitopro.com/v3")
+        cache.put("btc_twd", "1h", 0, 3600, [{"timestamp": 1}], namespace="http://127.0.0.1:8080/v3")
+        cache.put("btc_twd", "1h", 3600, 7200, [], namespace="https://api.bitopro.com/v3")
+        time.sleep(0.01)
+
+        with allure.step("驗證命名空間與空區塊"):
+            assert cache.get("btc_twd", "1h", 0, namespace="https://api.bitopro.com/v3") == [{"timestamp": 0}]
+            assert cache.get("btc_twd", "1h", 0, namespace="http://127.0.0.1:8080/v3") == [{"timestamp": 1}]
+            assert cache.get("btc_twd", "1h", 0) is None
+            assert cache.get("btc_twd", "1h", 3600, namespace="https://api.bitopro.com/v3") is None
+            assert cache.stats.stale == 1
+
+    @allure.story("區塊快取")
+    @allure.title("測試超過大小上限時淘汰最久未使用的區塊")
+    def test_lru_eviction(self, tmp_path):
+        """測試淘汰依最近使用時間進行"""
+        candles = [{"timestamp": i, "open": "1" * 50} for i in range(20)]
+        cache = OHLCDiskCache(tmp_path, max_bytes=10**9)
+        for bucket_start in (0, 3600, 7200):
+            cache.put("btc_twd", "1h", bucket_start, bucket_start + 3600, candles)
+            time.sleep(0.01)
+        assert cache.get("btc_twd", "1h", 0) is not None
+
+        bucket_size = (tmp_path / "btc_twd" / "1h" / "0.json").stat().st_size
+        cache.max_bytes = bucket_size * 3
+        cache.put("btc_twd", "1h", 10800, 14400, candles)
+
+        with allure.step("驗證最久未使用的區塊被淘汰"):
+            assert cache.stats.evictions >= 1
+            assert cache.get("btc_twd", "1h", 3600) is None
+            assert cache.get("btc_twd", "1h", 10800) is not None
+
+    @allure.story("區塊快取")
+    @allure.title("測試不安全的交易對名稱不會被當作路徑")
+    def test_unsafe_pair_name(self, tmp_path):
+        """測試含特殊字元的交易對會被雜湊，不會寫出快取目錄"""
+        cache = OHLCDiskCache(tmp_path)
+        cache.put("../' OR '1'='1", "1h", 0, 3600, [])
+        assert cache.get("../' OR '1'='1", "1h", 0) == []
+        assert all(tmp_path in path.parents for path in tmp_path.rglob("*.json"))
+
+    @allure.story("區間獲取")
+    @allure.title("測試重複獲取已快取的歷史區間不會發送請求")
+    async def test_range_served_from_cache(self, tmp_path, monkeypatch):
+        """測試第二次獲取相同區間時全部命中快取，且結果與第一次相同"""
+        calls = []
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp):
+            calls.append((from_timestamp, to_timestamp))
+            return {"data": make_candles(from_timestamp, to_timestamp, 60)}, {"request": {}, "response": {}}
+
+        client = BitoProClient(cache=OHLCDiskCache(tmp_path))
+        monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+        from_timestamp, to_timestamp = 1609459200 + 30, 1609459200 + 3 * 86400
+
+        first, _ = await client.get_ohlc_range("btc_twd", "1m", from_timestamp, to_timestamp)
+        first_calls = len(calls)
+        second, req_resp = await client.get_ohlc_range("btc_twd", "1m", from_timestamp, to_timestamp)
+
+        with allure.step("驗證快取命中且數據一致"):
+            assert first_calls == len(BitoProClient.split_time_range("1m", from_timestamp, to_timestamp))
+            assert len(calls) == first_calls
+            assert second == first
+            assert first["data"][0]["timestamp"] >= from_timestamp * 1000
+            assert first["data"][-1]["timestamp"] <= to_timestamp * 1000
+            assert req_resp["cache"]["hits"] == first_calls
+
+    @allure.story("區間獲取")
+    @allure.title("測試結束時間對齊區塊邊界時快取與非快取結果相同")
+    async def test_range_aligned_to_timestamp(self, tmp_path, monkeypatch):
+        """測試 to_timestamp 剛好是區塊開始時，快取路徑也包含 to 那根 K 線"""
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp):
+            return {"data": make_candles(from_timestamp, to_timestamp, 60)}, {"request": {}, "response": {}}
+
+        span = BitoProClient.range_span("1m")
+        to_timestamp = 1609459200 // span * span + 2 * span
+        from_timestamp = to_timestamp - span - 600
+
+        uncached_client = BitoProClient()
+        cached_client = BitoProClient(cache=OHLCDiskCache(tmp_path))
+        for client in (uncached_client, cached_client):
+            monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+        uncached, _ = await uncached_client.get_ohlc_range("btc_twd", "1m", from_timestamp, to_timestamp)
+        cached, _ = await cached_client.get_ohlc_range("btc_twd", "1m", from_timestamp, to_timestamp)
+
+        with allure.step("驗證兩條路徑回傳相同的 K 線"):
+            assert uncached["data"][-1]["timestamp"] == to_timestamp * 1000
+            assert cached == uncached
@@ -0,0 +1,72 @@
+import allure
+import numpy as np
+import pytest
+from api.ohlc_columns import OHLCColumns
+
+pytestmark = [allure.feature("OHLC 按欄數據")]
+
+SAMPLE_RESPONSE = {
+    "data": [
+        {
+            "timestamp": 1551139200000,
+            "open": "3955.8",
+            "high": "4010",
+            "low": "3900.01",
+            "close": "4000.5",
+            "volume": "2.5",
+        },
+        {
+            "timestamp": 1551052800000,
+            "open": "4099.99",
+            "high": "4444.47",
+            "low": "3875.32",
+            "close": "3955.8",
+            "volume": "13.35162928",
+        },
+    ]
+}
+
+
+class TestOHLCColumns:
+    """OHLCColumns 測試類"""
+
+    @allure.story("格式轉換")
+    @allure.title("測試字典列表轉換為按欄陣列")
+    def test_from_response(self):
+        """測試數值欄位一次轉換為 float64，時間戳為 int64"""
+        columns = OHLCColumns.from_response(SAMPLE_RESPONSE)
+
+        assert len(columns) == 2
+        assert columns.timestamp.dtype == np.int64
+        assert columns.values.dtype == np.float64
+        assert columns.high.tolist() == [4010.0, 4444.47]
+        assert columns.volume.tolist() == [2.5, 13.35162928]
+        assert columns.to_records()[1]["open"] == 4099.99
+
+    @allure.story("格式轉換")
+    @allure.title("測試依時間排序")
+    def test_sort(self):
+        """測試 sort 依 timestamp 重新排列所有欄位"""
+        columns = OHLCColumns.from_response(SAMPLE_RESPONSE).sort()
+        assert columns.timestamp.tolist() == [1551052800000, 1551139200000]
+        assert columns.open.tolist() == [4099.99, 3955.8]
+
+    @allure.story("格式轉換")
+    @allure.title("測試轉換為 DataFrame 不複製數值")
+    def test_to_dataframe_zero_copy(self):
+        """測試 DataFrame 的數值直接引用 OHLCColumns 的記憶體"""
+        pytest.importorskip("pandas")
+        columns = OHLCColumns.from_response(SAMPLE_RESPONSE)
+        df = columns.to_dataframe()
+
+        assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+        assert np.shares_memory(df["close"].to_numpy(), columns.values)
+        assert df.index[1].value == 1551052800000 * 1_000_000
+
+    @allure.story("格式轉換")
+    @allure.title("測試空數據")
+    def test_empty(self):
+        """測試空的 data 欄位會產生長度為 0 的陣列"""
+        columns = OHLCColumns.from_response({"data": []})
+        assert len(columns) == 0
+        assert columns.values.shape == (5, 0)
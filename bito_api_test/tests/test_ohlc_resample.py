@@ -0,0 +1,123 @@
+import allure
+import numpy as np
+import pytest
+from api.bitopro_client import BitoProClient
+from api.fixed_point import DEFAULT_PRECISION
+from api.ohlc_columns import OHLCColumns
+from api.ohlc_resample import check_resolution_consistency, resample_ohlc
+
+pytestmark = [allure.feature("跨時間框架一致性")]
+
+FROM_TIMESTAMP = 1609459200  # 2021-01-01 00:00:00 UTC
+TO_TIMESTAMP = FROM_TIMESTAMP + 2 * 86400
+
+
+def make_minute_candles(from_timestamp: int, to_timestamp: int, seed: int = 7) -> OHLCColumns:
+    """產生隨機但合法的 1m 定點 K 線"""
+    rng = np.random.default_rng(seed)
+    timestamp = np.arange(from_timestamp, to_timestamp, 60, dtype=np.int64) * 1000
+    open_ = rng.integers(10**9, 2 * 10**9, len(timestamp))
+    close = rng.integers(10**9, 2 * 10**9, len(timestamp))
+    high = np.maximum(open_, close) + rng.integers(0, 10**7, len(timestamp))
+    low = np.minimum(open_, close) - rng.integers(0, 10**7, len(timestamp))
+    volume = rng.integers(0, 10**10, len(timestamp))
+    scales = tuple(DEFAULT_PRECISION.values())
+    return OHLCColumns(timestamp=timestamp, values=np.stack([open_, high, low, close, volume]), scales=scales)
+
+
+class TestOHLCResample:
+    """resample_ohlc 與一致性檢查測試類"""
+
+    @allure.story("聚合")
+    @allure.title("測試 1m 聚合為 1h 的 OHLCV 規則")
+    def test_resample_hourly(self):
+        """測試 open 取第一根、close 取最後一根、high/low 取極值、volume 加總"""
+        minutes = make_minute_candles(FROM_TIMESTAMP, FROM_TIMESTAMP + 7200)
+        hourly = resample_ohlc(minutes, "1h")
+
+        assert hourly.timestamp.tolist() == [FROM_TIMESTAMP * 1000, (FROM_TIMESTAMP + 3600) * 1000]
+        first_hour = minutes.values[:, :60]
+        assert hourly.open[0] == first_hour[0][0]
+        assert hourly.high[0] == first_hour[1].max()
+        assert hourly.low[0] == first_hour[2].min()
+        assert hourly.close[0] == first_hour[3][-1]
+        assert hourly.volume[0] == first_hour[4].sum()
+        assert hourly.scales == minutes.scales
+
+    @allure.story("聚合")
+    @allure.title("測試週與月的聚合邊界")
+    def test_resample_calendar_buckets(self):
+        """測試週 K 線以星期一為界、月 K 線以每月 1 日為界"""
+        days = make_minute_candles(FROM_TIMESTAMP, FROM_TIMESTAMP + 40 * 86400)
+        weekly = resample_ohlc(days, "1w")
+        monthly = resample_ohlc(days, "1M")
+
+        assert weekly.timestamp[1] == 1609718400 * 1000  # 2021-01-04 星期一
+        assert monthly.timestamp.tolist() == [1609459200 * 1000, 1612137600 * 1000]  # 1 月、2 月
+
+    @allure.story("聚合")
+    @allure.title("測試 volume 加總超出 int64 時拋出例外")
+    def test_resample_volume_overflow(self):
+        """測試定點 volume 的加總不會靜默溢位"""
+        minutes = make_minute_candles(FROM_TIMESTAMP, FROM_TIMESTAMP + 3600)
+        minutes.values[4, :] = 2**62
+        with pytest.raises(OverflowError):
+            resample_ohlc(minutes, "1h")
+
+        minutes.values[4, :] = 2**62 // 60
+        assert resample_ohlc(minutes, "1h").volume[0] == 2**62 // 60 * 60
+
+    @allure.story("一致性檢查")
+    @allure.title("測試伺服器數據與聚合結果的比對")
+    async def test_check_resolution_consistency(self, monkeypatch):
+        """測試完全一致時通過，且能找出被竄改的 K 線"""
+        minutes = make_minute_candles(FROM_TIMESTAMP, TO_TIMESTAMP)
+        tampered = {"resolution": "4h", "timestamp": (FROM_TIMESTAMP + 4 * 3600) * 1000}
+        base_calls = []
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp, **kwargs):
+            if resolution == "1m":
+                base_calls.append((from_timestamp, to_timestamp))
+            candles = minutes if resolution == "1m" else resample_ohlc(minutes, resolution)
+            mask = (candles.timestamp >= from_timestamp * 1000) & (candles.timestamp < to_timestamp * 1000)
+            records = OHLCColumns(candles.timestamp[mask], candles.values[:, mask], candles.scales).to_records()
+            for record in records:
+                if resolution == tampered["resolution"] and record["timestamp"] == tampered["timestamp"]:
+                    record["volume"] = "0"
+            return {"data": records}, {"request": {}, "response": {}}
+
+        client = BitoProClient()
+        monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+
+        report = await check_resolution_consistency(client, "btc_twd", FROM_TIMESTAMP, TO_TIMESTAMP)
+        allure.attach(report.summary(), "一致性報告", allure.attachment_type.TEXT)
+
+        with allure.step("驗證比對結果"):
+            assert len(base_calls) == len(BitoProClient.split_time_range("1m", FROM_TIMESTAMP, TO_TIMESTAMP))
+            assert report.results["1h"].ok and report.results["1h"].compared == 48
+            assert report.results["1d"].ok and report.results["1d"].compared == 2
+            assert report.results["1w"].compared == 0
+            assert not report.results["4h"].ok
+            assert report.results["4h"].mismatches["volume"] == 1
+            assert report.results["4h"].examples == [tampered["timestamp"]]
+            assert not report.ok
+
+    @allure.story("一致性檢查")
+    @allure.title("測試超過單次請求上限的時間框架不會因截斷誤報缺少")
+    async def test_check_resolution_consistency_long_window(self, monkeypatch):
+        """測試伺服器每次最多回傳 MAX_CANDLES_PER_REQUEST 根時，較粗的時間框架也分段獲取"""
+        to_timestamp = FROM_TIMESTAMP + 4 * 86400
+        minutes = make_minute_candles(FROM_TIMESTAMP, to_timestamp)
+
+        async def fake_get_ohlc_data(pair, resolution, from_timestamp, to_timestamp, **kwargs):
+            candles = minutes if resolution == "1m" else resample_ohlc(minutes, resolution)
+            mask = (candles.timestamp >= from_timestamp * 1000) & (candles.timestamp <= to_timestamp * 1000)
+            records = OHLCColumns(candles.timestamp[mask], candles.values[:, mask], candles.scales).to_records()
+            return {"data": records[: BitoProClient.MAX_CANDLES_PER_REQUEST]}, {"request": {}, "response": {}}
+
+        client = BitoProClient()
+        monkeypatch.setattr(client, "get_ohlc_data", fake_get_ohlc_data)
+        report = await check_resolution_consistency(client, "btc_twd", FROM_TIMESTAMP, to_timestamp, resolutions=["5m"])
+
+        assert report.results["5m"].ok, report.summary()
+        assert report.results["5m"].compared == 4 * 288
@@ -0,0 +1,93 @@
+import allure
+import orjson
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from api.bitopro_client import BitoProClient
+from api.ohlc_columns import OHLCColumns
+from api.ohlc_stream import OHLCStreamDecoder
+
+pytestmark = [allure.feature("OHLC 串流解析")]
+
+CANDLES = [
+    {"timestamp": i * 60000, "open": "1.5", "high": "2", "low": "1", "close": "1.75", "volume": "10"}
+    for i in range(2500)
+]
+RAW_BODY = orjson.dumps({"data": CANDLES})
+
+
+def _decode_in_chunks(raw_body: bytes, chunk_size: int) -> list:
+    """以固定大小切段餵入解碼器，回傳解析出的全部 K 線"""
+    decoder = OHLCStreamDecoder()
+    items = []
+    for start in range(0, len(raw_body), chunk_size):
+        items.extend(decoder.feed(raw_body[start : start + chunk_size]))
+    decoder.close()
+    return items
+
+
+class TestOHLCStreamDecoder:
+    """OHLCStreamDecoder 測試類"""
+
+    @allure.story("增量解析")
+    @allure.title("測試任意切段都能還原完整數據")
+    @pytest.mark.parametrize("chunk_size", [7, 100, 4096, len(RAW_BODY)])
+    def test_chunk_boundaries(self, chunk_size):
+        """測試切段邊界落在鍵名、數值或物件之間時解析結果都一致"""
+        assert _decode_in_chunks(RAW_BODY, chunk_size) == CANDLES
+
+    @allure.story("增量解析")
+    @allure.title("測試逐位元組餵入")
+    def test_single_bytes(self):
+        """測試每次只餵入一個位元組時仍能逐根產出 K 線"""
+        raw_body = orjson.dumps({"data": CANDLES[:20]})
+        assert _decode_in_chunks(raw_body, 1) == CANDLES[:20]
+
+    @allure.story("增量解析")
+    @allure.title("測試空白與空陣列")
+    def test_whitespace_and_empty(self):
+        """測試含空白的排版與空的 data 陣列"""
+        pretty = orjson.dumps({"data": CANDLES[:3]}, option=orjson.OPT_INDENT_2)
+        assert _decode_in_chunks(pretty, 5) == CANDLES[:3]
+        assert _decode_in_chunks(b'{"data": [ ]}', 3) == []
+
+    @allure.story("錯誤處理")
+    @allure.title("測試不完整的響應")
+    def test_incomplete(self):
+        """測試響應被截斷或沒有 data 陣列時 close 引發 ValueError"""
+        decoder = OHLCStreamDecoder()
+        decoder.feed(RAW_BODY[:1000])
+        with pytest.raises(ValueError, match="incomplete"):
+            decoder.close()
+
+        decoder = OHLCStreamDecoder()
+        decoder.feed(b'{"error": "invalid pair"}')
+        with pytest.raises(ValueError, match="no data array"):
+            decoder.close()
+
+    @allure.story("客戶端整合")
+    @allure.title("測試客戶端分批串流產出 K 線")
+    async def test_stream_ohlc_data(self):
+        """測試串流模式的批次大小、內容與 as_columns 輸出"""
+
+        async def trading_history(request: web.Request) -> web.StreamResponse:
+            response = web.StreamResponse(headers={"Content-Type": "application/json"})
+            await response.prepare(request)
+            for start in range(0, len(RAW_BODY), 3000):
+                await response.write(RAW_BODY[start : start + 3000])
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_get("/v3/trading-history/{pair}", trading_history)
+        async with TestServer(app) as server:
+            async with BitoProClient(base_url=str(server.make_url("/v3"))) as client:
+                batches = [batch async for batch in client.stream_ohlc_data("btc_twd", "1m", 0, 1, batch_size=1000)]
+                columns = [
+                    batch async for batch in client.stream_ohlc_data("btc_twd", "1m", 0, 1, 1000, as_columns=True)
+                ]
+
+        assert [len(batch) for batch in batches] == [1000, 1000, 500]
+        assert [candle for batch in batches for candle in batch] == CANDLES
+        assert all(isinstance(batch, OHLCColumns) for batch in columns)
+        assert sum(len(batch.timestamp) for batch in columns) == len(CANDLES)
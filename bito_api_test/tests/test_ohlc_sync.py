@@ -0,0 +1,107 @@
+import calendar
+import time
+
+import allure
+from api.bitopro_client import BitoProClient
+from api.ohlc_sync import OHLCSyncEngine, merge_intervals, subtract_intervals
+
+pytestmark = [allure.feature("OHLC 增量同步")]
+
+
+class FakeRangeClient:
+    """記錄請求區間並回傳每分鐘一根 K 線的替身客戶端"""
+
+    def __init__(self, skip=()):
+        self.calls = []
+        self.skip = set(skip)
+
+    async def get_ohlc_range(self, pair, resolution, from_timestamp, to_timestamp):
+        self.calls.append((from_timestamp, to_timestamp))
+        step = BitoProClient.RESOLUTION_SECONDS[resolution]
+        start = -(-from_timestamp // step) * step
+        candles = [{"timestamp": ts * 1000} for ts in range(start, to_timestamp, step) if ts not in self.skip]
+        return {"data": candles}, {}
+
+
+class TestOHLCSync:
+    """OHLCSyncEngine 測試類"""
+
+    @allure.story("區間運算")
+    @allure.title("測試區間合併與差集")
+    def test_interval_helpers(self):
+        """測試 merge_intervals 與 subtract_intervals"""
+        covered = merge_intervals([(10, 20), (0, 5), (5, 8), (30, 40)])
+        assert covered == [(0, 8), (10, 20), (30, 40)]
+        assert subtract_intervals((0, 50), covered) == [(8, 10), (20, 30), (40, 50)]
+        assert subtract_intervals((12, 18), covered) == []
+
+    @allure.story("增量同步")
+    @allure.title("測試穩定狀態下每個序列只請求尾端")
+    async def test_steady_state_fetches_only_tail(self, monkeypatch):
+        """測試第二次同步只請求仍在進行中的 K 線之後的區間"""
+        client = FakeRangeClient()
+        engine = OHLCSyncEngine(client)
+        # 固定在分鐘中間，整分鐘時沒有進行中的 K 線，第二次同步就不會有尾端可請求
+        now = int(time.time()) // 60 * 60 + 30
+        monkeypatch.setattr(time, "time", lambda: now)
+        from_timestamp = now - 86400
+
+        first = await engine.sync("btc_twd", "1m", from_timestamp)
+        second = await engine.sync("btc_twd", "1m", from_timestamp)
+
+        with allure.step("驗證第二次同步只請求一個小區間"):
+            assert first.fetched_intervals == [(from_timestamp, now)]
+            assert len(second.fetched_intervals) == 1
+            tail_start, _ = second.fetched_intervals[0]
+            assert tail_start == now // 60 * 60
+            assert first.high_water_mark == tail_start
+
+    @allure.story("增量同步")
+    @allure.title("測試擴大歷史範圍時只請求缺少的區間")
+    async def test_backfill_only_missing(self):
+        """測試往前擴充歷史時不重複請求已同步的區間"""
+        client = FakeRangeClient()
+        engine = OHLCSyncEngine(client)
+
+        await engine.sync("btc_twd", "1h", 1609459200, 1609545600)
+        result = await engine.sync("btc_twd", "1h", 1609372800, 1609632000)
+
+        assert result.fetched_intervals == [(1609372800, 1609459200), (1609545600, 1609632000)]
+        assert len(engine.series("btc_twd", "1h").candles) == 72
+
+    @allure.story("缺口偵測")
+    @allure.title("測試偵測並重新請求序列中的缺口")
+    async def test_gap_detection(self, tmp_path):
+        """測試 find_gaps 找出缺少的 K 線，並可透過 include_gaps 重新請求，狀態可儲存與載入"""
+        client = FakeRangeClient(skip={1609459200 + 3600 * 5, 1609459200 + 3600 * 6})
+        engine = OHLCSyncEngine(client)
+        await engine.sync("btc_twd", "1h", 1609459200, 1609545600)
+
+        gaps = engine.find_gaps("btc_twd", "1h")
+        assert gaps == [(1609459200 + 3600 * 5, 1609459200 + 3600 * 7)]
+        assert engine.missing_intervals("btc_twd", "1h", 1609459200, 1609545600) == []
+        assert engine.missing_intervals("btc_twd", "1h", 1609459200, 1609545600, include_gaps=True) == gaps
+
+        engine.save(tmp_path / "series.json")
+        restored = OHLCSyncEngine(client)
+        restored.load(tmp_path / "series.json")
+        assert restored.series("btc_twd", "1h").covered == engine.series("btc_twd", "1h").covered
+        assert restored.find_gaps("btc_twd", "1h") == gaps
+
+    @allure.story("缺口偵測")
+    @allure.title("測試月 K 與週 K 依日曆偵測缺口")
+    def test_gap_detection_calendar_resolutions(self):
+        """測試天數不同的月份不會被誤報為缺口，週 K 依週一對齊計算缺口起點"""
+        engine = OHLCSyncEngine(FakeRangeClient())
+        month_starts = [calendar.timegm((2021, month, 1, 0, 0, 0)) for month in range(1, 13)]
+        engine.series("btc_twd", "1M").candles = {ts * 1000: {"timestamp": ts * 1000} for ts in month_starts}
+        assert engine.find_gaps("btc_twd", "1M") == []
+
+        del engine.series("btc_twd", "1M").candles[month_starts[2] * 1000]
+        assert engine.find_gaps("btc_twd", "1M") == [(month_starts[2], month_starts[3])]
+
+        week = BitoProClient.RESOLUTION_SECONDS["1w"]
+        monday = calendar.timegm((2021, 1, 4, 0, 0, 0))
+        week_starts = [monday + week * i for i in range(6) if i != 2]
+        engine.series("btc_twd", "1w").candles = {ts * 1000: {"timestamp": ts * 1000} for ts in week_starts}
+        assert engine.find_gaps("btc_twd", "1w") == [(monday + week * 2, monday + week * 3)]
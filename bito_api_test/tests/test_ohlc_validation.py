@@ -0,0 +1,92 @@
+import allure
+import numpy as np
+from api.fixed_point import DEFAULT_PRECISION
+from api.ohlc_columns import OHLCColumns
+from api.ohlc_validation import validate_ohlc
+
+pytestmark = [allure.feature("OHLC 數據驗證")]
+
+HOUR_MS = 3600 * 1000
+BASE_MS = 1609459200 * 1000
+
+
+def make_response(timestamps, overrides=None):
+    """產生合法的 K 線回應，overrides 以索引覆寫個別欄位"""
+    data = [
+        {"timestamp": ts, "open": "10", "high": "12", "low": "9", "close": "11", "volume": "1.5"} for ts in timestamps
+    ]
+    for index, fields in (overrides or {}).items():
+        data[index].update(fields)
+    return {"data": data}
+
+
+class TestOHLCValidation:
+    """validate_ohlc 測試類"""
+
+    @allure.story("不變量檢查")
+    @allure.title("測試合法數據沒有違規")
+    def test_valid_data(self):
+        """測試連續且合法的 1h K 線通過所有檢查"""
+        report = validate_ohlc(make_response([BASE_MS + i * HOUR_MS for i in range(24)]), "1h")
+        allure.attach(report.summary(), "驗證報告", allure.attachment_type.TEXT)
+        assert report.ok, report.summary()
+        assert report.candle_count == 24
+
+    @allure.story("不變量檢查")
+    @allure.title("測試偵測價格、成交量與時間戳違規")
+    def test_detects_violations(self):
+        """測試每種違規都被計數並附上範例 timestamp"""
+        timestamps = [BASE_MS + i * HOUR_MS for i in range(10)]
+        timestamps[4] = timestamps[3]  # 重複
+        timestamps[8] = BASE_MS + 7 * HOUR_MS + 60 * 1000  # 未對齊且不遞增
+        del timestamps[9]
+        timestamps.append(BASE_MS + 12 * HOUR_MS)  # 缺少 8h~11h 的 K 線
+        response = make_response(
+            timestamps,
+            {
+                0: {"low": "13"},
+                1: {"open": "8"},
+                2: {"close": "12.5"},
+                5: {"volume": "-1"},
+            },
+        )
+
+        report = validate_ohlc(response, "1h")
+
+        with allure.step("驗證各項違規數量"):
+            allure.attach(report.summary(), "驗證報告", allure.attachment_type.TEXT)
+            assert not report.ok
+            assert report.counts["low_above_high"] == 1
+            assert report.counts["open_out_of_range"] == 2
+            assert report.counts["close_out_of_range"] == 2
+            assert report.counts["negative_volume"] == 1
+            assert report.counts["duplicate_timestamp"] == 1
+            assert report.counts["misaligned_timestamp"] == 1
+            assert report.counts["non_increasing_timestamp"] == 1
+            assert report.examples["negative_volume"] == [timestamps[5]]
+            assert report.to_dict()["violations"].keys() == report.violations.keys()
+
+    @allure.story("不變量檢查")
+    @allure.title("測試週與月 K 線的對齊與缺口")
+    def test_calendar_resolutions(self):
+        """測試週 K 線以星期一對齊，月 K 線以每月 1 日對齊並以月份計算缺口"""
+        monday = 1609718400 * 1000  # 2021-01-04 00:00:00 UTC
+        weekly = validate_ohlc(make_response([monday, monday + 7 * 86400 * 1000]), "1w")
+        assert weekly.ok, weekly.summary()
+        assert validate_ohlc(make_response([BASE_MS]), "1w").counts["misaligned_timestamp"] == 1
+
+        months = np.array(["2021-01", "2021-02", "2021-05"], dtype="datetime64[M]")
+        monthly_ts = months.astype("datetime64[ms]").astype(np.int64).tolist()
+        monthly = validate_ohlc(make_response(monthly_ts), "1M")
+        assert monthly.counts["misaligned_timestamp"] == 0
+        assert monthly.counts["missing_bucket"] == 2
+
+    @allure.story("不變量檢查")
+    @allure.title("測試以定點數據驗證")
+    def test_fixed_point_columns(self):
+        """測試定點 OHLCColumns 可直接驗證，且能辨識浮點數難以區分的微小差異"""
+        response = make_response(
+            [BASE_MS], {0: {"open": "0.30000001", "high": "0.30000001", "low": "0.3", "close": "0.30000002"}}
+        )
+        report = validate_ohlc(OHLCColumns.from_response(response, DEFAULT_PRECISION), "1h")
+        assert report.counts["close_out_of_range"] == 1
@@ -0,0 +1,75 @@
+import allure
+import pytest
+from api.latency_histogram import LatencyHistogram
+from api.perf_baseline import BaselineStore, PerformanceRegression, check_regression
+
+pytestmark = [allure.feature("效能基準線")]
+
+METRIC = "ohlc.response_time.1m"
+
+
+def _histogram(*values: float) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    histogram.record_many(values)
+    return histogram
+
+
+@pytest.fixture
+def store(tmp_path):
+    """提供暫存目錄中的基準線資料庫"""
+    with BaselineStore(tmp_path / "baseline.sqlite3") as baseline:
+        yield baseline
+
+
+class TestPerfBaseline:
+    """BaselineStore 與 check_regression 測試類"""
+
+    @allure.story("基準線資料庫")
+    @allure.title("測試保存與讀取各次執行的結果")
+    def test_store(self, store, tmp_path):
+        """測試依時間由新到舊取得 p95，同一次執行重複寫入時覆蓋，且重新開啟後資料仍在"""
+        for i in range(3):
+            store.record(f"run-{i}", METRIC, _histogram(0.1 * (i + 1)), recorded_at=1000.0 + i)
+        store.record("run-2", METRIC, _histogram(0.5), recorded_at=1002.0)
+
+        assert store.recent_p95(METRIC) == pytest.approx([0.5, 0.2, 0.1], rel=0.01)
+        assert store.recent_p95(METRIC, limit=1, exclude_run_id="run-2") == pytest.approx([0.2], rel=0.01)
+        assert store.histograms(METRIC)[0].count == 1
+        assert store.recent_p95("ohlc.response_time.1d") == []
+
+        store.close()
+        with BaselineStore(tmp_path / "baseline.sqlite3") as reopened:
+            assert len(reopened.recent_p95(METRIC)) == 3
+
+    @allure.story("退化判定")
+    @allure.title("測試超過中位數加 k 倍 MAD 時判定退化")
+    def test_regression(self, store):
+        """測試在基準線波動範圍內不判定退化，明顯超出時判定退化"""
+        for i, p95 in enumerate((0.20, 0.21, 0.19, 0.22, 0.20, 0.18)):
+            store.record(f"run-{i}", METRIC, _histogram(p95), recorded_at=float(i))
+
+        normal = check_regression(store, METRIC, 0.22, run_id="current")
+        assert normal.has_baseline
+        assert normal.samples == 6
+        assert normal.baseline_median == pytest.approx(0.2, rel=0.02)
+        assert not normal.regressed
+
+        regressed = check_regression(store, METRIC, 0.4, run_id="current")
+        assert regressed.regressed
+        assert "退化" in regressed.describe()
+        assert not issubclass(PerformanceRegression, AssertionError)
+
+    @allure.story("退化判定")
+    @allure.title("測試基準線樣本不足或穩定時的門檻")
+    def test_insufficient_and_stable_baseline(self, store):
+        """測試樣本不足時不判定退化，基準線完全穩定時至少允許 min_relative 的增幅"""
+        store.record("run-0", METRIC, _histogram(0.2), recorded_at=0.0)
+        assert not check_regression(store, METRIC, 10.0).has_baseline
+
+        for i in range(1, 5):
+            store.record(f"run-{i}", METRIC, _histogram(0.2), recorded_at=float(i))
+        verdict = check_regression(store, METRIC, 0.21)
+        assert verdict.baseline_mad == 0
+        assert verdict.threshold == pytest.approx(verdict.baseline_median * 1.1)
+        assert not verdict.regressed
+        assert check_regression(store, METRIC, 0.3).regressed
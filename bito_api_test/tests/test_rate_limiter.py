@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import allure
+import pytest
+from api.rate_limiter import RateLimiter, TokenBucket
+
+pytestmark = [allure.feature("速率限制")]
+
+
+class TestRateLimiter:
+    """TokenBucket 與 RateLimiter 測試類"""
+
+    @allure.story("令牌桶")
+    @allure.title("測試令牌耗盡後依補充速率放行")
+    async def test_token_bucket_throughput(self):
+        """測試突發量用完後，請求間隔符合補充速率，並記錄等待統計"""
+        bucket = TokenBucket(rate=50.0, capacity=2.0)
+        started_at = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(10)))
+        elapsed = time.monotonic() - started_at
+
+        assert elapsed == pytest.approx(8 / 50.0, abs=0.05)
+        assert bucket.metrics.acquisitions == 10
+        assert bucket.metrics.waits >= 7
+        assert bucket.metrics.max_wait >= 0.1
+
+    @allure.story("自動調整")
+    @allure.title("測試收到 429 時暫停並降低速率")
+    async def test_throttled_response(self):
+        """測試 Retry-After 暫停發放令牌，且速率減半"""
+        limiter = RateLimiter(default_rate=20.0)
+        await limiter.acquire("trading-history")
+        limiter.update_from_response("trading-history", 429, {"Retry-After": "0.2"})
+
+        waited = await limiter.acquire("trading-history")
+
+        metrics = limiter.metrics()["trading-history"]
+        assert waited >= 0.15
+        assert metrics["throttled"] == 1
+        assert metrics["rate"] == pytest.approx(10.0)
+
+    @allure.story("自動調整")
+    @allure.title("測試依剩餘配額標頭降低速率並逐步恢復")
+    def test_header_hints(self):
+        """測試剩餘配額不足以維持目前速率時降速，沒有提示的成功回應逐步恢復"""
+        limiter = RateLimiter(default_rate=10.0)
+        limiter.update_from_response("trading-history", 200, {"X-RateLimit-Remaining": "20", "X-RateLimit-Reset": "10"})
+        assert limiter.bucket("trading-history").rate == pytest.approx(2.0)
+
+        limiter.update_from_response("trading-history", 200, {})
+        assert limiter.bucket("trading-history").rate == pytest.approx(2.5)
+
+        for _ in range(100):
+            limiter.update_from_response("trading-history", 200, {})
+        assert limiter.bucket("trading-history").rate == pytest.approx(10.0)
+
+    @allure.story("端點設定")
+    @allure.title("測試各端點使用獨立的令牌桶")
+    def test_endpoint_rates(self):
+        """測試個別端點設定與預設值"""
+        limiter = RateLimiter(default_rate=5.0, endpoint_rates={"trading-history": (30.0, 60.0)}, adaptive=False)
+        assert limiter.bucket("trading-history").rate == 30.0
+        assert limiter.bucket("trading-history").capacity == 60.0
+        assert limiter.bucket("fees").rate == 5.0
+
+        limiter.update_from_response("trading-history", 429, {"Retry-After": "1"})
+        assert limiter.bucket("trading-history").rate == 30.0
@@ -0,0 +1,96 @@
+import asyncio
+
+import allure
+import orjson
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from api.bitopro_client import BitoProClient
+from api.request_timing import TIMING_PHASES, RequestTimings, TimingStats
+
+pytestmark = [allure.feature("請求各階段耗時")]
+
+
+class TestRequestTimings:
+    """RequestTimings 與 TimingStats 測試類"""
+
+    @allure.story("階段換算")
+    @allure.title("測試由打點換算各階段耗時")
+    def test_finish(self):
+        """測試新建連線時 connect 會扣除 DNS 時間，重用連線時為 0"""
+        timings = RequestTimings()
+        timings.marks.update(
+            {
+                "request_start": 0.0,
+                "connect_start": 0.05,
+                "dns_start": 0.1,
+                "dns_end": 0.3,
+                "connected": 0.6,
+                "headers": 1.0,
+                "body_read": 1.5,
+                "decoded": 1.6,
+            }
+        )
+        timings.finish()
+        assert timings.dns == pytest.approx(0.2)
+        assert timings.connect == pytest.approx(0.35)
+        assert timings.ttfb == pytest.approx(0.4)
+        assert timings.transfer == pytest.approx(0.5)
+        assert timings.decode == pytest.approx(0.1)
+        assert timings.total == pytest.approx(1.6)
+
+        reused = RequestTimings(connection_reused=True)
+        reused.marks.update(request_start=0.0, connected=0.01, headers=0.2, body_read=0.3, decoded=0.35)
+        reused.finish()
+        assert reused.connect == 0.0
+        assert reused.dns is None
+        assert reused.ttfb == pytest.approx(0.19)
+
+    @allure.story("階段換算")
+    @allure.title("測試彙整統計")
+    def test_stats(self):
+        """測試 TimingStats 只統計有記錄的階段"""
+        stats = TimingStats()
+        for total in (0.1, 0.2, 0.3):
+            stats.record(RequestTimings(total=total, connection_reused=True))
+        summary = stats.summary()
+        assert summary["requests"] == 3
+        assert summary["reused_connections"] == 3
+        assert summary["total"]["count"] == 3
+        assert summary["total"]["p50"] == pytest.approx(0.2, rel=0.01)
+        assert summary["total"]["max"] == 0.3
+
+        merged = TimingStats().merge(stats).merge(stats)
+        assert merged.summary()["total"]["count"] == 6
+        assert "dns" not in summary
+
+        restored = TimingStats.from_dict(orjson.loads(orjson.dumps(stats.to_dict())))
+        assert restored.summary() == summary
+
+    @allure.story("客戶端整合")
+    @allure.title("測試客戶端透過 TraceConfig 記錄各階段耗時")
+    async def test_client_timings(self):
+        """測試第一個請求建立新連線，第二個請求重用連線，且伺服器延遲計入 ttfb"""
+
+        async def trading_history(request: web.Request) -> web.Response:
+            await asyncio.sleep(0.05)
+            return web.json_response({"data": []})
+
+        app = web.Application()
+        app.router.add_get("/v3/trading-history/{pair}", trading_history)
+        async with TestServer(app) as server:
+            async with BitoProClient(base_url=str(server.make_url("/v3"))) as client:
+                _, first = await client.get_ohlc_data("btc_twd", "1m", 0, 60)
+                _, second = await client.get_ohlc_data("btc_twd", "1m", 0, 60)
+                summary = client.timing_summary()
+
+        assert set(TIMING_PHASES) <= set(first["timings"])
+        assert first["timings"]["connection_reused"] is False
+        assert first["timings"]["connect"] is not None
+        assert second["timings"]["connection_reused"] is True
+        assert second["timings"]["connect"] == 0.0
+        for timings in (first["timings"], second["timings"]):
+            assert timings["ttfb"] >= 0.05
+            assert timings["total"] >= timings["ttfb"] + timings["transfer"] + timings["decode"]
+        assert summary["requests"] == 2
+        assert summary["reused_connections"] == 1
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import aiohttp
+import allure
+import pytest
+from api.bitopro_client import BitoProClient
+from api.retry import HedgePolicy, RetryBudget, RetryPolicy
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+pytestmark = [allure.feature("重試與對沖請求")]
+
+
+def response_error(status: int) -> aiohttp.ClientResponseError:
+    """建立指定狀態碼的 ClientResponseError"""
+    url = URL("https://api.bitopro.com/v3/trading-history/btc_twd")
+    request_info = aiohttp.RequestInfo(url=url, method="GET", headers=CIMultiDictProxy(CIMultiDict()), real_url=url)
+    return aiohttp.ClientResponseError(request_info=request_info, history=(), status=status, message="error")
+
+
+class FakeRequests:
+    """依序回傳預設結果的 _request_ohlc 替身，結果為例外時拋出，並可指定延遲"""
+
+    def __init__(self, *outcomes, delays=()):
+        self.outcomes = list(outcomes)
+        self.delays = list(delays)
+        self.calls = 0
+
+    async def __call__(self, pair, resolution, from_timestamp, to_timestamp):
+        index = self.calls
+        self.calls += 1
+        if index < len(self.delays):
+            await asyncio.sleep(self.delays[index])
+        outcome = self.outcomes[min(index, len(self.outcomes) - 1)]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return {"data": [], "call": index}, {"request": {}, "response": {}}
+
+
+class TestRetry:
+    """重試、對沖與期限測試類"""
+
+    @allure.story("重試")
+    @allure.title("測試暫時性錯誤重試後成功")
+    async def test_retry_transient_errors(self, monkeypatch):
+        """測試 503 與連線錯誤會被重試，並記錄嘗試次數"""
+        fake = FakeRequests(response_error(503), aiohttp.ServerDisconnectedError(), None)
+        async with BitoProClient(retry_policy=RetryPolicy(base_delay=0.01)) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake)
+            data, req_resp = await client.get_ohlc_data("btc_twd", "1h", 0, 3600)
+
+        assert fake.calls == 3
+        assert req_resp["attempts"] == 3
+        assert data["call"] == 2
+
+    @allure.story("重試")
+    @allure.title("測試用戶端錯誤不重試")
+    async def test_no_retry_on_client_error(self, monkeypatch):
+        """測試 400 直接拋出"""
+        fake = FakeRequests(response_error(400))
+        async with BitoProClient(retry_policy=RetryPolicy(base_delay=0.01)) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake)
+            with pytest.raises(aiohttp.ClientResponseError):
+                await client.get_ohlc_data("btc_twd", "1h", 0, 3600)
+        assert fake.calls == 1
+
+    @allure.story("重試")
+    @allure.title("測試重試額度用完後停止重試")
+    async def test_retry_budget(self, monkeypatch):
+        """測試多次呼叫共用重試額度"""
+        fake = FakeRequests(response_error(502))
+        budget = RetryBudget(max_retries=3)
+        async with BitoProClient(retry_policy=RetryPolicy(max_attempts=3, base_delay=0.0, budget=budget)) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake)
+            for _ in range(3):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await client.get_ohlc_data("btc_twd", "1h", 0, 3600)
+
+        assert budget.remaining == 0
+        assert fake.calls == 3 + 3
+
+    @allure.story("期限")
+    @allure.title("測試超過整體期限時中止")
+    async def test_deadline(self, monkeypatch):
+        """測試 deadline 包含重試等待時間"""
+        fake = FakeRequests(response_error(503))
+        async with BitoProClient(retry_policy=RetryPolicy(max_attempts=10, base_delay=0.2, max_delay=0.2)) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake)
+            started_at = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError, match="deadline"):
+                await client.get_ohlc_data("btc_twd", "1h", 0, 3600, deadline=0.1)
+        assert time.perf_counter() - started_at < 0.5
+
+    @allure.story("對沖請求")
+    @allure.title("測試慢請求被對沖請求取代")
+    async def test_hedged_request(self, monkeypatch):
+        """測試超過 p95 延遲後發送對沖請求，並採用先完成的結果"""
+        hedge_policy = HedgePolicy(min_samples=5, min_delay=0.01, latencies=[0.02] * 5)
+        fake = FakeRequests(None, delays=[1.0, 0.0])
+        async with BitoProClient(hedge_policy=hedge_policy) as client:
+            monkeypatch.setattr(client, "_request_ohlc", fake)
+            started_at = time.perf_counter()
+            data, req_resp = await client.get_ohlc_data("btc_twd", "1h", 0, 3600)
+
+        assert time.perf_counter() - started_at < 0.5
+        assert data["call"] == 1
+        assert req_resp["hedged"] is True
+        assert hedge_policy.hedged == 1
+
+    @allure.story("對沖請求")
+    @allure.title("測試對沖延遲期間被外層期限取消時不留下孤兒請求")
+    async def test_hedged_request_cancelled_during_delay(self, monkeypatch):
+        """測試期限在對沖延遲內到期時，已發出的主要請求會被一併取消"""
+        hedge_policy = HedgePolicy(min_samples=5, min_delay=0.01, latencies=[0.5] * 5)
+        tasks = []
+
+        async def slow_request(pair, resolution, from_timestamp, to_timestamp):
+            tasks.append(asyncio.current_task())
+            await asyncio.sleep(1.0)
+            return {"data": []}, {"request": {}, "response": {}}
+
+        async with BitoProClient(hedge_policy=hedge_policy) as client:
+            monkeypatch.setattr(client, "_request_ohlc", slow_request)
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_ohlc_data("btc_twd", "1h", 0, 3600, deadline=0.05)
+            await asyncio.sleep(0)
+
+        assert len(tasks) == 1
+        assert tasks[0].cancelled()
+        assert hedge_policy.hedged == 0
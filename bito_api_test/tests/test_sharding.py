@@ -0,0 +1,165 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import allure
+import orjson
+import pytest
+from api import sharding
+from api.request_timing import RequestTimings, TimingStats
+from api.sharding import (
+    PYTEST_INTERRUPTED,
+    PYTEST_NO_TESTS_COLLECTED,
+    assign_shards,
+    environment_properties,
+    run_sharded_tests,
+    shard_group,
+    write_allure_environment,
+)
+
+pytestmark = [allure.feature("分片執行")]
+
+# bito_api_test 目錄，worker 以此為工作目錄執行
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+class TestShardAssignment:
+    """assign_shards 測試類"""
+
+    @allure.story("測試分配")
+    @allure.title("測試分組鍵")
+    def test_shard_group(self):
+        """測試同一個測試類別或模組的測試取得相同的分組鍵"""
+        assert shard_group("tests/test_a.py::TestA::test_x[1m]") == "tests/test_a.py::TestA"
+        assert shard_group("tests/test_a.py::TestA::test_y") == "tests/test_a.py::TestA"
+        assert shard_group("tests/test_b.py::test_z") == "tests/test_b.py"
+
+    @allure.story("測試分配")
+    @allure.title("測試分組不拆開且負載平均")
+    def test_assign_shards(self):
+        """測試同一分組分到同一個 worker、各 worker 的測試數量接近，且與收集順序無關"""
+        nodeids = [f"tests/test_a.py::TestA::test_{i}" for i in range(6)]
+        nodeids += [f"tests/test_b.py::TestB::test_{i}" for i in range(4)]
+        nodeids += [f"tests/test_c.py::test_{i}" for i in range(3)]
+        nodeids += [f"tests/test_d.py::TestD::test_{i}" for i in range(3)]
+
+        assignment = assign_shards(nodeids, 2)
+        assert assignment == assign_shards(list(reversed(nodeids)), 2)
+        for group in {shard_group(nodeid) for nodeid in nodeids}:
+            assert len({shard for nodeid, shard in assignment.items() if shard_group(nodeid) == group}) == 1
+        loads = [sum(1 for shard in assignment.values() if shard == index) for index in range(2)]
+        assert sorted(loads) == [7, 9]
+
+        assert set(assign_shards(nodeids, 1).values()) == {0}
+        with pytest.raises(ValueError):
+            assign_shards(nodeids, 0)
+
+
+class TestShardedRun:
+    """分片執行與結果合併測試類"""
+
+    @allure.story("結果合併")
+    @allure.title("測試寫入 Allure 環境資訊")
+    def test_environment_properties(self, tmp_path):
+        """測試合併後的百分位數寫入 environment.properties，並保留既有的項目"""
+        timing = TimingStats()
+        for total in (0.1, 0.2, 0.3):
+            timing.record(RequestTimings(total=total))
+        properties = environment_properties(timing, 3)
+        assert properties["shards"] == "3"
+        assert properties["requests"] == "3"
+        assert properties["total.count"] == "3"
+        assert float(properties["total.p50"]) == pytest.approx(0.2, rel=0.01)
+        assert "dns.count" not in properties
+
+        (tmp_path / "environment.properties").write_text("Platform=Production\nshards=1\n", encoding="utf-8")
+        path = write_allure_environment(tmp_path, properties)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert lines[0] == "Platform=Production"
+        assert "shards=3" in lines
+        assert "shards=1" not in lines
+
+    @allure.story("分片執行")
+    @allure.title("測試多個 worker 行程執行並合併 Allure 結果")
+    def test_run_sharded_tests(self, tmp_path):
+        """測試兩個模組分到不同的 worker，每個測試只執行一次，所有結果寫入同一個 Allure 目錄"""
+        alluredir = tmp_path / "allure-results"
+        result = run_sharded_tests(
+            "tests/test_fixed_point.py",
+            2,
+            alluredir,
+            extra_args=["tests/test_latency_histogram.py", "-q", "-p", "no:cacheprovider"],
+            work_dir=tmp_path / "shards",
+            cwd=PROJECT_DIR,
+        )
+
+        assert result.returncode == 0, [shard.log_path.read_text(encoding="utf-8") for shard in result.shards]
+        # 編號 2 為效能測試階段，這兩個模組沒有效能測試
+        assert [shard.index for shard in result.shards] == [0, 1, 2]
+        assert all("passed" in shard.log_path.read_text(encoding="utf-8") for shard in result.shards[:2])
+        assert result.shards[2].returncode == PYTEST_NO_TESTS_COLLECTED
+
+        results = [orjson.loads(path.read_bytes()) for path in alluredir.glob("*-result.json")]
+        modules = {test["fullName"].split(".")[1] for test in results}
+        assert modules == {"test_fixed_point", "test_latency_histogram"}
+        assert len(results) == len({test["historyId"] for test in results})
+        assert "shards=2" in (alluredir / "environment.properties").read_text(encoding="utf-8").splitlines()
+        assert (tmp_path / "shards" / "timing-merged.json").exists()
+
+    @allure.story("分片執行")
+    @allure.title("測試卡住的 worker 逾時後被終止")
+    @pytest.mark.skipif(sys.platform == "win32", reason="需要 POSIX shell")
+    def test_worker_timeout(self, tmp_path, monkeypatch):
+        """測試忽略 SIGTERM 的 worker 逾時後被 kill，整體執行不會卡住並回報中斷"""
+        # 以忽略 SIGTERM 的無窮迴圈取代 pytest，模擬卡住的 worker
+        hang = tmp_path / "hang.sh"
+        hang.write_text("#!/bin/sh\ntrap '' TERM\nwhile :; do sleep 0.1; done\n", encoding="utf-8")
+        hang.chmod(0o755)
+        monkeypatch.setattr(sharding.sys, "executable", str(hang))
+        monkeypatch.setattr(sharding, "WORKER_KILL_GRACE", 0.5)
+
+        result = run_sharded_tests(
+            "tests/test_fixed_point.py",
+            1,
+            tmp_path / "allure-results",
+            work_dir=tmp_path / "shards",
+            cwd=PROJECT_DIR,
+            worker_timeout=0.5,
+            perf_phase=False,
+        )
+
+        assert result.shards[0].timed_out
+        assert not result.shards[0].ok
+        assert result.returncode == PYTEST_INTERRUPTED
+        assert result.elapsed < 5.0
+
+    @allure.story("分片執行")
+    @allure.title("測試效能測試不分片，只在效能測試階段執行")
+    @pytest.mark.parametrize(
+        "args, expected",
+        [
+            (["--shard-index=0", "--shard-count=2"], {"other"}),
+            (["--shard-index=1", "--shard-count=2"], set()),
+            (["--perf-phase"], {"performance"}),
+            ([], {"performance", "other"}),
+        ],
+    )
+    def test_perf_phase_selection(self, tmp_path, args, expected):
+        """測試分片的 worker 略過標記為 performance 的測試，--perf-phase 只收集效能測試"""
+        test_file = tmp_path / "test_perf_phase.py"
+        test_file.write_text(
+            "import pytest\n\n\n@pytest.mark.performance\ndef test_performance():\n    pass\n\n\n"
+            "def test_other():\n    pass\n",
+            encoding="utf-8",
+        )
+        # 暫存目錄不在 conftest 的範圍內，以 -p conftest 將專案的 conftest 當作插件載入
+        command = [sys.executable, "-m", "pytest", str(test_file), "--collect-only", "-q", "-p", "conftest"]
+        completed = subprocess.run(
+            [*command, "-p", "no:cacheprovider", "-c", str(PROJECT_DIR / "pytest.ini"), *args],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+        )
+
+        collected = {line.rsplit("::test_", 1)[1] for line in completed.stdout.splitlines() if "::test_" in line}
+        assert collected == expected, completed.stdout
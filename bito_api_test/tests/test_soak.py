@@ -0,0 +1,93 @@
+import asyncio
+
+import allure
+import pytest
+from api.bitopro_client import BitoProClient, OHLCJob
+from api.mock_server import MockBitoProServer, MockServerConfig
+from api.soak import count_open_sockets, detect_drift, read_rss_bytes, run_soak
+
+pytestmark = [allure.feature("長時間穩定性")]
+
+
+class TestSoak:
+    """長時間執行取樣與漂移判定測試類"""
+
+    @allure.story("漂移判定")
+    @allure.title("測試單調成長與穩定序列的判定")
+    def test_detect_drift(self):
+        """測試持續成長的序列判定為漂移，穩定但有雜訊或成長幅度極小的序列不判定"""
+        growing = detect_drift("rss_bytes", [100, 110, 118, 131, 140, 152, 160, 171])
+        assert growing.drifting
+        assert growing.trend == 1.0
+        assert growing.growth > 0.4
+
+        noisy = detect_drift("p99", [0.2, 0.25, 0.19, 0.22, 0.21, 0.24, 0.2, 0.23])
+        assert not noisy.drifting
+
+        tiny = detect_drift("rss_bytes", [1000, 1001, 1002, 1003, 1004, 1005])
+        assert tiny.trend == 1.0
+        assert not tiny.drifting
+
+        short = detect_drift("open_sockets", [1, 2, None, 3])
+        assert short.samples == 3
+        assert short.trend is None
+
+    @allure.story("資源取樣")
+    @allure.title("測試讀取行程資源用量")
+    def test_process_metrics(self):
+        """測試 Linux 上可讀取 RSS 與 socket 數"""
+        rss = read_rss_bytes()
+        if rss is None:
+            pytest.skip("此系統不支援 /proc")
+        assert rss > 0
+        assert count_open_sockets() >= 0
+
+    @allure.story("長時間執行")
+    @allure.title("測試依請求組合取樣並產生報告")
+    async def test_run_soak(self, monkeypatch, tmp_path):
+        """測試每個取樣區間的請求數、錯誤數與報告輸出"""
+        requested = []
+
+        async def fake_get_ohlc_data(self, pair, resolution, from_timestamp, to_timestamp, **kwargs):
+            requested.append(resolution)
+            await asyncio.sleep(0.001)
+            if resolution == "1d":
+                raise RuntimeError("server error")
+            return {"data": []}, {}
+
+        monkeypatch.setattr(BitoProClient, "get_ohlc_data", fake_get_ohlc_data)
+        jobs = [OHLCJob("btc_twd", "1m", 0, 60), OHLCJob("btc_twd", "1d", 0, 60)]
+        async with BitoProClient() as client:
+            report = await run_soak(
+                client, jobs, duration=0.6, rate=100.0, sample_interval=0.1, weights=[3, 1], seed=1
+            )
+
+        assert len(report.samples) == 6
+        assert all(sample.requests == 10 for sample in report.samples)
+        assert sum(sample.errors for sample in report.samples) == requested.count("1d")
+        assert requested.count("1m") > requested.count("1d") > 0
+        assert {finding.metric for finding in report.findings} >= {"rss_bytes", "p99"}
+
+        path = report.write(tmp_path)
+        assert path.exists()
+        assert path.with_suffix(".csv").read_text(encoding="utf-8").startswith("elapsed,")
+        assert "Kendall" in report.summary()
+        with pytest.raises(ValueError):
+            await run_soak(client, [], duration=1.0)
+
+    @allure.story("資源取樣")
+    @allure.title("測試負載進行期間取樣連線池用量")
+    async def test_connector_occupancy_during_load(self):
+        """測試連線池在負載期間輪詢，可看到進行中與閒置的連線"""
+        jobs = [OHLCJob("btc_twd", "1h", 1609459200, 1609545600)]
+        async with MockBitoProServer(MockServerConfig(latency=0.05)) as server:
+            async with BitoProClient(base_url=server.base_url) as client:
+                report = await run_soak(client, jobs, duration=0.6, rate=100.0, sample_interval=0.3)
+
+        assert len(report.samples) == 2
+        for sample in report.samples:
+            # 100 req/s、每個請求 50 毫秒，平均約有 5 個連線在使用中
+            assert sample.connections_in_use > 1
+            assert sample.connections_in_use_max >= sample.connections_in_use
+            assert sample.connections_idle is not None
+        assert max(sample.connections_idle for sample in report.samples) > 0
@@ -2,6 +2,7 @@ import asyncio
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from orjson import loads
 import pytest
@@ -11,8 +12,13 @@ from bito_front.compare_bitopro_data import BitoProDataComparer
 from update_module import CaseReport, update_google_sheet
 
 
-def run_api_tests():
-    """執行測試並生成報告"""
+def run_api_tests(shards: Optional[int] = None):
+    """
+    執行測試並生成報告
+
+    Args:
+        shards: 並行執行的 pytest worker 行程數，預設讀取環境變數 API_TEST_SHARDS（未設定時為 1，即在目前行程執行）
+    """
     # 清理之前的測試結果
     # pytest.main(["./tests/", "-v"])
 
@@ -23,14 +29,24 @@ def run_api_tests():
 
     shutil.rmtree("bito_api_test/allure-results")
 
-    # # 執行測試
-    pytest.main(
-        [
-            "bito_api_test/tests/",
-            "-v",
-            "--alluredir=bito_api_test/allure-results",
-        ]
-    )
+    shards = shards or int(os.environ.get("API_TEST_SHARDS", "1"))
+    if shards > 1:
+        # 分片模式才載入，避免與 pytest 在目前行程匯入的 api 套件重複
+        from bito_api_test.api.sharding import run_sharded_tests
+
+        sharded_run = run_sharded_tests(
+            "bito_api_test/tests/", shards, "bito_api_test/allure-results", extra_args=["-v"]
+        )
+        print(f"分片執行完成: {len(sharded_run.shards)} 個 worker，結束代碼 {sharded_run.returncode}")
+    else:
+        # # 執行測試
+        pytest.main(
+            [
+                "bito_api_test/tests/",
+                "-v",
+                "--alluredir=bito_api_test/allure-results",
+            ]
+        )
     # 讀取 JSON 檔案
     result_json = Path("bito_api_test/allure-results").glob("*-result.json")
 